@@ -0,0 +1,45 @@
+import logging
+
+from aiohttp import web
+
+from .common import DB_KEY, json_error
+from .handlers import routes
+
+# Ответы меньше этого размера не сжимаются
+MIN_COMPRESS_SIZE = 1024
+
+logger = logging.getLogger(__name__)
+
+@web.middleware
+async def error_middleware(request, handler):
+    """Ошибки сервера в виде JSON (подробности - только в журнале сервера)"""
+    try:
+        return await handler(request)
+    except web.HTTPException:
+        raise
+    except Exception:
+        logger.exception("Ошибка обработки %s %s", request.method, request.path)
+        raise json_error(web.HTTPInternalServerError, "Внутренняя ошибка сервера")
+
+@web.middleware
+async def compression_middleware(request, handler):
+    """gzip для крупных ответов, если клиент его поддерживает"""
+    response = await handler(request)
+    
+    if isinstance(response, web.Response) and response.body is not None \
+            and len(response.body) >= MIN_COMPRESS_SIZE:
+        response.enable_compression()
+    
+    return response
+
+def create_app(db):
+    """Приложение aiohttp поверх AsyncDatabase"""
+    app = web.Application(middlewares=[error_middleware, compression_middleware])
+    app[DB_KEY] = db
+    app.add_routes(routes)
+    
+    async def close_db(app):
+        app[DB_KEY].close()
+    
+    app.on_cleanup.append(close_db)
+    return app
\ No newline at end of file
@@ -0,0 +1,75 @@
+import hashlib
+import json
+
+from aiohttp import web
+
+from async_database import AsyncDatabase
+
+DB_KEY = web.AppKey('db', AsyncDatabase)
+
+MAX_PER_PAGE = 200
+
+def json_default(value):
+    """Сериализация значений, которые json не знает"""
+    if hasattr(value, 'keys'):
+        # sqlite3.Row или строка хранилища PostgreSQL
+        return dict(value)
+    return str(value)
+
+def dumps(data):
+    return json.dumps(data, ensure_ascii=False, default=json_default)
+
+def json_response(data, status=200, etag=None):
+    """JSON-ответ (с ETag, если задан)"""
+    response = web.json_response(data, status=status, dumps=dumps)
+    if etag:
+        response.etag = etag
+    return response
+
+def json_error(error_class, message):
+    """HTTP-исключение с телом {"error": message}"""
+    return error_class(text=dumps({'error': message}), content_type='application/json')
+
+def check_etag(request, version):
+    """ETag по версии данных; если клиент прислал такой же - 304 Not Modified"""
+    etag = hashlib.md5(str(version).encode('utf-8')).hexdigest()[:20]
+    
+    if request.if_none_match and any(tag.value == etag for tag in request.if_none_match):
+        raise web.HTTPNotModified(headers={'ETag': f'"{etag}"'})
+    
+    return etag
+
+def int_param(value, name, default=None, minimum=None, maximum=None):
+    """Целочисленный параметр запроса"""
+    if value is None or value == '':
+        if default is None:
+            raise json_error(web.HTTPBadRequest, f"Не указан параметр {name}")
+        return default
+    
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise json_error(web.HTTPBadRequest, f"Параметр {name} должен быть целым числом")
+    
+    if minimum is not None:
+        number = max(minimum, number)
+    if maximum is not None:
+        number = min(maximum, number)
+    return number
+
+def pagination(request):
+    """Номер страницы и размер страницы из ?page=&per_page="""
+    page = int_param(request.query.get('page'), 'page', 1, minimum=1)
+    per_page = int_param(request.query.get('per_page'), 'per_page', 50, minimum=1, maximum=MAX_PER_PAGE)
+    return page, per_page
+
+async def read_json(request):
+    """Тело запроса в виде JSON-объекта"""
+    try:
+        data = await request.json()
+    except ValueError:
+        raise json_error(web.HTTPBadRequest, "Тело запроса должно быть JSON")
+    
+    if not isinstance(data, dict):
+        raise json_error(web.HTTPBadRequest, "Ожидается JSON-объект")
+    return data
\ No newline at end of file
@@ -0,0 +1,171 @@
+from aiohttp import web
+
+from models import RequestStatus
+from .common import (DB_KEY, dumps, json_response, json_error, check_etag,
+                     int_param, pagination, read_json)
+
+routes = web.RouteTableDef()
+
+# Фильтры списка заявок (параметры запроса = ключи фильтров search_requests)
+REQUEST_FILTERS = ('status', 'tech_type', 'master_id', 'priority', 'date_from', 'date_to')
+
+@routes.get('/api/health')
+async def health(request):
+    return json_response({'status': 'ok'})
+
+@routes.get('/api/requests')
+async def list_requests(request):
+    """Список заявок с поиском, фильтрами и постраничным выводом"""
+    db = request.app[DB_KEY]
+    page, per_page = pagination(request)
+    search = request.query.get('search', '')
+    filters = {key: request.query[key] for key in REQUEST_FILTERS if request.query.get(key)}
+    
+    version = await db.get_requests_version()
+    etag = check_etag(request, (version, request.query_string))
+    
+    total = await db.count_requests(search, filters)
+    items = await db.search_requests(search, filters, per_page, (page - 1) * per_page)
+    
+    return json_response({
+        'items': items,
+        'page': page,
+        'per_page': per_page,
+        'total': total
+    }, etag=etag)
+
+@routes.get('/api/requests/export')
+async def export_requests(request):
+    """Все подходящие заявки потоком в формате NDJSON (по строке JSON на заявку)"""
+    db = request.app[DB_KEY]
+    search = request.query.get('search', '')
+    filters = {key: request.query[key] for key in REQUEST_FILTERS if request.query.get(key)}
+    
+    response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson; charset=utf-8'})
+    response.enable_compression()
+    await response.prepare(request)
+    
+    async for row in db.stream_requests(search, filters):
+        await response.write((dumps(row) + '\n').encode('utf-8'))
+    
+    await response.write_eof()
+    return response
+
+@routes.get('/api/requests/{request_id}')
+async def get_request(request):
+    """Заявка по номеру"""
+    db = request.app[DB_KEY]
+    request_id = int_param(request.match_info['request_id'], 'request_id')
+    
+    item = await db.get_request(request_id)
+    if not item:
+        raise json_error(web.HTTPNotFound, f"Заявка #{request_id} не найдена")
+    
+    _, users_version = await db.get_requests_version()
+    etag = check_etag(request, (request_id, item['row_version'], users_version))
+    return json_response(item, etag=etag)
+
+@routes.patch('/api/requests/{request_id}/status')
+async def update_request_status(request):
+    """Смена статуса заявки"""
+    db = request.app[DB_KEY]
+    request_id = int_param(request.match_info['request_id'], 'request_id')
+    data = await read_json(request)
+    
+    status = data.get('status')
+    if status not in [s.value for s in RequestStatus]:
+        raise json_error(web.HTTPBadRequest, f"Неизвестный статус: {status}")
+    
+    updated = await db.update_request_status(request_id, status, data.get('completion_date'))
+    if not updated:
+        raise json_error(web.HTTPNotFound, f"Заявка #{request_id} не найдена")
+    
+    return json_response(await db.get_request(request_id))
+
+@routes.get('/api/requests/{request_id}/comments')
+async def list_comments(request):
+    """Комментарии к заявке"""
+    db = request.app[DB_KEY]
+    request_id = int_param(request.match_info['request_id'], 'request_id')
+    include_private = request.query.get('include_private', '1') != '0'
+    
+    comments = await db.get_request_comments(request_id, include_private)
+    return json_response({'items': comments})
+
+@routes.post('/api/requests/{request_id}/comments')
+async def add_comment(request):
+    """Новый комментарий к заявке"""
+    db = request.app[DB_KEY]
+    request_id = int_param(request.match_info['request_id'], 'request_id')
+    data = await read_json(request)
+    
+    message = str(data.get('message', '')).strip()
+    if not message:
+        raise json_error(web.HTTPBadRequest, "Пустой комментарий")
+    
+    user_id = int_param(data.get('user_id'), 'user_id')
+    
+    if not await db.get_request(request_id):
+        raise json_error(web.HTTPNotFound, f"Заявка #{request_id} не найдена")
+    
+    comment_id = await db.add_comment(request_id, user_id, message, bool(data.get('is_private')))
+    return json_response({'commentID': comment_id}, status=201)
+
+@routes.get('/api/parts')
+async def list_parts(request):
+    """Запчасти (?low_stock=1 - только с низким запасом)"""
+    db = request.app[DB_KEY]
+    
+    if request.query.get('low_stock') == '1':
+        parts = await db.get_low_stock_parts()
+    else:
+        parts = await db.get_parts()
+    
+    return json_response({'items': parts})
+
+@routes.get('/api/users/{user_id}/notifications')
+async def list_notifications(request):
+    """Уведомления пользователя (?unread=1 - только непрочитанные)"""
+    db = request.app[DB_KEY]
+    user_id = int_param(request.match_info['user_id'], 'user_id')
+    limit = int_param(request.query.get('limit'), 'limit', 50, minimum=1, maximum=200)
+    unread_only = request.query.get('unread') == '1'
+    
+    notifications = await db.get_user_notifications(user_id, unread_only, limit)
+    return json_response({'items': notifications})
+
+@routes.get('/api/users/{user_id}/notifications/unread')
+async def unread_count(request):
+    """Количество непрочитанных уведомлений"""
+    db = request.app[DB_KEY]
+    user_id = int_param(request.match_info['user_id'], 'user_id')
+    
+    return json_response({'unread': await db.get_unread_count(user_id)})
+
+@routes.post('/api/users/{user_id}/notifications/read')
+async def mark_notifications_read(request):
+    """Пометить прочитанными уведомления {"ids": [...]} или все, если ids не передан"""
+    db = request.app[DB_KEY]
+    user_id = int_param(request.match_info['user_id'], 'user_id')
+    data = await read_json(request)
+    
+    ids = data.get('ids')
+    if ids is None:
+        updated = await db.mark_all_notifications_read(user_id)
+    elif isinstance(ids, list):
+        ids = [int_param(value, 'ids') for value in ids]
+        updated = await db.mark_notifications_read(ids)
+    else:
+        raise json_error(web.HTTPBadRequest, "ids должен быть списком")
+    
+    return json_response({'updated': updated})
+
+@routes.get('/api/statistics')
+async def statistics(request):
+    """Общая статистика"""
+    db = request.app[DB_KEY]
+    
+    version = await db.get_requests_version()
+    etag = check_etag(request, ('statistics', version))
+    
+    return json_response(await db.get_statistics(), etag=etag)
\ No newline at end of file
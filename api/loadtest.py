@@ -0,0 +1,166 @@
+"""Нагрузочное тестирование REST API
+    
+    python -m api.loadtest --url http://127.0.0.1:8080 --concurrency 20 --requests 2000
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter, defaultdict
+
+import aiohttp
+
+from utils.sketches import percentile
+
+class LoadTest:
+    """Смешанная нагрузка на API с учетом ETag
+    
+    Сценарий выбирается случайно с весами SCENARIOS. Если включено
+    повторное использование ETag, клиент отправляет If-None-Match с
+    последним полученным значением для того же адреса.
+    """
+    
+    # (вес, название, метод)
+    SCENARIOS = [
+        (30, 'list_requests', 'GET'),
+        (25, 'get_request', 'GET'),
+        (10, 'statistics', 'GET'),
+        (15, 'unread_count', 'GET'),
+        (10, 'comments', 'GET'),
+        (5, 'add_comment', 'POST'),
+        (5, 'change_status', 'PATCH')
+    ]
+    
+    STATUSES = ['Новая заявка', 'В процессе ремонта', 'Ожидание запчастей']
+    
+    def __init__(self, url, concurrency=20, total=2000, use_etags=True, seed=None):
+        self.url = url.rstrip('/')
+        self.concurrency = concurrency
+        self.total = total
+        self.use_etags = use_etags
+        self.random = random.Random(seed)
+        self.etags = {}
+        self.latencies = defaultdict(list)
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.request_ids = []
+        self.user_ids = [1]
+        self._remaining = total
+    
+    async def run(self):
+        """Запуск теста; возвращает сводку"""
+        headers = {'Accept-Encoding': 'gzip'}
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        
+        async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+            await self._discover(session)
+            
+            started = time.perf_counter()
+            await asyncio.gather(*(self._worker(session) for _ in range(self.concurrency)))
+            elapsed = time.perf_counter() - started
+        
+        return self.summary(elapsed)
+    
+    async def _discover(self, session):
+        """Номера заявок и пользователей для сценариев"""
+        async with session.get(f'{self.url}/api/requests', params={'per_page': 200}) as response:
+            data = await response.json()
+        
+        items = data.get('items', [])
+        self.request_ids = [item['requestID'] for item in items] or [1]
+        self.user_ids = sorted({item['masterID'] for item in items if item.get('masterID')}) or [1]
+    
+    def _next_scenario(self):
+        weights = [weight for weight, _, _ in self.SCENARIOS]
+        _, name, method = self.random.choices(self.SCENARIOS, weights=weights)[0]
+        request_id = self.random.choice(self.request_ids)
+        user_id = self.random.choice(self.user_ids)
+        
+        if name == 'list_requests':
+            return name, method, f'/api/requests?page={self.random.randint(1, 3)}&per_page=50', None
+        if name == 'get_request':
+            return name, method, f'/api/requests/{request_id}', None
+        if name == 'statistics':
+            return name, method, '/api/statistics', None
+        if name == 'unread_count':
+            return name, method, f'/api/users/{user_id}/notifications/unread', None
+        if name == 'comments':
+            return name, method, f'/api/requests/{request_id}/comments', None
+        if name == 'add_comment':
+            body = {'user_id': user_id, 'message': f'Нагрузочный тест {time.time():.3f}'}
+            return name, method, f'/api/requests/{request_id}/comments', body
+        body = {'status': self.random.choice(self.STATUSES)}
+        return name, method, f'/api/requests/{request_id}/status', body
+    
+    async def _worker(self, session):
+        while self._remaining > 0:
+            self._remaining -= 1
+            name, method, path, body = self._next_scenario()
+            
+            headers = {}
+            if self.use_etags and method == 'GET' and path in self.etags:
+                headers['If-None-Match'] = self.etags[path]
+            
+            started = time.perf_counter()
+            try:
+                async with session.request(method, self.url + path, json=body, headers=headers) as response:
+                    await response.read()
+                    if response.headers.get('ETag'):
+                        self.etags[path] = response.headers['ETag']
+                    self.statuses[response.status] += 1
+            except aiohttp.ClientError as e:
+                self.errors[type(e).__name__] += 1
+                continue
+            
+            self.latencies[name].append((time.perf_counter() - started) * 1000)
+    
+    def summary(self, elapsed):
+        """Сводка: пропускная способность, коды ответов, задержки по сценариям"""
+        done = sum(len(values) for values in self.latencies.values())
+        result = {
+            'requests': done,
+            'elapsed_s': elapsed,
+            'rps': done / elapsed if elapsed else 0.0,
+            'statuses': dict(self.statuses),
+            'errors': dict(self.errors),
+            'latency_ms': {}
+        }
+        
+        for name, values in sorted(self.latencies.items()):
+            values.sort()
+            result['latency_ms'][name] = {
+                'count': len(values),
+                'p50': percentile(values, 50),
+                'p90': percentile(values, 90),
+                'p99': percentile(values, 99),
+                'max': values[-1]
+            }
+        
+        return result
+
+def print_summary(result):
+    print(f"Запросов: {result['requests']} за {result['elapsed_s']:.2f} с "
+          f"({result['rps']:.1f} запр/с)")
+    print(f"Коды ответов: {result['statuses']}")
+    if result['errors']:
+        print(f"Ошибки соединения: {result['errors']}")
+    
+    print(f"{'Сценарий':<16}{'Кол-во':>8}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+    for name, stats in result['latency_ms'].items():
+        print(f"{name:<16}{stats['count']:>8}{stats['p50']:>9.1f}{stats['p90']:>9.1f}"
+              f"{stats['p99']:>9.1f}{stats['max']:>9.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест REST API")
+    parser.add_argument('--url', default='http://127.0.0.1:8080')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--no-etag', action='store_true', help="не отправлять If-None-Match")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+    
+    test = LoadTest(args.url, args.concurrency, args.requests, not args.no_etag, args.seed)
+    print_summary(asyncio.run(test.run()))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,191 @@
+import asyncio
+import functools
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from database import Database
+
+class PooledDatabase(Database):
+    """Database с постоянным соединением на каждый рабочий поток
+    
+    Методы Database выполняются в ограниченном пуле потоков, каждый поток
+    держит одно соединение. Число открытых соединений не превышает размера
+    пула (плюс поток записи в многопользовательском режиме).
+    """
+    
+    def __init__(self, db_name='repair_service.db', workers=8, **kwargs):
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='db')
+        super().__init__(db_name, **kwargs)
+    
+    def get_connection(self, check_same_thread=False):
+        """Соединение текущего потока (создается при первом обращении)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = super().get_connection(check_same_thread=False)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    def open_connection(self):
+        """Отдельное соединение вне пула (для потокового чтения)"""
+        return super().get_connection(check_same_thread=False)
+    
+    def release_connection(self, conn):
+        """Соединения пула закрываются только в close()"""
+    
+    def close(self):
+        """Остановка пула и закрытие соединений"""
+        if self.write_queue:
+            self.write_queue.stop()
+            self.write_queue = None
+        self.executor.shutdown(wait=True)
+        
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+        super().close()
+
+class _Call:
+    """Вызов метода в потоке пула с возможностью прерывания"""
+    
+    def __init__(self, db, func):
+        self.db = db
+        self.func = func
+        self.conn = None
+        self.cancelled = False
+        self._lock = threading.Lock()
+    
+    def __call__(self):
+        with self._lock:
+            if self.cancelled:
+                raise sqlite3.OperationalError('interrupted')
+            self.conn = self.db.get_connection()
+        
+        try:
+            return self.func()
+        finally:
+            with self._lock:
+                self.conn = None
+    
+    def interrupt(self):
+        """Прервать выполняющийся запрос (или не начинать его)"""
+        with self._lock:
+            self.cancelled = True
+            if self.conn is not None:
+                self.conn.interrupt()
+
+def _delegate(name):
+    """Асинхронная обертка метода Database с тем же именем"""
+    async def method(self, *args, **kwargs):
+        return await self.run(getattr(self.db, name), *args, **kwargs)
+    
+    method.__name__ = name
+    method.__doc__ = getattr(Database, name).__doc__
+    return method
+
+class AsyncDatabase:
+    """Асинхронный фасад над Database для asyncio
+    
+    Методы выполняются в ограниченном пуле потоков PooledDatabase. Если
+    ожидающая задача отменена (например, клиент API отключился), текущий
+    запрос на соединении потока прерывается через interrupt(); записи
+    через очередь записи не прерываются. Большие выборки читаются
+    потоково асинхронными генераторами.
+    """
+    
+    def __init__(self, db_name='repair_service.db', workers=8, **kwargs):
+        self.db = PooledDatabase(db_name, workers=workers, **kwargs)
+    
+    async def run(self, method, *args, **kwargs):
+        """Выполнить синхронный метод в пуле потоков"""
+        call = _Call(self.db, functools.partial(method, *args, **kwargs))
+        loop = asyncio.get_running_loop()
+        
+        try:
+            return await loop.run_in_executor(self.db.executor, call)
+        except asyncio.CancelledError:
+            call.interrupt()
+            raise
+    
+    # Заявки
+    search_requests = _delegate('search_requests')
+    count_requests = _delegate('count_requests')
+    get_user_requests = _delegate('get_user_requests')
+    get_request = _delegate('get_request')
+    get_requests_version = _delegate('get_requests_version')
+    update_request_status = _delegate('update_request_status')
+    get_request_comments = _delegate('get_request_comments')
+    add_comment = _delegate('add_comment')
+    get_statistics = _delegate('get_statistics')
+    get_parts = _delegate('get_parts')
+    get_low_stock_parts = _delegate('get_low_stock_parts')
+    
+    # Уведомления
+    add_notification = _delegate('add_notification')
+    add_notifications = _delegate('add_notifications')
+    get_user_notifications = _delegate('get_user_notifications')
+    get_unread_count = _delegate('get_unread_count')
+    mark_notification_read = _delegate('mark_notification_read')
+    mark_notifications_read = _delegate('mark_notifications_read')
+    mark_all_notifications_read = _delegate('mark_all_notifications_read')
+    
+    async def stream(self, query, params=(), batch_size=200):
+        """Потоковое чтение результата запроса порциями по batch_size строк
+        
+        Использует отдельное соединение, чтобы не занимать соединение
+        потока пула между порциями.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self.db.executor
+        conn = await loop.run_in_executor(executor, self.db.open_connection)
+        
+        # Обращения к соединению идут из разных потоков пула по очереди
+        lock = threading.Lock()
+        
+        def locked(func, *args):
+            with lock:
+                return func(*args)
+        
+        try:
+            cursor = await loop.run_in_executor(executor, locked, conn.execute, query, params)
+            while True:
+                rows = await loop.run_in_executor(executor, locked, cursor.fetchmany, batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        except (asyncio.CancelledError, GeneratorExit):
+            conn.interrupt()
+            raise
+        finally:
+            try:
+                executor.submit(locked, conn.close)
+            except RuntimeError:
+                # Пул уже остановлен (генератор завершается после close()) -
+                # соединение закрывается в текущем потоке
+                locked(conn.close)
+    
+    async def stream_requests(self, search_term='', filters=None, batch_size=200):
+        """Потоковый вариант search_requests"""
+        conditions, params = Database._search_conditions(search_term, filters)
+        query = '''
+            SELECT r.*, c.fio as client_name, m.fio as master_name
+            FROM requests r
+            LEFT JOIN users c ON r.clientID = c.userID
+            LEFT JOIN users m ON r.masterID = m.userID
+            WHERE 1=1
+        ''' + conditions + " ORDER BY r.requestID"
+        
+        async for row in self.stream(query, params, batch_size):
+            yield row
+    
+    def close(self):
+        """Остановка пула потоков и закрытие соединений"""
+        self.db.close()
\ No newline at end of file
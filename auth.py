@@ -7,11 +7,22 @@ from models import User
 class AuthSystem:
     """Система аутентификации"""
     
-    def __init__(self):
-        self.db = Database()
+    def __init__(self, db=None):
+        # Общий экземпляр Database приложения; без него БД открывается при первом обращении
+        self._db = db
         self.current_user = None
         self.session_token = None
     
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = Database()
+        return self._db
+    
+    @db.setter
+    def db(self, db):
+        self._db = db
+    
     def hash_password(self, password: str) -> str:
         """Хеширование пароля"""
         salt = secrets.token_hex(16)
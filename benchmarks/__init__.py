@@ -0,0 +1,20 @@
+import importlib
+
+# Модули загружаются при первом обращении к имени: python -m benchmarks.suite
+# и процессы замера конкуренции не импортируют соседние модули заранее
+_EXPORTS = {
+    'run_suite': 'suite',
+    'compare': 'suite',
+    'CASES': 'suite',
+    'build_database': 'datasets',
+    'run_contention': 'contention'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
\ No newline at end of file
@@ -0,0 +1,373 @@
+"""Нагрузочный тест одновременной записи в общий файл БД
+
+python -m benchmarks.contention --requests 10k --processes 4 --writers 4 --readers 2 --duration 10 \
+    --journal-modes delete,wal --busy-timeouts 0.1,1,5 --write-queue --chart contention.xlsx
+
+Каждый процесс - отдельный экземпляр приложения со своим Database;
+потоки-писатели выполняют те же записи, что и формы (смена статуса,
+уведомления, комментарии, запчасти, новые заявки), читатели - поиск и
+статистику. Для каждой конфигурации (режим журнала, busy_timeout,
+очередь записи) нагрузка идет на свежей копии БД; результат - пропускная
+способность, p50/p99, доля ошибок "database is locked" и ожидание
+блокировок.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from utils.sketches import percentile
+from .datasets import build_database, parse_count
+
+# Операция -> вес в смеси писателя
+WRITE_MIX = {
+    'update_request_status': 30,
+    'add_notification': 25,
+    'add_comment': 25,
+    'add_part_to_request': 10,
+    'create_request': 10
+}
+
+READ_MIX = {
+    'search_requests': 80,
+    'get_statistics': 20
+}
+
+STATUSES = ('Новая заявка', 'В процессе ремонта', 'Ожидание запчастей')
+
+def _update_request_status(db, ids, rng):
+    db.update_request_status(rng.randint(1, ids['max_request']), rng.choice(STATUSES))
+
+def _add_notification(db, ids, rng):
+    db.add_notification(rng.choice(ids['users']), "Нагрузочный тест: уведомление", 'info')
+
+def _add_comment(db, ids, rng):
+    db.add_comment(rng.randint(1, ids['max_request']), rng.choice(ids['masters']), "Нагрузочный тест: комментарий")
+
+# Запросы форм выполняются через db._write, как методы Database: с BEGIN
+# IMMEDIATE, повтором при блокировке и учетом ожидания (или через очередь записи)
+
+def _add_part_to_request(db, ids, rng):
+    # Те же запросы, что в RequestForm.add_part_to_request
+    request_id, part_id = rng.randint(1, ids['max_request']), rng.choice(ids['parts'])
+    
+    def operation(cursor):
+        cursor.execute('SELECT quantity FROM request_parts WHERE requestID = ? AND partID = ?',
+                       (request_id, part_id))
+        existing = cursor.fetchone()
+        if existing:
+            cursor.execute('UPDATE request_parts SET quantity = ? WHERE requestID = ? AND partID = ?',
+                           (existing[0] + 1, request_id, part_id))
+        else:
+            cursor.execute('INSERT INTO request_parts (requestID, partID, quantity) VALUES (?, ?, ?)',
+                           (request_id, part_id, 1))
+    
+    db._write(operation)
+
+def _create_request(db, ids, rng):
+    # Те же запросы, что в RequestForm.create_request
+    master_id = rng.choice(ids['masters'])
+    
+    def operation(cursor):
+        cursor.execute('''
+            INSERT INTO requests
+            (startDate, homeTechType, homeTechModel, problemDescription,
+             requestStatus, masterID, clientID, priority, estimatedCost, notes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (datetime.now().strftime("%Y-%m-%d"), 'Холодильник', 'Samsung RB37A5000', 'Не включается',
+              'Новая заявка', master_id, rng.choice(ids['clients']), rng.randint(1, 5), 5000, ''))
+        return cursor.lastrowid
+    
+    request_id = db._write(operation)
+    db.add_notification(master_id, f"Создана новая заявка #{request_id}", 'info')
+
+def _search_requests(db, ids, rng):
+    db.search_requests(rng.choice(('Samsung', 'Indesit', 'Не включается', '')), {}, limit=100)
+
+def _get_statistics(db, ids, rng):
+    db.get_statistics()
+
+OPERATIONS = {
+    'update_request_status': _update_request_status,
+    'add_notification': _add_notification,
+    'add_comment': _add_comment,
+    'add_part_to_request': _add_part_to_request,
+    'create_request': _create_request,
+    'search_requests': _search_requests,
+    'get_statistics': _get_statistics
+}
+
+def _configurations(journal_modes, busy_timeouts, write_queue):
+    configs = [{'journal_mode': mode, 'busy_timeout': timeout, 'write_queue': False}
+               for mode in journal_modes for timeout in busy_timeouts]
+    # Очередь записи работает только в режиме WAL
+    if write_queue:
+        configs += [{'journal_mode': 'wal', 'busy_timeout': timeout, 'write_queue': True}
+                    for timeout in busy_timeouts]
+    return configs
+
+def config_name(config):
+    name = f"{config['journal_mode']}, {config['busy_timeout']:g} с"
+    return name + ", очередь" if config['write_queue'] else name
+
+def _client_threads(db, ids, mix, count, deadline, seed, samples, errors, lock):
+    ops, weights = list(mix), list(mix.values())
+    
+    def run(thread_seed):
+        from utils.write_queue import is_lock_error
+        
+        rng = random.Random(thread_seed)
+        local_samples, local_errors = defaultdict(list), defaultdict(lambda: [0, 0])
+        while time.perf_counter() < deadline:
+            op = rng.choices(ops, weights)[0]
+            started = time.perf_counter()
+            try:
+                OPERATIONS[op](db, ids, rng)
+            except Exception as e:
+                local_errors[op][0 if is_lock_error(e) else 1] += 1
+                continue
+            local_samples[op].append((time.perf_counter() - started) * 1000)
+        
+        with lock:
+            for op, values in local_samples.items():
+                samples[op].extend(values)
+            for op, (locked, other) in local_errors.items():
+                errors[op][0] += locked
+                errors[op][1] += other
+    
+    return [threading.Thread(target=run, args=(seed * 1000 + i,), daemon=True) for i in range(count)]
+
+def run_process(path, config, ids, writers, readers, duration, seed):
+    """Нагрузка одного экземпляра приложения; возвращает задержки, ошибки и метрики блокировок"""
+    from database import Database
+    from storage.sqlite import SQLiteBackend
+    
+    backend = SQLiteBackend(path, busy_timeout=config['busy_timeout'], wal=config['journal_mode'] == 'wal')
+    db = Database(path, concurrent=config['write_queue'], busy_timeout=config['busy_timeout'],
+                  backend=backend, migrate=False)
+    
+    samples, errors, lock = defaultdict(list), defaultdict(lambda: [0, 0]), threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = (_client_threads(db, ids, WRITE_MIX, writers, deadline, seed * 2, samples, errors, lock) +
+               _client_threads(db, ids, READ_MIX, readers, deadline, seed * 2 + 1, samples, errors, lock))
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        db.close()
+    
+    return {'samples': dict(samples), 'errors': dict(errors), 'lock_metrics': db.get_lock_metrics()}
+
+def _prepare_copy(source, target, journal_mode):
+    shutil.copyfile(source, target)
+    conn = sqlite3.connect(target)
+    try:
+        conn.execute(f'PRAGMA journal_mode = {journal_mode}')
+        ids = {
+            'max_request': conn.execute('SELECT MAX(requestID) FROM requests').fetchone()[0],
+            'users': [row[0] for row in conn.execute('SELECT userID FROM users LIMIT 1000')],
+            'masters': [row[0] for row in conn.execute("SELECT userID FROM users WHERE type = 'Мастер'")],
+            'clients': [row[0] for row in conn.execute("SELECT userID FROM users WHERE type = 'Заказчик' LIMIT 1000")],
+            'parts': [row[0] for row in conn.execute('SELECT partID FROM parts')]
+        }
+    finally:
+        conn.close()
+    return ids
+
+def run_config(source, config, processes=4, writers=4, readers=2, duration=10.0, seed=1, workdir=None):
+    """Прогон одной конфигурации на копии source; возвращает сводку"""
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        path = os.path.join(tmp, 'contention.db')
+        ids = _prepare_copy(source, path, config['journal_mode'])
+        args = [(path, config, ids, writers, readers, duration, seed * 100 + i) for i in range(processes)]
+        
+        started = time.perf_counter()
+        if processes == 1:
+            results = [run_process(*args[0])]
+        else:
+            with multiprocessing.get_context('spawn').Pool(processes) as pool:
+                results = pool.starmap(run_process, args)
+        elapsed = time.perf_counter() - started
+    
+    return summarize(config, results, duration, elapsed)
+
+def summarize(config, results, duration, elapsed):
+    """Сводка по результатам процессов"""
+    samples, errors = defaultdict(list), defaultdict(lambda: [0, 0])
+    transactions = retries = failures = 0
+    lock_wait_total = lock_wait_max = 0.0
+    for result in results:
+        for op, values in result['samples'].items():
+            samples[op].extend(values)
+        for op, (locked, other) in result['errors'].items():
+            errors[op][0] += locked
+            errors[op][1] += other
+        metrics = result['lock_metrics']
+        transactions += metrics['transactions']
+        retries += metrics['retries']
+        failures += metrics['failures']
+        lock_wait_total += metrics['lock_wait_avg_ms'] * metrics['transactions']
+        lock_wait_max = max(lock_wait_max, metrics['lock_wait_max_ms'])
+    
+    operations = {}
+    for op in OPERATIONS:
+        values, (locked, other) = samples.get(op, []), errors.get(op, (0, 0))
+        attempts = len(values) + locked + other
+        if not attempts:
+            continue
+        operations[op] = {
+            'count': len(values),
+            'locked': locked,
+            'errors': other,
+            'locked_rate': round(locked / attempts, 4),
+            'p50_ms': round(percentile(values, 50), 3),
+            'p99_ms': round(percentile(values, 99), 3)
+        }
+    
+    def group(mix):
+        values = [v for op in mix for v in samples.get(op, ())]
+        locked = sum(errors[op][0] for op in mix if op in errors)
+        attempts = len(values) + locked + sum(errors[op][1] for op in mix if op in errors)
+        return {
+            'ops_per_s': round(len(values) / duration, 1),
+            'p50_ms': round(percentile(values, 50), 3),
+            'p99_ms': round(percentile(values, 99), 3),
+            'locked_rate': round(locked / attempts, 4) if attempts else 0.0
+        }
+    
+    return {
+        'config': config,
+        'name': config_name(config),
+        'elapsed_s': round(elapsed, 3),
+        'writes': group(WRITE_MIX),
+        'reads': group(READ_MIX),
+        'lock_wait_avg_ms': round(lock_wait_total / transactions, 3) if transactions else 0.0,
+        'lock_wait_max_ms': round(lock_wait_max, 3),
+        'retries': retries,
+        'failures': failures,
+        'operations': operations
+    }
+
+def run_contention(source, journal_modes=('delete', 'wal'), busy_timeouts=(0.1, 1.0, 5.0), write_queue=True,
+                   processes=4, writers=4, readers=2, duration=10.0, seed=1, log=print):
+    """Прогон всех конфигураций; возвращает словарь результатов для JSON"""
+    runs = []
+    for config in _configurations(journal_modes, busy_timeouts, write_queue):
+        summary = run_config(source, config, processes, writers, readers, duration, seed,
+                             os.path.dirname(os.path.abspath(source)))
+        runs.append(summary)
+        log(f"[{summary['name']}] запись: {summary['writes']['ops_per_s']}/с, p99 {summary['writes']['p99_ms']:.1f} мс, "
+            f"locked {summary['writes']['locked_rate']:.1%}; чтение: {summary['reads']['ops_per_s']}/с, "
+            f"p99 {summary['reads']['p99_ms']:.1f} мс")
+    
+    return {
+        'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'source': os.path.abspath(source),
+        'processes': processes,
+        'writers': writers,
+        'readers': readers,
+        'duration_s': duration,
+        'runs': runs
+    }
+
+def format_report(results):
+    lines = [f"{'Конфигурация':<22} {'Зап./с':>8} {'p99 зап.':>9} {'locked':>7} {'Чт./с':>8} {'p99 чт.':>9} "
+             f"{'Ожид. ср.':>10} {'Ожид. макс.':>12} {'Повторы':>8}"]
+    for run in results['runs']:
+        lines.append(f"{run['name']:<22} {run['writes']['ops_per_s']:>8.1f} {run['writes']['p99_ms']:>9.1f} "
+                     f"{run['writes']['locked_rate']:>7.1%} {run['reads']['ops_per_s']:>8.1f} "
+                     f"{run['reads']['p99_ms']:>9.1f} {run['lock_wait_avg_ms']:>10.1f} "
+                     f"{run['lock_wait_max_ms']:>12.1f} {run['retries']:>8}")
+    return '\n'.join(lines)
+
+def save_chart(results, path):
+    """Книга Excel с таблицей результатов и диаграммами по конфигурациям"""
+    import openpyxl
+    from openpyxl.chart import BarChart, Reference
+    from openpyxl.styles import Font
+    
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Конкуренция"
+    
+    headers = ['Конфигурация', 'Записей/с', 'Чтений/с', 'p99 записи, мс', 'p99 чтения, мс',
+               'Доля locked, %', 'Ожидание блокировки, мс', 'Повторы']
+    ws.append(headers)
+    for cell in ws[1]:
+        cell.font = Font(bold=True)
+    for run in results['runs']:
+        ws.append([run['name'], run['writes']['ops_per_s'], run['reads']['ops_per_s'],
+                   run['writes']['p99_ms'], run['reads']['p99_ms'],
+                   round(run['writes']['locked_rate'] * 100, 2), run['lock_wait_avg_ms'], run['retries']])
+    ws.column_dimensions['A'].width = 24
+    for letter in 'BCDEFGH':
+        ws.column_dimensions[letter].width = 16
+    
+    rows = len(results['runs']) + 1
+    categories = Reference(ws, min_col=1, min_row=2, max_row=rows)
+    charts = [
+        ("Пропускная способность, операций/с", 2, 3),
+        ("p99 задержки, мс", 4, 5),
+        ("Доля ошибок database is locked, %", 6, 6),
+        ("Среднее ожидание блокировки, мс", 7, 7)
+    ]
+    for index, (title, first, last) in enumerate(charts):
+        chart = BarChart()
+        chart.title = title
+        chart.height, chart.width = 8, 18
+        chart.add_data(Reference(ws, min_col=first, max_col=last, min_row=1, max_row=rows), titles_from_data=True)
+        chart.set_categories(categories)
+        ws.add_chart(chart, f"J{1 + index * 17}")
+    
+    wb.save(path)
+    return path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Нагрузочный тест одновременной записи в БД")
+    parser.add_argument('--db', help="исходная БД (по умолчанию синтетическая из --requests)")
+    parser.add_argument('--requests', default='10k', help="размер синтетической БД")
+    parser.add_argument('--data-dir', default='data/bench', help="каталог синтетических БД")
+    parser.add_argument('--seed', type=int, default=1, help="seed данных и нагрузки")
+    parser.add_argument('--processes', type=int, default=4, help="процессов (экземпляров приложения)")
+    parser.add_argument('--writers', type=int, default=4, help="потоков-писателей в процессе")
+    parser.add_argument('--readers', type=int, default=2, help="потоков-читателей в процессе")
+    parser.add_argument('--duration', type=float, default=10.0, help="длительность прогона, с")
+    parser.add_argument('--journal-modes', default='delete,wal', help="режимы журнала SQLite")
+    parser.add_argument('--busy-timeouts', default='0.1,1,5', help="значения busy_timeout, с")
+    parser.add_argument('--write-queue', action='store_true', help="добавить прогоны с очередью записи")
+    parser.add_argument('--output', help="файл результатов JSON")
+    parser.add_argument('--chart', help="книга Excel с диаграммами")
+    args = parser.parse_args(argv)
+    
+    source = args.db
+    if source is None:
+        os.makedirs(args.data_dir, exist_ok=True)
+        count = parse_count(args.requests)
+        source = build_database(os.path.join(args.data_dir, f'requests_{count}_seed{args.seed}.db'), count, args.seed)
+    
+    results = run_contention(source, args.journal_modes.split(','),
+                             [float(value) for value in args.busy_timeouts.split(',')], args.write_queue,
+                             args.processes, args.writers, args.readers, args.duration, args.seed)
+    print()
+    print(format_report(results))
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.chart:
+        print(f"Диаграммы: {save_chart(results, args.chart)}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,23 @@
+import os
+from utils.data_generator import DataGenerator, parse_count
+
+def build_database(path, requests, seed=1):
+    """Синтетическая БД с заданным числом заявок (готовый файл используется повторно)"""
+    from database import Database
+    
+    if os.path.exists(path):
+        return path
+    
+    # Сборка во временный файл: прерванная генерация не оставляет неполную БД
+    tmp_path = path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    
+    db = Database(tmp_path)
+    try:
+        DataGenerator(db, seed).generate(requests)
+    finally:
+        db.close()
+    
+    os.replace(tmp_path, path)
+    return path
\ No newline at end of file
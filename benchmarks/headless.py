@@ -0,0 +1,52 @@
+"""Замены виджетов Tk для вызова методов форм без дисплея"""
+from types import SimpleNamespace
+
+class FakeVar:
+    """Замена tk.StringVar"""
+    
+    def __init__(self, value=''):
+        self.value = value
+    
+    def get(self):
+        return self.value
+    
+    def set(self, value):
+        self.value = value
+
+class FakeTree:
+    """Замена ttk.Treeview: строки хранятся в словаре"""
+    
+    def __init__(self):
+        self.rows = {}
+        self._counter = 0
+    
+    def get_children(self, item=''):
+        return tuple(self.rows)
+    
+    def delete(self, *items):
+        for item in items:
+            self.rows.pop(item, None)
+    
+    def insert(self, parent, index, iid=None, **options):
+        self._counter += 1
+        iid = iid or f'I{self._counter:06X}'
+        self.rows[iid] = dict(options)
+        return iid
+    
+    def item(self, item, **options):
+        if options:
+            self.rows[item].update(options)
+        return self.rows[item]
+    
+    def tag_configure(self, tag, **options):
+        pass
+
+def main_form(db, search='', status='Все', tech_type='Все'):
+    """Объект с полями MainForm, нужными filter_requests"""
+    return SimpleNamespace(db=db, search_box=FakeVar(search), status_filter=FakeVar(status),
+                           tech_filter=FakeVar(tech_type), requests_tree=FakeTree())
+
+def statistics_form(db, period='all', start_date='', end_date=''):
+    """Объект с полями StatisticsForm, нужными _calculate_statistics"""
+    return SimpleNamespace(db=db, period_var=FakeVar(period), start_date_var=FakeVar(start_date),
+                           end_date_var=FakeVar(end_date))
\ No newline at end of file
@@ -0,0 +1,281 @@
+"""Набор замеров производительности без графического интерфейса
+
+python -m benchmarks.suite --sizes 1k,100k [--baseline benchmarks/baseline.json] [--threshold 0.25]
+
+Для каждого размера создается (или берется готовая) синтетическая БД, на
+ней замеряются поиск, статистика, заполнение таблицы заявок, экспорт,
+резервное копирование и отчеты. Результаты сохраняются в JSON и
+сравниваются с базовыми (benchmarks/baseline.json); замедление сверх
+порога дает код возврата 1, отсутствие базовых значений в CI (переменная
+CI или --require-baseline) - код 2.
+
+Базовые значения - абсолютное время на одной машине: benchmarks/baseline.json
+снят на машине разработчика и годится только как образец. Перед
+сравнением базу нужно снять заново на той же машине (--save-baseline на
+исходной версии кода); при другой платформе или версии Python выводится
+предупреждение. CI (.github/workflows/ci.yml) так и делает: снимает базу
+на коммите, в который вливается изменение, на том же раннере и сравнивает
+с более широким порогом.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from . import headless
+from .datasets import build_database, parse_count
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Ограничение суммарного времени повторов одного замера, с
+TIME_BUDGET = 30.0
+
+def _search(ctx):
+    ctx.db.search_requests('Samsung', {})
+
+def _search_filtered(ctx):
+    ctx.db.search_requests('', {'status': 'Новая заявка', 'tech_type': 'Холодильник'}, limit=100)
+
+def _statistics(ctx):
+    ctx.db.get_statistics()
+
+def _filter_requests(ctx):
+    from forms.main_form import MainForm
+    MainForm.filter_requests(headless.main_form(ctx.db))
+
+def _calculate_statistics(ctx):
+    from forms.statistics_form import StatisticsForm
+    StatisticsForm._calculate_statistics(headless.statistics_form(ctx.db))
+
+def _export_csv(ctx):
+    from utils.exporters import DataExporter
+    DataExporter(ctx.db).export_requests('csv')
+
+def _export_excel(ctx):
+    from utils.exporters import DataExporter
+    DataExporter(ctx.db).export_requests('excel')
+
+def _export_statistics(ctx):
+    from utils.exporters import DataExporter
+    DataExporter(ctx.db).export_statistics()
+
+def _backup(ctx):
+    from utils.backup import DatabaseBackup
+    DatabaseBackup.create_backup(ctx.db_path, 'data/backups')
+
+def _backup_zip(ctx):
+    from utils.backup import DatabaseBackup
+    DatabaseBackup.create_zip_backup(ctx.db_path, 'data/backups')
+
+def _daily_report(ctx):
+    from utils.generators import ReportGenerator
+    ReportGenerator.generate_daily_report(ctx.db)
+
+def _masters_report(ctx):
+    from utils.analytics import RequestAnalytics
+    RequestAnalytics(ctx.db).master_throughput()
+
+def _tech_report(ctx):
+    from utils.analytics import RequestAnalytics
+    RequestAnalytics(ctx.db).tech_type_summary()
+
+# Имя замера -> (функция, максимальное число заявок или None)
+CASES = {
+    'search_requests': (_search, None),
+    'search_requests_filtered': (_search_filtered, None),
+    'get_statistics': (_statistics, None),
+    'filter_requests': (_filter_requests, 100_000),
+    'calculate_statistics': (_calculate_statistics, None),
+    'export_csv': (_export_csv, 100_000),
+    'export_excel': (_export_excel, 100_000),
+    'export_statistics': (_export_statistics, None),
+    'backup': (_backup, None),
+    'backup_zip': (_backup_zip, None),
+    'report_daily': (_daily_report, None),
+    'report_masters': (_masters_report, None),
+    'report_tech': (_tech_report, None)
+}
+
+class Context:
+    """Окружение замера: БД и путь к ее файлу"""
+    
+    def __init__(self, db, db_path):
+        self.db = db
+        self.db_path = db_path
+
+@contextmanager
+def _working_directory(path):
+    # Экспорт и резервные копии пишут в data/... относительно текущего каталога
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+def measure(func, ctx, repeat=5, budget=TIME_BUDGET):
+    """Медиана и разброс времени выполнения (мс): прогрев и до repeat повторов"""
+    started = time.perf_counter()
+    func(ctx)
+    warmup = (time.perf_counter() - started) * 1000
+    
+    # Долгий прогрев (экспорт больших БД) сам служит единственным замером
+    times = [warmup] if warmup > budget * 1000 / repeat else []
+    while len(times) < repeat and sum(times) < budget * 1000:
+        started = time.perf_counter()
+        func(ctx)
+        times.append((time.perf_counter() - started) * 1000)
+    
+    return {
+        'median_ms': round(statistics.median(times), 3),
+        'min_ms': round(min(times), 3),
+        'max_ms': round(max(times), 3),
+        'runs': len(times)
+    }
+
+def run_suite(sizes=('1k', '100k'), cases=None, repeat=5, data_dir='data/bench', seed=1, log=print):
+    """Прогон замеров по размерам; возвращает словарь результатов для JSON"""
+    from database import Database
+    
+    os.makedirs(data_dir, exist_ok=True)
+    results = {}
+    
+    for size in sizes:
+        count = parse_count(size)
+        db_path = os.path.abspath(os.path.join(data_dir, f'requests_{count}_seed{seed}.db'))
+        
+        started = time.perf_counter()
+        build_database(db_path, count, seed)
+        log(f"[{size}] БД: {db_path} ({time.perf_counter() - started:.1f} с)")
+        
+        db = Database(db_path)
+        try:
+            with tempfile.TemporaryDirectory() as workdir, _working_directory(workdir):
+                ctx = Context(db, db_path)
+                for name in cases or CASES:
+                    func, max_requests = CASES[name]
+                    if max_requests is not None and count > max_requests:
+                        continue
+                    
+                    result = measure(func, ctx, repeat)
+                    results[f"{size}/{name}"] = result
+                    log(f"[{size}] {name}: {result['median_ms']:.1f} мс")
+        finally:
+            db.close()
+    
+    return {
+        'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'results': results
+    }
+
+def compare(current, baseline, threshold=0.25, min_delta_ms=5.0):
+    """Сравнение с базовыми результатами
+    
+    Замедлением считается рост медианы больше чем на threshold (доля) и
+    больше чем на min_delta_ms, чтобы шум быстрых замеров не давал ложных
+    срабатываний. Возвращает список строк сравнения и список замедлений.
+    """
+    rows, regressions = [], []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        
+        change = result['median_ms'] / base['median_ms'] - 1 if base['median_ms'] else 0.0
+        row = {
+            'name': name,
+            'baseline_ms': base['median_ms'],
+            'current_ms': result['median_ms'],
+            'change': round(change, 4)
+        }
+        rows.append(row)
+        if change > threshold and result['median_ms'] - base['median_ms'] > min_delta_ms:
+            regressions.append(row)
+    
+    return rows, regressions
+
+def format_comparison(rows, threshold):
+    lines = [f"{'Замер':<40} {'База, мс':>10} {'Сейчас, мс':>11} {'Изм.':>8}"]
+    for row in rows:
+        mark = ' !' if row['change'] > threshold else ''
+        lines.append(f"{row['name']:<40} {row['baseline_ms']:>10.1f} {row['current_ms']:>11.1f} "
+                     f"{row['change'] * 100:>+7.1f}%{mark}")
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры производительности на синтетических БД")
+    parser.add_argument('--sizes', default='1k,100k', help="размеры наборов: 1k,100k,1m или числа")
+    parser.add_argument('--cases', help="замеры через запятую (по умолчанию все)")
+    parser.add_argument('--repeat', type=int, default=5, help="повторов каждого замера")
+    parser.add_argument('--data-dir', default='data/bench', help="каталог синтетических БД")
+    parser.add_argument('--seed', type=int, default=1, help="seed генератора данных")
+    parser.add_argument('--output', help="файл результатов JSON")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="базовые результаты для сравнения")
+    parser.add_argument('--threshold', type=float, default=0.25, help="допустимое замедление (доля)")
+    parser.add_argument('--save-baseline', action='store_true', help="сохранить результаты как базовые")
+    parser.add_argument('--require-baseline', action=argparse.BooleanOptionalAction,
+                        default=bool(os.environ.get('CI')),
+                        help="без базовых результатов - ошибка (по умолчанию в CI)")
+    args = parser.parse_args(argv)
+    
+    cases = args.cases.split(',') if args.cases else None
+    unknown = [name for name in cases or () if name not in CASES]
+    if unknown:
+        parser.error(f"неизвестные замеры: {', '.join(unknown)}")
+    
+    data_dir = os.path.abspath(args.data_dir)
+    current = run_suite(args.sizes.split(','), cases, args.repeat, data_dir, args.seed)
+    
+    output = args.output or os.path.join(data_dir, f"results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(current, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты: {output}")
+    
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"Базовые результаты: {args.baseline}")
+        return 0
+    
+    if not os.path.exists(args.baseline):
+        if args.require_baseline:
+            print(f"Базовых результатов нет: {args.baseline} (--save-baseline)")
+            return 2
+        print("Базовых результатов нет - сравнение пропущено (--save-baseline)")
+        return 0
+    
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    
+    machine = ('platform', 'python')
+    if any(baseline.get(key) != current[key] for key in machine):
+        print(f"Внимание: базовые результаты сняты на другой машине "
+              f"({', '.join(str(baseline.get(key)) for key in machine)}); "
+              f"снимите их здесь заново (--save-baseline)")
+    
+    rows, regressions = compare(current, baseline, args.threshold)
+    print(format_comparison(rows, args.threshold))
+    
+    # Замеры без базового значения не проверяются - в CI это ошибка
+    missing = sorted(set(current['results']) - set(baseline['results']))
+    if missing:
+        print(f"\nНет базовых значений: {', '.join(missing)}")
+        if args.require_baseline:
+            return 2
+    
+    if regressions:
+        print(f"\nЗамедление больше {args.threshold:.0%}: {', '.join(row['name'] for row in regressions)}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -3,152 +3,108 @@ import csv
 import os
 from datetime import datetime
 import json
+from models import SLA_DAYS, DEFAULT_SLA_DAYS
+from storage import create_backend
 
 class Database:
     """Класс для работы с базой данных"""
     
-    def __init__(self, db_name='repair_service.db'):
+    def __init__(self, db_name='repair_service.db', concurrent=False, busy_timeout=5.0, backend=None,
+                 migrate=True):
         self.db_name = db_name
-        self.init_database()
-        self.create_demo_data()
+        self.concurrent = concurrent
+        self.busy_timeout = busy_timeout
+        self.write_queue = None
+        
+        # Файл SQLite или адрес postgresql://...
+        self.backend = backend or create_backend(db_name, busy_timeout=busy_timeout, wal=concurrent)
+        self.dialect = self.backend.dialect
+        
+        from utils.query_profiler import QueryProfiler
+        self.profiler = QueryProfiler(dialect=self.dialect)
+        
+        from utils.write_queue import LockMetrics
+        self.lock_metrics = LockMetrics()
+        
+        # Демо-данные проверяются, только если схема создавалась или обновлялась
+        if migrate and self.init_database():
+            self.create_demo_data()
+        
+        # Многопользовательский режим: записи через очередь единственного писателя
+        if concurrent:
+            from utils.write_queue import WriteQueue
+            self.write_queue = WriteQueue(self)
+            self.write_queue.start()
     
-    def get_connection(self):
+    def get_connection(self, check_same_thread=True):
         """Получить соединение с БД"""
-        conn = sqlite3.connect(self.db_name)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return self.profiler.wrap(self.backend.connect(check_same_thread=check_same_thread))
+    
+    def _write(self, operation):
+        """Выполнить запись operation(cursor) отдельной транзакцией
+        
+        В многопользовательском режиме операция ставится в очередь записи и
+        фиксируется вместе с другими; иначе выполняется сразу с повтором
+        при блокировке БД.
+        """
+        if self.write_queue:
+            return self.write_queue.execute(operation)
+        
+        from utils.write_queue import run_transaction
+        
+        conn = self.get_connection()
+        try:
+            [(ok, result)] = run_transaction(conn, [operation], self.lock_metrics)
+        finally:
+            self.release_connection(conn)
+        
+        if not ok:
+            raise result
+        return result
+    
+    def release_connection(self, conn):
+        """Освободить соединение, полученное через get_connection"""
+        conn.close()
+    
+    def get_lock_metrics(self):
+        """Метрики ожидания блокировок при записи"""
+        return self.lock_metrics.snapshot()
+    
+    def close(self):
+        """Завершение работы: запись оставшихся операций из очереди"""
+        if self.write_queue:
+            self.write_queue.stop()
+            self.write_queue = None
+        self.backend.close()
+    
+    def bulk_insert(self, table, columns, rows):
+        """Пакетная вставка строк (COPY в PostgreSQL); возвращает количество"""
+        return self.backend.bulk_insert(table, columns, rows)
+    
+    def stream_query(self, query, params=(), batch_size=500):
+        """Построчное чтение большого результата (словари)"""
+        return self.backend.stream(query, params, batch_size)
     
     def init_database(self):
-        """Инициализация базы данных"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Таблица пользователей
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    userID INTEGER PRIMARY KEY AUTOINCREMENT,
-                    fio TEXT NOT NULL,
-                    phone TEXT NOT NULL,
-                    login TEXT UNIQUE NOT NULL,
-                    password TEXT NOT NULL,
-                    type TEXT NOT NULL CHECK(type IN ('Менеджер', 'Мастер', 'Оператор', 'Заказчик', 'Менеджер качества')),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    is_active INTEGER DEFAULT 1
-                )
-            ''')
-            
-            # Таблица заявок
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS requests (
-                    requestID INTEGER PRIMARY KEY AUTOINCREMENT,
-                    startDate DATE NOT NULL,
-                    homeTechType TEXT NOT NULL,
-                    homeTechModel TEXT NOT NULL,
-                    problemDescription TEXT NOT NULL,
-                    requestStatus TEXT NOT NULL CHECK(requestStatus IN ('Новая заявка', 'В процессе ремонта', 'Ожидание запчастей', 'Готова к выдаче')),
-                    completionDate DATE,
-                    repairParts TEXT,
-                    masterID INTEGER,
-                    clientID INTEGER NOT NULL,
-                    qualityManagerID INTEGER,
-                    extendedDeadline DATE,
-                    estimatedCost REAL DEFAULT 0,
-                    actualCost REAL DEFAULT 0,
-                    priority INTEGER DEFAULT 1 CHECK(priority BETWEEN 1 AND 5),
-                    notes TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (masterID) REFERENCES users(userID) ON DELETE SET NULL,
-                    FOREIGN KEY (clientID) REFERENCES users(userID) ON DELETE CASCADE,
-                    FOREIGN KEY (qualityManagerID) REFERENCES users(userID) ON DELETE SET NULL
-                )
-            ''')
-            
-            # Таблица комментариев
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS comments (
-                    commentID INTEGER PRIMARY KEY AUTOINCREMENT,
-                    message TEXT NOT NULL,
-                    masterID INTEGER NOT NULL,
-                    requestID INTEGER NOT NULL,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    is_private INTEGER DEFAULT 0,
-                    FOREIGN KEY (masterID) REFERENCES users(userID) ON DELETE CASCADE,
-                    FOREIGN KEY (requestID) REFERENCES requests(requestID) ON DELETE CASCADE
-                )
-            ''')
-            
-            # Таблица статистики
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS statistics (
-                    statID INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date DATE NOT NULL,
-                    total_requests INTEGER DEFAULT 0,
-                    completed_requests INTEGER DEFAULT 0,
-                    avg_repair_time REAL DEFAULT 0,
-                    total_revenue REAL DEFAULT 0,
-                    UNIQUE(date)
-                )
-            ''')
-            
-            # Таблица запчастей
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS parts (
-                    partID INTEGER PRIMARY KEY AUTOINCREMENT,
-                    partName TEXT NOT NULL,
-                    vendorCode TEXT UNIQUE,
-                    price REAL,
-                    quantity INTEGER DEFAULT 0,
-                    min_quantity INTEGER DEFAULT 5,
-                    supplier TEXT,
-                    last_ordered DATE
-                )
-            ''')
-            
-            # Таблица связей запчастей и заявок
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS request_parts (
-                    requestID INTEGER NOT NULL,
-                    partID INTEGER NOT NULL,
-                    quantity INTEGER NOT NULL,
-                    used_date DATE DEFAULT CURRENT_DATE,
-                    PRIMARY KEY (requestID, partID),
-                    FOREIGN KEY (requestID) REFERENCES requests(requestID) ON DELETE CASCADE,
-                    FOREIGN KEY (partID) REFERENCES parts(partID) ON DELETE CASCADE
-                )
-            ''')
-            
-            # Таблица уведомлений
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS notifications (
-                    notificationID INTEGER PRIMARY KEY AUTOINCREMENT,
-                    userID INTEGER NOT NULL,
-                    message TEXT NOT NULL,
-                    type TEXT NOT NULL,
-                    is_read INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (userID) REFERENCES users(userID) ON DELETE CASCADE
-                )
-            ''')
-            
-            # Индексы для оптимизации
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_requests_status ON requests(requestStatus)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_requests_master ON requests(masterID)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_requests_client ON requests(clientID)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_comments_request ON comments(requestID)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_type ON users(type)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_requests_priority ON requests(priority)')
-            
-            # Триггер для обновления updated_at
-            cursor.execute('''
-                CREATE TRIGGER IF NOT EXISTS update_requests_timestamp 
-                AFTER UPDATE ON requests
-                BEGIN
-                    UPDATE requests SET updated_at = CURRENT_TIMESTAMP WHERE requestID = NEW.requestID;
-                END;
-            ''')
-            
-            conn.commit()
+        """Инициализация базы данных: применение миграций схемы; возвращает примененные"""
+        if self.concurrent and self.dialect == 'sqlite':
+            with self.get_connection() as conn:
+                conn.execute('PRAGMA journal_mode = WAL')
+        
+        # Схема описана миграциями (каталог migrations); актуальная схема не трогается
+        return self.migrate()
+    
+    def migrate(self, dry_run=False):
+        """Применение версионных миграций схемы (каталог migrations)"""
+        from utils.migrations import Migrator
+        return Migrator(self).migrate(dry_run)
+    
+    @staticmethod
+    def _due_date_expression(row='NEW'):
+        """SQL-выражение крайнего срока: продленный срок или startDate + норматив приоритета"""
+        cases = ' '.join(f"WHEN {priority} THEN {days}" for priority, days in sorted(SLA_DAYS.items()))
+        return (f"COALESCE({row}.extendedDeadline, "
+                f"date({row}.startDate, '+' || CASE {row}.priority {cases} ELSE {DEFAULT_SLA_DAYS} END || ' days'))")
     
     def create_demo_data(self):
         """Создание демо-данных"""
@@ -234,6 +190,8 @@ class Database:
                 
                 conn.commit()
                 print("Демо-данные созданы успешно!")
+                
+                self.rebuild_repair_sketches()
     
     def get_statistics(self):
         """Получение статистики"""
@@ -346,72 +304,165 @@ class Database:
             cursor.execute(query, params)
             return [dict(row) for row in cursor.fetchall()]
     
-    def search_requests(self, search_term, filters=None):
+    def search_requests(self, search_term, filters=None, limit=None, offset=0):
         """Поиск заявок с фильтрами"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
+            conditions, params = self._search_conditions(search_term, filters)
             query = '''
                 SELECT r.*, c.fio as client_name, m.fio as master_name
                 FROM requests r
                 LEFT JOIN users c ON r.clientID = c.userID
                 LEFT JOIN users m ON r.masterID = m.userID
                 WHERE 1=1
-            '''
-            
-            params = []
-            
-            # Поиск по тексту
-            if search_term:
-                query += '''
-                    AND (r.requestID LIKE ? OR 
-                         r.homeTechType LIKE ? OR 
-                         r.homeTechModel LIKE ? OR 
-                         r.problemDescription LIKE ? OR
-                         c.fio LIKE ? OR
-                         m.fio LIKE ?)
-                '''
-                search_param = f"%{search_term}%"
-                params.extend([search_param] * 6)
-            
-            # Применение фильтров
-            if filters:
-                if filters.get('status'):
-                    query += " AND r.requestStatus = ?"
-                    params.append(filters['status'])
-                
-                if filters.get('tech_type'):
-                    query += " AND r.homeTechType = ?"
-                    params.append(filters['tech_type'])
-                
-                if filters.get('master_id'):
-                    query += " AND r.masterID = ?"
-                    params.append(filters['master_id'])
-                
-                if filters.get('priority'):
-                    query += " AND r.priority = ?"
-                    params.append(filters['priority'])
-                
-                if filters.get('date_from'):
-                    query += " AND r.startDate >= ?"
-                    params.append(filters['date_from'])
-                
-                if filters.get('date_to'):
-                    query += " AND r.startDate <= ?"
-                    params.append(filters['date_to'])
+            ''' + conditions
             
             query += " ORDER BY r.priority DESC, r.startDate DESC"
             
+            if limit is not None:
+                query += " LIMIT ? OFFSET ?"
+                params.extend([limit, offset])
+            
             cursor.execute(query, params)
             return [dict(row) for row in cursor.fetchall()]
     
-    def update_request_status(self, request_id, status, completion_date=None):
-        """Обновление статуса заявки"""
+    def count_requests(self, search_term, filters=None):
+        """Количество заявок, подходящих под поиск и фильтры"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            conditions, params = self._search_conditions(search_term, filters)
+            query = '''
+                SELECT COUNT(*)
+                FROM requests r
+                LEFT JOIN users c ON r.clientID = c.userID
+                LEFT JOIN users m ON r.masterID = m.userID
+                WHERE 1=1
+            ''' + conditions
+            
+            cursor.execute(query, params)
+            return cursor.fetchone()[0]
+    
+    def get_requests_version(self):
+        """Версия набора заявок для ETag: (версия requests, версия users)
+        
+        Версия таблицы - максимальный row_version (номер последнего изменения
+        строки, ставят триггеры) и число строк, чтобы учесть удаление (в
+        списках и карточке заявки есть имена клиентов и мастеров).
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT (SELECT MAX(row_version) FROM requests), (SELECT COUNT(*) FROM requests),
+                       (SELECT MAX(row_version) FROM users), (SELECT COUNT(*) FROM users)
+            ''')
+            row = tuple(cursor.fetchone())
+            return row[:2], row[2:]
+    
+    def get_request(self, request_id):
+        """Получение заявки по номеру"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT r.*, c.fio as client_name, c.phone as client_phone,
+                       m.fio as master_name, qm.fio as qm_name
+                FROM requests r
+                LEFT JOIN users c ON r.clientID = c.userID
+                LEFT JOIN users m ON r.masterID = m.userID
+                LEFT JOIN users qm ON r.qualityManagerID = qm.userID
+                WHERE r.requestID = ?
+            ''', (request_id,))
+            
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
+    def get_request_comments(self, request_id, include_private=True):
+        """Комментарии к заявке"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            query = '''
+                SELECT c.*, u.fio as author_name
+                FROM comments c
+                LEFT JOIN users u ON c.masterID = u.userID
+                WHERE c.requestID = ?
+            '''
+            
+            if not include_private:
+                query += " AND c.is_private = 0"
+            
+            query += " ORDER BY c.timestamp DESC"
+            
+            cursor.execute(query, (request_id,))
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_parts(self):
+        """Получение списка запчастей"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            if status == 'Готова к выдаче' and not completion_date:
-                completion_date = datetime.now().strftime("%Y-%m-%d")
+            cursor.execute('SELECT * FROM parts ORDER BY partName')
+            return [dict(row) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def _search_conditions(search_term, filters=None):
+        """Условия WHERE и параметры для поиска заявок"""
+        query = ''
+        params = []
+        
+        # Поиск по тексту
+        if search_term:
+            query += '''
+                AND (r.requestID LIKE ? OR 
+                     r.homeTechType LIKE ? OR 
+                     r.homeTechModel LIKE ? OR 
+                     r.problemDescription LIKE ? OR
+                     c.fio LIKE ? OR
+                     m.fio LIKE ?)
+            '''
+            search_param = f"%{search_term}%"
+            params.extend([search_param] * 6)
+        
+        # Применение фильтров
+        if filters:
+            if filters.get('status'):
+                query += " AND r.requestStatus = ?"
+                params.append(filters['status'])
+            
+            if filters.get('tech_type'):
+                query += " AND r.homeTechType = ?"
+                params.append(filters['tech_type'])
+            
+            if filters.get('master_id'):
+                query += " AND r.masterID = ?"
+                params.append(filters['master_id'])
+            
+            if filters.get('priority'):
+                query += " AND r.priority = ?"
+                params.append(filters['priority'])
+            
+            if filters.get('date_from'):
+                query += " AND r.startDate >= ?"
+                params.append(filters['date_from'])
+            
+            if filters.get('date_to'):
+                query += " AND r.startDate <= ?"
+                params.append(filters['date_to'])
+        
+        return query, params
+    
+    def update_request_status(self, request_id, status, completion_date=None):
+        """Обновление статуса заявки"""
+        if status == 'Готова к выдаче' and not completion_date:
+            completion_date = datetime.now().strftime("%Y-%m-%d")
+        
+        def operation(cursor):
+            cursor.execute('SELECT requestStatus, completionDate FROM requests WHERE requestID = ?',
+                           (request_id,))
+            previous = cursor.fetchone()
             
             cursor.execute('''
                 UPDATE requests 
@@ -421,23 +472,176 @@ class Database:
                 WHERE requestID = ?
             ''', (status, completion_date, request_id))
             
+            updated = cursor.rowcount > 0
+            
+            # Учет длительности ремонта: завершение, повторное открытие, смена даты
+            if updated:
+                old = (previous['requestStatus'], previous['completionDate'] and str(previous['completionDate']))
+                if old != (status, completion_date):
+                    self.refresh_repair_sketches(self.completion_periods(*old, status, completion_date), cursor)
+            
+            return updated
+        
+        return self._write(operation)
+    
+    @staticmethod
+    def completion_periods(old_status, old_date, new_status, new_date):
+        """Дни завершения, скетчи которых затрагивает изменение заявки"""
+        periods = set()
+        if old_status == 'Готова к выдаче' and old_date:
+            periods.add(str(old_date))
+        if new_status == 'Готова к выдаче' and new_date:
+            periods.add(str(new_date))
+        return sorted(periods)
+    
+    def refresh_repair_sketches(self, periods, cursor=None):
+        """Пересчитать скетчи перцентилей за дни завершения periods
+        
+        Значение из скетча не удалить: при повторном открытии заявки, смене
+        даты завершения, мастера или типа техники прежняя длительность
+        осталась бы в скетче. Поэтому затронутые дни пересчитываются целиком
+        по завершенным заявкам (индекс idx_requests_completed).
+        """
+        if not periods:
+            return
+        if cursor is None:
+            self._write(lambda cursor: self.refresh_repair_sketches(periods, cursor))
+            return
+        
+        placeholders = ', '.join('?' * len(periods))
+        sketches = self._collect_repair_sketches(cursor, f"AND completionDate IN ({placeholders})", periods)
+        
+        cursor.execute(f'DELETE FROM repair_time_sketches WHERE period IN ({placeholders})', tuple(periods))
+        self._insert_repair_sketches(cursor, sketches)
+    
+    def _collect_repair_sketches(self, cursor, condition='', params=()):
+        """Скетчи {(день завершения, измерение, ключ): скетч} по завершенным заявкам"""
+        from utils.sketches import QuantileSketch
+        
+        cursor.execute(f'''
+            SELECT completionDate, homeTechType, masterID,
+                   julianday(completionDate) - julianday(startDate) as days
+            FROM requests
+            WHERE requestStatus = 'Готова к выдаче' AND completionDate IS NOT NULL {condition}
+        ''', tuple(params))
+        
+        sketches = {}
+        for row in cursor:
+            if row['days'] is None:
+                continue
+            for dimension, dim_key in self._sketch_keys(row['homeTechType'], row['masterID']):
+                key = (str(row['completionDate']), dimension, dim_key)
+                sketches.setdefault(key, QuantileSketch()).add(row['days'])
+        return sketches
+    
+    @staticmethod
+    def _insert_repair_sketches(cursor, sketches):
+        cursor.executemany('''
+            INSERT INTO repair_time_sketches (period, dimension, dim_key, count, sketch)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(period, dimension, dim_key, sketch.count, sketch.to_json())
+              for (period, dimension, dim_key), sketch in sketches.items()])
+    
+    @staticmethod
+    def _sketch_keys(tech_type, master_id):
+        """Измерения, в которых учитывается длительность ремонта"""
+        keys = [('all', ''), ('tech_type', tech_type or '')]
+        if master_id is not None:
+            keys.append(('master', str(master_id)))
+        return keys
+    
+    def rebuild_repair_sketches(self):
+        """Полный пересчет скетчей по завершенным заявкам"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            sketches = self._collect_repair_sketches(cursor)
+            cursor.execute('DELETE FROM repair_time_sketches')
+            self._insert_repair_sketches(cursor, sketches)
+            
             conn.commit()
-            return cursor.rowcount > 0
     
-    def add_notification(self, user_id, message, notification_type='info'):
-        """Добавление уведомления"""
+    def get_repair_time_percentiles(self, date_from=None, date_to=None, 
+                                    dimension='all', percentiles=(50, 90, 99)):
+        """Перцентили длительности ремонта за период (по дате завершения)
+        
+        Возвращает словарь {ключ измерения: {'count': n, p: дни, ...}}.
+        Для dimension='all' ключ - пустая строка, для 'master' - ID мастера.
+        """
+        from utils.sketches import QuantileSketch
+        
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
+            query = '''
+                SELECT dim_key, sketch FROM repair_time_sketches
+                WHERE dimension = ?
+            '''
+            params = [dimension]
+            
+            if date_from:
+                query += " AND period >= ?"
+                params.append(date_from)
+            
+            if date_to:
+                query += " AND period <= ?"
+                params.append(date_to)
+            
+            cursor.execute(query, params)
+            
+            merged = {}
+            for row in cursor.fetchall():
+                sketch = QuantileSketch.from_json(row['sketch'])
+                if row['dim_key'] in merged:
+                    merged[row['dim_key']].merge(sketch)
+                else:
+                    merged[row['dim_key']] = sketch
+        
+        result = {}
+        for dim_key, sketch in merged.items():
+            result[dim_key] = {'count': sketch.count}
+            result[dim_key].update(sketch.percentiles(percentiles))
+        
+        return result
+    
+    def add_comment(self, request_id, user_id, message, is_private=False):
+        """Добавление комментария к заявке"""
+        def operation(cursor):
+            cursor.execute('''
+                INSERT INTO comments (message, masterID, requestID, is_private)
+                VALUES (?, ?, ?, ?)
+            ''', (message, user_id, request_id, int(is_private)))
+            return cursor.lastrowid
+        
+        return self._write(operation)
+    
+    def add_notification(self, user_id, message, notification_type='info'):
+        """Добавление уведомления"""
+        def operation(cursor):
             cursor.execute('''
                 INSERT INTO notifications (userID, message, type)
                 VALUES (?, ?, ?)
             ''', (user_id, message, notification_type))
-            
-            conn.commit()
             return cursor.lastrowid
+        
+        return self._write(operation)
     
-    def get_user_notifications(self, user_id, unread_only=False):
+    def add_notifications(self, notifications, cursor=None):
+        """Пакетное добавление уведомлений: список (user_id, message, type)"""
+        notifications = list(notifications)
+        if not notifications:
+            return 0
+        
+        if cursor is None:
+            return self._write(lambda cursor: self.add_notifications(notifications, cursor))
+        
+        cursor.executemany('''
+            INSERT INTO notifications (userID, message, type)
+            VALUES (?, ?, ?)
+        ''', notifications)
+        return len(notifications)
+    
+    def get_user_notifications(self, user_id, unread_only=False, limit=50):
         """Получение уведомлений пользователя"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -450,24 +654,65 @@ class Database:
             if unread_only:
                 query += " AND is_read = 0"
             
-            query += " ORDER BY created_at DESC LIMIT 50"
+            query += " ORDER BY created_at DESC LIMIT ?"
             
-            cursor.execute(query, (user_id,))
+            cursor.execute(query, (user_id, limit))
             return [dict(row) for row in cursor.fetchall()]
     
-    def mark_notification_read(self, notification_id):
-        """Пометить уведомление как прочитанное"""
+    def get_unread_count(self, user_id):
+        """Количество непрочитанных уведомлений (по счетчику)"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
+            cursor.execute('SELECT unread FROM notification_counters WHERE userID = ?', (user_id,))
+            row = cursor.fetchone()
+            return row[0] if row else 0
+    
+    def mark_notification_read(self, notification_id):
+        """Пометить уведомление как прочитанное"""
+        def operation(cursor):
             cursor.execute('''
                 UPDATE notifications 
                 SET is_read = 1 
                 WHERE notificationID = ?
             ''', (notification_id,))
-            
-            conn.commit()
             return cursor.rowcount > 0
+        
+        return self._write(operation)
+    
+    def mark_notifications_read(self, notification_ids):
+        """Пометить несколько уведомлений как прочитанные"""
+        notification_ids = list(notification_ids)
+        
+        def operation(cursor):
+            updated = 0
+            
+            # Пакетами, чтобы не превысить лимит параметров SQLite
+            for start in range(0, len(notification_ids), 500):
+                chunk = notification_ids[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f'''
+                    UPDATE notifications 
+                    SET is_read = 1 
+                    WHERE notificationID IN ({placeholders}) AND is_read = 0
+                ''', chunk)
+                updated += cursor.rowcount
+            
+            return updated
+        
+        return self._write(operation)
+    
+    def mark_all_notifications_read(self, user_id):
+        """Пометить все уведомления пользователя как прочитанные"""
+        def operation(cursor):
+            cursor.execute('''
+                UPDATE notifications 
+                SET is_read = 1 
+                WHERE userID = ? AND is_read = 0
+            ''', (user_id,))
+            return cursor.rowcount
+        
+        return self._write(operation)
     
     def get_low_stock_parts(self):
         """Получение запчастей с низким запасом"""
@@ -482,43 +727,63 @@ class Database:
             
             return [dict(row) for row in cursor.fetchall()]
     
-    def get_overdue_requests(self, days_threshold=7):
-        """Получение просроченных заявок"""
+    def get_overdue_requests(self, days_threshold=0):
+        """Получение просроченных заявок
+        
+        Порог отсчитывается от крайнего срока (dueDate), а не от даты начала:
+        при days_threshold=0 - все открытые заявки со сроком раньше сегодня,
+        как в Request.is_overdue и подсветке строк главной формы.
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
             cursor.execute('''
                 SELECT r.*, c.fio as client_name, m.fio as master_name,
-                       julianday('now') - julianday(r.startDate) as days_passed
+                       julianday('now', 'localtime') - julianday(r.startDate) as days_passed,
+                       julianday('now', 'localtime') - julianday(r.dueDate) as days_overdue
                 FROM requests r
                 LEFT JOIN users c ON r.clientID = c.userID
                 LEFT JOIN users m ON r.masterID = m.userID
                 WHERE r.requestStatus != 'Готова к выдаче'
-                AND julianday('now') - julianday(r.startDate) > ?
-                ORDER BY days_passed DESC
-            ''', (days_threshold,))
+                AND r.dueDate < date('now', 'localtime', ?)
+                ORDER BY r.dueDate
+            ''', (f'-{int(days_threshold)} days',))
             
             return [dict(row) for row in cursor.fetchall()]
     
-    def export_data(self, table_name, format='json'):
-        """Экспорт данных таблицы"""
+    def count_overdue_requests(self, days_threshold=0):
+        """Количество просроченных заявок (только по индексу; порог - как в get_overdue_requests)"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            cursor.execute(f'SELECT * FROM {table_name}')
-            data = [dict(row) for row in cursor.fetchall()]
+            cursor.execute('''
+                SELECT COUNT(*) FROM requests
+                WHERE requestStatus != 'Готова к выдаче'
+                AND dueDate < date('now', 'localtime', ?)
+            ''', (f'-{int(days_threshold)} days',))
             
-            if format == 'json':
-                return json.dumps(data, ensure_ascii=False, indent=2, default=str)
-            elif format == 'csv':
-                import io
-                import csv as csv_module
-                
-                output = io.StringIO()
-                if data:
-                    writer = csv_module.DictWriter(output, fieldnames=data[0].keys())
+            return cursor.fetchone()[0]
+    
+    def export_data(self, table_name, format='json'):
+        """Экспорт данных таблицы"""
+        rows = self.stream_query(f'SELECT * FROM {table_name}')
+        
+        if format == 'csv':
+            import io
+            import csv as csv_module
+            
+            output = io.StringIO()
+            writer = None
+            for row in rows:
+                if writer is None:
+                    writer = csv_module.DictWriter(output, fieldnames=row.keys())
                     writer.writeheader()
-                    writer.writerows(data)
-                return output.getvalue()
-            
-            return data
\ No newline at end of file
+                writer.writerow(row)
+            return output.getvalue()
+        
+        data = list(rows)
+        
+        if format == 'json':
+            return json.dumps(data, ensure_ascii=False, indent=2, default=str)
+        
+        return data
\ No newline at end of file
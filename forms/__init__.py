@@ -1,13 +1,20 @@
-from .login_form import LoginForm
-from .main_form import MainForm
-from .request_form import RequestForm
-from .statistics_form import StatisticsForm
-from .quality_manager_form import QualityManagerForm
+import importlib
 
-__all__ = [
-    'LoginForm',
-    'MainForm',
-    'RequestForm',
-    'StatisticsForm',
-    'QualityManagerForm'
-]
\ No newline at end of file
+# Формы загружаются при первом обращении: окно входа не ждет импорта остальных
+_EXPORTS = {
+    'LoginForm': 'login_form',
+    'MainForm': 'main_form',
+    'RequestForm': 'request_form',
+    'StatisticsForm': 'statistics_form',
+    'QualityManagerForm': 'quality_manager_form',
+    'DiagnosticsForm': 'diagnostics_form'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
\ No newline at end of file
@@ -0,0 +1,208 @@
+import os
+import tkinter as tk
+from tkinter import ttk, messagebox
+from datetime import datetime
+from widgets import Card
+
+class DiagnosticsForm:
+    """Окно диагностики запросов к БД"""
+    
+    REFRESH_MS = 2000
+    
+    def __init__(self, parent, db):
+        self.parent = parent
+        self.db = db
+        self.profiler = db.profiler
+        self.slow_entries = []
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("🩺 Диагностика запросов")
+        self.window.geometry("1100x700")
+        
+        self.setup_ui()
+        self.schedule_refresh()
+    
+    def setup_ui(self):
+        """Настройка интерфейса"""
+        # Панель управления
+        toolbar = ttk.Frame(self.window)
+        toolbar.pack(fill=tk.X, padx=10, pady=10)
+        
+        ttk.Label(toolbar, text="Порог медленного запроса, мс:",
+                 style='Body.TLabel').pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.threshold_var = tk.IntVar(value=self.profiler.threshold_ms)
+        ttk.Spinbox(toolbar, from_=1, to=10000, increment=10,
+                   textvariable=self.threshold_var, width=7,
+                   command=self.apply_threshold).pack(side=tk.LEFT, padx=(0, 20))
+        
+        self.enabled_var = tk.BooleanVar(value=self.profiler.enabled)
+        ttk.Checkbutton(toolbar, text="Профилирование включено",
+                       variable=self.enabled_var,
+                       command=self.toggle_enabled).pack(side=tk.LEFT, padx=(0, 20))
+        
+        ttk.Button(toolbar, text="🔄 Обновить",
+                  command=self.refresh).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(toolbar, text="Сбросить",
+                  command=self.reset).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(toolbar, text="💾 Сохранить JSON",
+                  style='Primary.TButton',
+                  command=self.save_json).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(toolbar, text="📈 Советник индексов",
+                  command=self.advise_indexes).pack(side=tk.LEFT)
+        
+        # Статистика по запросам
+        stats_card = Card(self.window, title="Запросы")
+        stats_card.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        
+        columns = ("Запрос", "Вызовов", "Строк", "Всего, мс", "Сред., мс", "p95, мс", "Макс., мс", "Источник")
+        self.stats_tree = ttk.Treeview(stats_card.content_frame, columns=columns,
+                                      style='Modern.Treeview',
+                                      show="headings",
+                                      height=10)
+        
+        col_widths = [380, 60, 60, 80, 70, 70, 70, 200]
+        for idx, col in enumerate(columns):
+            self.stats_tree.heading(col, text=col)
+            self.stats_tree.column(col, width=col_widths[idx], anchor=tk.W if idx in (0, 7) else tk.E)
+        
+        scrollbar = ttk.Scrollbar(stats_card.content_frame, orient=tk.VERTICAL,
+                                 command=self.stats_tree.yview)
+        self.stats_tree.configure(yscrollcommand=scrollbar.set)
+        
+        self.stats_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # Журнал медленных запросов
+        slow_card = Card(self.window, title="Медленные запросы")
+        slow_card.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        
+        columns = ("Время", "мс", "Строк", "Источник", "Запрос")
+        self.slow_tree = ttk.Treeview(slow_card.content_frame, columns=columns,
+                                     style='Modern.Treeview',
+                                     show="headings",
+                                     height=6)
+        
+        col_widths = [130, 70, 60, 200, 480]
+        for idx, col in enumerate(columns):
+            self.slow_tree.heading(col, text=col)
+            self.slow_tree.column(col, width=col_widths[idx])
+        
+        self.slow_tree.pack(fill=tk.BOTH, expand=True)
+        self.slow_tree.bind('<<TreeviewSelect>>', self.show_plan)
+        
+        ttk.Label(slow_card.content_frame, text="План выполнения:",
+                 style='Body.TLabel').pack(anchor=tk.W, pady=(5, 0))
+        
+        self.plan_text = tk.Text(slow_card.content_frame, height=6, wrap=tk.NONE,
+                                 font=('Consolas', 9))
+        self.plan_text.pack(fill=tk.X)
+    
+    def refresh(self):
+        """Обновление таблиц"""
+        self.stats_tree.delete(*self.stats_tree.get_children())
+        for stats in self.profiler.snapshot():
+            caller = next(iter(stats['callers']), '')
+            self.stats_tree.insert('', tk.END, values=(
+                stats['fingerprint'][:200],
+                stats['count'],
+                stats['rows'],
+                f"{stats['total_ms']:.1f}",
+                f"{stats['avg_ms']:.2f}",
+                f"{stats['p95_ms']:.2f}",
+                f"{stats['max_ms']:.1f}",
+                caller
+            ))
+        
+        selection = self.slow_tree.selection()
+        selected = self.slow_tree.index(selection[0]) if selection else None
+        
+        self.slow_entries = self.profiler.slow_queries()
+        self.slow_tree.delete(*self.slow_tree.get_children())
+        for entry in self.slow_entries:
+            self.slow_tree.insert('', tk.END, values=(
+                entry['time'],
+                f"{entry['duration_ms']:.1f}",
+                entry['rows'],
+                entry['caller'],
+                entry['fingerprint'][:200]
+            ))
+        
+        if selected is None or selected >= len(self.slow_entries):
+            return
+        self.slow_tree.selection_set(self.slow_tree.get_children()[selected])
+    
+    def schedule_refresh(self):
+        """Периодическое обновление, пока окно открыто"""
+        if not self.window.winfo_exists():
+            return
+        self.refresh()
+        self.window.after(self.REFRESH_MS, self.schedule_refresh)
+    
+    def show_plan(self, event=None):
+        """План выбранного медленного запроса"""
+        selection = self.slow_tree.selection()
+        self.plan_text.delete('1.0', tk.END)
+        if not selection:
+            return
+        
+        entry = self.slow_entries[self.slow_tree.index(selection[0])]
+        lines = [entry['fingerprint'], f"Параметры: {entry['params']}", ''] + (entry['plan'] or ['(нет плана)'])
+        self.plan_text.insert('1.0', '\n'.join(lines))
+    
+    def apply_threshold(self):
+        """Изменить порог медленного запроса"""
+        try:
+            self.profiler.threshold_ms = max(1, int(self.threshold_var.get()))
+        except (tk.TclError, ValueError):
+            pass
+    
+    def toggle_enabled(self):
+        """Включить/выключить профилирование новых соединений"""
+        self.profiler.enabled = self.enabled_var.get()
+    
+    def reset(self):
+        """Сброс статистики"""
+        self.profiler.reset()
+        self.refresh()
+    
+    def advise_indexes(self):
+        """Рекомендации индексов по собранным запросам и их применение"""
+        from utils.index_advisor import IndexAdvisor
+        
+        if self.db.dialect != 'sqlite':
+            messagebox.showinfo("Советник индексов", "Доступен только для SQLite", parent=self.window)
+            return
+        
+        advisor = IndexAdvisor(self.db, repeat=5)
+        report = advisor.run()
+        self.show_report(report)
+        
+        if not report['recommendations']:
+            return
+        
+        if messagebox.askyesno("Советник индексов",
+                               f"Создать индексы ({len(report['recommendations'])}) и файл миграции с ними?",
+                               parent=self.window):
+            report = advisor.run(apply=True)
+            self.show_report(report)
+            filepath = IndexAdvisor.save_report(report)
+            messagebox.showinfo("Советник индексов",
+                              f"Индексы созданы в текущей базе.\n"
+                              f"Миграция: {report['migration']}\n"
+                              f"(перенесите ее в каталог migrations вручную)\nОтчет: {filepath}",
+                              parent=self.window)
+    
+    def show_report(self, report):
+        """Отчет советника в поле плана"""
+        from utils.index_advisor import IndexAdvisor
+        
+        self.plan_text.delete('1.0', tk.END)
+        self.plan_text.insert('1.0', IndexAdvisor.format_report(report))
+    
+    def save_json(self):
+        """Сохранение статистики в JSON"""
+        os.makedirs('data/export', exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filepath = self.profiler.dump_json(f'data/export/query_profile_{timestamp}.json')
+        messagebox.showinfo("Диагностика", f"Статистика сохранена:\n{filepath}", parent=self.window)
\ No newline at end of file
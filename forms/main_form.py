@@ -5,17 +5,17 @@ from styles import StyleManager
 from widgets import (Card, MetricCard, SearchBox, StatusBadge, 
                     PriorityBadge, NotificationBadge, Avatar, ProgressBar,
                     PieChart, BarChart, GaugeChart)
-from .request_form import RequestForm
 from .statistics_form import StatisticsForm
 from .quality_manager_form import QualityManagerForm
 
 class MainForm:
     """Главная форма приложения"""
     
-    def __init__(self, master, user, db):
+    def __init__(self, master, user, db, notifications=None):
         self.master = master
         self.user = user
         self.db = db
+        self.notifications = notifications
         
         self.setup_ui()
         self.setup_menu()
@@ -91,6 +91,9 @@ class MainForm:
         self.notification_badge = NotificationBadge(user_frame)
         self.notification_badge.pack(side=tk.LEFT, padx=5)
         
+        if self.notifications:
+            self.notification_badge.attach(self.notifications, self.user.userID)
+        
         # Аватар пользователя
         avatar = Avatar(user_frame, text=self.user.fio[:2], size=40)
         avatar.pack(side=tk.LEFT, padx=5)
@@ -194,8 +197,9 @@ class MainForm:
         status_card = Card(charts_frame, title="Статусы заявок")
         status_card.grid(row=0, column=0, padx=5, pady=5, sticky=tk.NSEW)
         
+        # Диаграммы панели обновляются часто: каждая - одно изображение из кэша
         self.status_chart = PieChart(status_card.content_frame, 
-                                    width=300, height=300)
+                                    width=300, height=300, raster=True)
         self.status_chart.pack(padx=10, pady=10)
         
         # Типы техники
@@ -203,7 +207,7 @@ class MainForm:
         tech_card.grid(row=0, column=1, padx=5, pady=5, sticky=tk.NSEW)
         
         self.tech_chart = BarChart(tech_card.content_frame,
-                                  width=400, height=300)
+                                  width=400, height=300, top_n=5, raster=True)
         self.tech_chart.pack(padx=10, pady=10)
         
         # Производительность
@@ -211,7 +215,7 @@ class MainForm:
         perf_card.grid(row=1, column=0, padx=5, pady=5, sticky=tk.NSEW)
         
         self.performance_gauge = GaugeChart(perf_card.content_frame,
-                                          width=300, height=200)
+                                          width=300, height=200, raster=True)
         self.performance_gauge.pack(padx=10, pady=10)
         
         # Последние заявки
@@ -427,6 +431,14 @@ class MainForm:
         report_menu.add_command(label="Статистика по технике", 
                               command=self.tech_report)
         
+        # Меню "Сервис"
+        if self.user.has_permission('view_diagnostics'):
+            service_menu = tk.Menu(menubar, tearoff=0)
+            menubar.add_cascade(label="Сервис", menu=service_menu)
+            
+            service_menu.add_command(label="Диагностика запросов", 
+                                   command=self.show_diagnostics)
+        
         # Меню "Справка"
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Справка", menu=help_menu)
@@ -486,18 +498,17 @@ class MainForm:
         self.completion_metric.update_value(f"{completion_rate:.1f}")
         
         # Просроченные заявки
-        overdue = self.db.get_overdue_requests()
-        self.overdue_metric.update_value(len(overdue))
+        self.overdue_metric.update_value(self.db.count_overdue_requests())
         
         # Графики
         self.status_chart.set_data(stats['by_status'])
         
         # Типы техники
-        tech_data = {row[0]: row[1] for row in stats['by_tech_type'][:5]}
+        tech_data = {row[0]: row[1] for row in stats['by_tech_type']}
         self.tech_chart.set_data(tech_data)
         
         # Датчик производительности
-        self.performance_gauge.set_value(completion_rate, "Выполнение", "%")
+        self.performance_gauge.set_value(completion_rate, "Выполнение", "%", animate=True)
         
         # Последние заявки
         self.load_recent_requests()
@@ -525,8 +536,7 @@ class MainForm:
     
     def load_notifications(self):
         """Загрузка уведомлений"""
-        notifications = self.db.get_user_notifications(self.user.userID, unread_only=True)
-        self.notification_badge.update_count(len(notifications))
+        self.notification_badge.update_count(self.db.get_unread_count(self.user.userID))
     
     def filter_requests(self, search_text=None):
         """Фильтрация заявок"""
@@ -545,6 +555,8 @@ class MainForm:
         for item in self.requests_tree.get_children():
             self.requests_tree.delete(item)
         
+        today = datetime.now().strftime("%Y-%m-%d")
+        
         # Заполняем данными
         for req in requests:
             days = (datetime.now() - datetime.strptime(req['startDate'], "%Y-%m-%d")).days
@@ -564,7 +576,7 @@ class MainForm:
             item = self.requests_tree.insert('', tk.END, values=values)
             
             # Подсветка просроченных заявок
-            if days > 7 and req['requestStatus'] != 'Готова к выдаче':
+            if req.get('dueDate') and req['dueDate'] < today and req['requestStatus'] != 'Готова к выдаче':
                 self.requests_tree.item(item, tags=('overdue',))
         
         # Настройка тегов
@@ -584,10 +596,14 @@ class MainForm:
     
     def create_request(self):
         """Создание новой заявки"""
+        from .request_form import RequestForm
+        
         RequestForm(self.master, self.user, self.db, self.refresh_all)
     
     def open_selected_request(self, event=None):
         """Открыть выбранную заявку"""
+        from .request_form import RequestForm
+        
         selection = self.requests_tree.selection()
         if selection:
             item = self.requests_tree.item(selection[0])
@@ -598,6 +614,8 @@ class MainForm:
     
     def view_selected_request(self):
         """Просмотр выбранной заявки"""
+        from .request_form import RequestForm
+        
         selection = self.requests_tree.selection()
         if selection:
             item = self.requests_tree.item(selection[0])
@@ -747,6 +765,12 @@ class MainForm:
         if hasattr(self, 'stats_form'):
             self.stats_form.generate_tech_report()
     
+    def show_diagnostics(self):
+        """Окно диагностики запросов к БД"""
+        from .diagnostics_form import DiagnosticsForm
+        
+        DiagnosticsForm(self.master, self.db)
+    
     def show_about(self):
         """Показать информацию о программе"""
         about_text = """
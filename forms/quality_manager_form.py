@@ -7,10 +7,17 @@ from widgets import Card, MetricCard, StatusBadge, SearchBox
 class QualityManagerForm(ttk.Frame):
     """Форма менеджера по качеству"""
     
+    # Действия в колонке "Действия": подпись и метод-диалог. Колонка делится
+    # поровну между действиями; щелчок определяется по координатам в ячейке
+    ACTIONS = (("📅 Продлить", 'extend_deadline_dialog'),
+               ("🔧 Мастер", 'assign_master_dialog'))
+    ACTIONS_COLUMN = '#8'
+    
     def __init__(self, parent, user, db):
         super().__init__(parent)
         self.user = user
         self.db = db
+        self._requests = {}  # строка таблицы -> данные заявки
         
         self.setup_ui()
         self.refresh()
@@ -61,11 +68,11 @@ class QualityManagerForm(ttk.Frame):
         search_frame = ttk.Frame(search_card.content_frame)
         search_frame.pack(fill=tk.X, padx=10, pady=10)
         
-        ttk.Label(search_frame, text="Порог просрочки:", 
+        ttk.Label(search_frame, text="Просрочка более (дней):", 
                  style='Body.TLabel').pack(side=tk.LEFT, padx=(0, 10))
         
-        self.threshold_var = tk.IntVar(value=7)
-        threshold_spin = ttk.Spinbox(search_frame, from_=1, to=30,
+        self.threshold_var = tk.IntVar(value=0)
+        threshold_spin = ttk.Spinbox(search_frame, from_=0, to=30,
                                     textvariable=self.threshold_var,
                                     width=5)
         threshold_spin.pack(side=tk.LEFT, padx=(0, 20))
@@ -79,7 +86,7 @@ class QualityManagerForm(ttk.Frame):
         table_card.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
         
         # Таблица
-        columns = ("ID", "Дата", "Техника", "Статус", "Клиент", "Мастер", "Дней", "Действия")
+        columns = ("ID", "Срок", "Техника", "Статус", "Клиент", "Мастер", "Просрочка", "Действия")
         
         self.overdue_tree = ttk.Treeview(table_card.content_frame, columns=columns, 
                                         style='Modern.Treeview',
@@ -99,6 +106,10 @@ class QualityManagerForm(ttk.Frame):
         self.overdue_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=10)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=10)
         
+        # Кнопки действий в строках
+        self.overdue_tree.bind('<Button-1>', self.on_tree_click)
+        self.overdue_tree.bind('<Motion>', self.on_tree_motion)
+        
         # Контекстное меню
         self.setup_context_menu()
         
@@ -134,6 +145,37 @@ class QualityManagerForm(ttk.Frame):
             self.overdue_tree.selection_set(item)
             self.context_menu.tk_popup(event.x_root, event.y_root)
     
+    def action_at(self, x, y):
+        """Строка и действие под точкой таблицы (None, если не над кнопкой)"""
+        if self.overdue_tree.identify_column(x) != self.ACTIONS_COLUMN:
+            return None, None
+        item = self.overdue_tree.identify_row(y)
+        if item not in self._requests:
+            return None, None
+        
+        bbox = self.overdue_tree.bbox(item, self.ACTIONS_COLUMN)
+        if not bbox:
+            return None, None
+        left, _, width, _ = bbox
+        index = int((x - left) * len(self.ACTIONS) / width) if width else 0
+        return item, self.ACTIONS[max(0, min(len(self.ACTIONS) - 1, index))][1]
+    
+    def on_tree_click(self, event):
+        """Щелчок по кнопке действия в строке"""
+        item, action = self.action_at(event.x, event.y)
+        if action is None:
+            return
+        self.overdue_tree.selection_set(item)
+        getattr(self, action)(self._requests[item])
+        return "break"
+    
+    def on_tree_motion(self, event):
+        """Курсор-указатель над кнопками действий"""
+        _, action = self.action_at(event.x, event.y)
+        cursor = 'hand2' if action else ''
+        if str(self.overdue_tree.cget('cursor')) != cursor:
+            self.overdue_tree.configure(cursor=cursor)
+    
     def refresh(self):
         """Обновление данных"""
         try:
@@ -149,41 +191,36 @@ class QualityManagerForm(ttk.Frame):
             self.extended_metric.update_value(extended_count)
             
             # Очистка таблицы
-            for item in self.overdue_tree.get_children():
-                self.overdue_tree.delete(item)
+            children = self.overdue_tree.get_children()
+            if children:
+                self.overdue_tree.delete(*children)
+            self._requests.clear()
+            
+            # Кнопки действий - текст ячейки; щелчки разбирает on_tree_click
+            actions_text = "  |  ".join(label for label, _ in self.ACTIONS)
             
             # Заполнение таблицы
             for req in overdue_requests:
-                days_passed = int(req.get('days_passed', 0))
-                
-                # Кнопки действий
-                actions_frame = ttk.Frame(self.overdue_tree)
-                
-                ttk.Button(actions_frame, text="Продлить",
-                          style='Warning.TButton',
-                          command=lambda r=req: self.extend_deadline_dialog(r)).pack(side=tk.LEFT, padx=2)
-                
-                ttk.Button(actions_frame, text="Мастер",
-                          style='Info.TButton',
-                          command=lambda r=req: self.assign_master_dialog(r)).pack(side=tk.LEFT, padx=2)
+                days_overdue = int(req.get('days_overdue') or 0)
                 
                 values = (
                     req['requestID'],
-                    req['startDate'],
+                    req['dueDate'],
                     req['homeTechType'],
                     req['requestStatus'],
                     req.get('client_name', ''),
                     req.get('master_name', ''),
-                    days_passed,
-                    ""  # Действия будут отображаться отдельно
+                    days_overdue,
+                    actions_text
                 )
                 
                 item = self.overdue_tree.insert('', tk.END, values=values)
+                self._requests[item] = req
                 
                 # Подсветка сильно просроченных
-                if days_passed > 14:
+                if days_overdue > 7:
                     self.overdue_tree.item(item, tags=('critical',))
-                elif days_passed > 7:
+                elif days_overdue > 3:
                     self.overdue_tree.item(item, tags=('warning',))
             
             # Настройка тегов
@@ -205,7 +242,7 @@ class QualityManagerForm(ttk.Frame):
         ttk.Label(dialog, text=f"Клиент: {request.get('client_name', '')}",
                  style='Body.TLabel').pack()
         
-        ttk.Label(dialog, text=f"Просрочено на: {int(request.get('days_passed', 0))} дней",
+        ttk.Label(dialog, text=f"Просрочено на: {int(request.get('days_overdue') or 0)} дней",
                  style='Body.TLabel').pack(pady=10)
         
         ttk.Label(dialog, text="Дополнительных дней:", 
@@ -229,9 +266,10 @@ class QualityManagerForm(ttk.Frame):
                 messagebox.showwarning("Внимание", "Укажите причину продления")
                 return
             
-            # Расчет новой даты
-            current_date = datetime.strptime(request['startDate'], "%Y-%m-%d")
-            new_deadline = (current_date + timedelta(days=days_var.get() + int(request.get('days_passed', 0)))).strftime("%Y-%m-%d")
+            # Расчет новой даты: от текущего срока, но не раньше сегодняшнего дня
+            due_date = datetime.strptime(request['dueDate'], "%Y-%m-%d")
+            base_date = max(due_date, datetime.now())
+            new_deadline = (base_date + timedelta(days=days_var.get())).strftime("%Y-%m-%d")
             
             # Обновление в БД
             with self.db.get_connection() as conn:
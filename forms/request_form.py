@@ -3,9 +3,7 @@ from tkinter import ttk, messagebox
 from datetime import datetime
 from styles import StyleManager
 from widgets import Card, StatusBadge, PriorityBadge, ProgressBar, Avatar
-from utils.generators import QRCodeGenerator
 from utils.validators import Validators
-from PIL import Image, ImageTk
 
 class RequestForm:
     """Форма работы с заявкой"""
@@ -611,6 +609,9 @@ class RequestForm:
         content = ttk.Frame(feedback_card.content_frame)
         content.pack(expand=True)
         
+        from utils.generators import QRCodeGenerator
+        from PIL import Image, ImageTk
+        
         # Генерация QR-кода
         qr_file = QRCodeGenerator.generate_feedback_qr(self.request_id)
         
@@ -761,14 +762,8 @@ class RequestForm:
             messagebox.showwarning("Внимание", "Введите текст комментария")
             return
         
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO comments (message, masterID, requestID, is_private)
-                VALUES (?, ?, ?, ?)
-            ''', (comment_text, self.user.userID, self.request_id, 
-                  int(self.private_var.get())))
-            conn.commit()
+        self.db.add_comment(self.request_id, self.user.userID, comment_text,
+                            self.private_var.get())
         
         self.new_comment_text.delete("1.0", tk.END)
         
@@ -1004,6 +999,14 @@ class RequestForm:
                 self.request_id
             ))
             
+            # Пересчет перцентилей за дни завершения до и после изменения
+            # (меняться могли статус, дата завершения, мастер и тип техники)
+            self.db.refresh_repair_sketches(self.db.completion_periods(
+                self.request_data['requestStatus'], self.request_data.get('completionDate'),
+                self.status_var.get(),
+                self.completion_date_var.get() if hasattr(self, 'completion_date_var') else None
+            ), cursor)
+            
             conn.commit()
         
         messagebox.showinfo("Успех", "Изменения сохранены")
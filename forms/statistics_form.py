@@ -82,6 +82,10 @@ class StatisticsForm(ttk.Frame):
                   style='Info.TButton',
                   command=self.export_statistics).pack(side=tk.LEFT, padx=(20, 0))
         
+        ttk.Button(filter_frame, text="📄 PDF",
+                  style='Info.TButton',
+                  command=self.export_statistics_pdf).pack(side=tk.LEFT, padx=(5, 0))
+        
         # Основные метрики
         metrics_frame = ttk.Frame(scrollable_frame)
         metrics_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
@@ -101,6 +105,24 @@ class StatisticsForm(ttk.Frame):
         self.avg_revenue_metric = MetricCard(metrics_frame, "Ср. чек", "0", "₽")
         self.avg_revenue_metric.pack(side=tk.LEFT, padx=5, fill=tk.BOTH, expand=True)
         
+        # Хвосты распределения времени ремонта: скетчи ведутся по дням
+        # завершения, поэтому период здесь - по дате завершения, а не приема
+        ttk.Label(scrollable_frame, text="Время ремонта за период (по дате завершения; "
+                                         "остальные показатели - по дате приема)",
+                 style='Small.TLabel').pack(anchor=tk.W, padx=15)
+        
+        tail_frame = ttk.Frame(scrollable_frame)
+        tail_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        self.p50_metric = MetricCard(tail_frame, "Ремонт p50", "0", "дн")
+        self.p50_metric.pack(side=tk.LEFT, padx=5, fill=tk.BOTH, expand=True)
+        
+        self.p90_metric = MetricCard(tail_frame, "Ремонт p90", "0", "дн")
+        self.p90_metric.pack(side=tk.LEFT, padx=5, fill=tk.BOTH, expand=True)
+        
+        self.p99_metric = MetricCard(tail_frame, "Ремонт p99", "0", "дн")
+        self.p99_metric.pack(side=tk.LEFT, padx=5, fill=tk.BOTH, expand=True)
+        
         # Графики
         charts_frame = ttk.Frame(scrollable_frame)
         charts_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
@@ -125,14 +147,16 @@ class StatisticsForm(ttk.Frame):
         tech_card = Card(charts_frame, title="Типы техники")
         tech_card.grid(row=1, column=0, padx=5, pady=5, sticky=tk.NSEW)
         
+        # Редкие типы техники - в столбце "Другие"
         self.tech_chart = BarChart(tech_card.content_frame,
-                                  width=300, height=300)
+                                  width=300, height=300, top_n=6)
         self.tech_chart.pack(padx=10, pady=10)
         
         # Мастера
         masters_card = Card(charts_frame, title="Эффективность мастеров")
         masters_card.grid(row=1, column=1, padx=5, pady=5, sticky=tk.NSEW)
         
+        # Все мастера; длинный список прокручивается колесом мыши
         self.masters_chart = BarChart(masters_card.content_frame,
                                      width=400, height=300)
         self.masters_chart.pack(padx=10, pady=10)
@@ -216,7 +240,6 @@ class StatisticsForm(ttk.Frame):
                 {date_filter}
                 GROUP BY r.homeTechType
                 ORDER BY count DESC
-                LIMIT 10
             ''', params)
             
             by_tech_type = dict(cursor.fetchall())
@@ -230,7 +253,6 @@ class StatisticsForm(ttk.Frame):
                 {'AND r.startDate BETWEEN ? AND ?' if start_date and end_date else ''}
                 GROUP BY u.userID
                 ORDER BY count DESC
-                LIMIT 10
             ''', params if start_date and end_date else [])
             
             by_masters = dict(cursor.fetchall())
@@ -253,12 +275,20 @@ class StatisticsForm(ttk.Frame):
             
             trends = cursor.fetchall()
             
+            # Перцентили времени ремонта из скетчей (без сканирования заявок;
+            # период - по дате завершения, см. подпись над метриками)
+            if start_date and end_date:
+                percentiles = self.db.get_repair_time_percentiles(start_date, end_date)
+            else:
+                percentiles = self.db.get_repair_time_percentiles()
+            
             return {
                 'basic': basic_stats,
                 'by_status': by_status,
                 'by_tech_type': by_tech_type,
                 'by_masters': by_masters,
-                'trends': trends
+                'trends': trends,
+                'repair_percentiles': percentiles.get('', {})
             }
     
     def _update_metrics(self, stats):
@@ -274,6 +304,11 @@ class StatisticsForm(ttk.Frame):
         self.avg_time_metric.update_value(f"{basic['avg_repair_days'] or 0:.1f}")
         self.revenue_metric.update_value(f"{basic['total_revenue'] or 0:,.0f}")
         self.avg_revenue_metric.update_value(f"{basic['avg_revenue_per_request'] or 0:,.0f}")
+        
+        percentiles = stats['repair_percentiles']
+        self.p50_metric.update_value(f"{percentiles.get(50) or 0:.1f}")
+        self.p90_metric.update_value(f"{percentiles.get(90) or 0:.1f}")
+        self.p99_metric.update_value(f"{percentiles.get(99) or 0:.1f}")
     
     def _update_charts(self, stats):
         """Обновление графиков"""
@@ -335,61 +370,33 @@ class StatisticsForm(ttk.Frame):
     
     def generate_masters_report(self):
         """Отчет по мастерам"""
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT 
-                    u.fio,
-                    COUNT(r.requestID) as total,
-                    SUM(CASE WHEN r.requestStatus = 'Готова к выдаче' THEN 1 ELSE 0 END) as completed,
-                    AVG(CASE WHEN r.completionDate IS NOT NULL 
-                        THEN julianday(r.completionDate) - julianday(r.startDate) 
-                        ELSE NULL END) as avg_days,
-                    SUM(r.actualCost) as revenue
-                FROM users u
-                LEFT JOIN requests r ON u.userID = r.masterID
-                WHERE u.type = 'Маster'
-                GROUP BY u.userID
-                ORDER BY completed DESC, revenue DESC
-            ''')
-            
-            report = "📊 Отчет по мастерам\n\n"
-            report += "Мастер | Всего | Завершено | Ср. время | Доход\n"
-            report += "-" * 60 + "\n"
-            
-            for row in cursor.fetchall():
-                report += f"{row[0]} | {row[1]} | {row[2]} | {row[3]:.1f} дн | {row[4]:,.0f}₽\n"
-            
-            messagebox.showinfo("Отчет по мастерам", report)
+        from utils.analytics import RequestAnalytics
+        
+        analytics = RequestAnalytics(self.db)
+        
+        report = "📊 Отчет по мастерам\n\n"
+        report += "Мастер | Всего | Завершено | Ср. время | Доход\n"
+        report += "-" * 60 + "\n"
+        
+        for fio, total, completed, avg_days, revenue in analytics.master_throughput():
+            report += f"{fio} | {total} | {completed} | {avg_days or 0:.1f} дн | {revenue:,.0f}₽\n"
+        
+        messagebox.showinfo("Отчет по мастерам", report)
     
     def generate_tech_report(self):
         """Отчет по технике"""
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT 
-                    homeTechType,
-                    COUNT(*) as count,
-                    AVG(CASE WHEN completionDate IS NOT NULL 
-                        THEN julianday(completionDate) - julianday(startDate) 
-                        ELSE NULL END) as avg_days,
-                    AVG(actualCost) as avg_cost,
-                    SUM(actualCost) as total_cost
-                FROM requests 
-                GROUP BY homeTechType
-                ORDER BY count DESC
-            ''')
-            
-            report = "📊 Отчет по типам техники\n\n"
-            report += "Техника | Количество | Ср. время | Ср. стоимость | Всего\n"
-            report += "-" * 70 + "\n"
-            
-            for row in cursor.fetchall():
-                report += f"{row[0]} | {row[1]} | {row[2]:.1f} дн | {row[3]:,.0f}₽ | {row[4]:,.0f}₽\n"
-            
-            messagebox.showinfo("Отчет по технике", report)
+        from utils.analytics import RequestAnalytics
+        
+        analytics = RequestAnalytics(self.db)
+        
+        report = "📊 Отчет по типам техники\n\n"
+        report += "Техника | Количество | Ср. время | Ср. стоимость | Всего\n"
+        report += "-" * 70 + "\n"
+        
+        for tech_type, count, avg_days, avg_cost, total_cost in analytics.tech_type_summary():
+            report += f"{tech_type} | {count} | {avg_days or 0:.1f} дн | {avg_cost:,.0f}₽ | {total_cost:,.0f}₽\n"
+        
+        messagebox.showinfo("Отчет по технике", report)
     
     def export_statistics(self):
         """Экспорт статистики"""
@@ -400,4 +407,11 @@ class StatisticsForm(ttk.Frame):
         
         if filename:
             messagebox.showinfo("Экспорт", 
-                              f"Статистика экспортирована:\n{filename}")
\ No newline at end of file
+                              f"Статистика экспортирована:\n{filename}")
+    
+    def export_statistics_pdf(self):
+        """Экспорт статистики с диаграммами в PDF"""
+        from utils.exporters import DataExporter
+        
+        filename = DataExporter(self.db).export_statistics_pdf()
+        messagebox.showinfo("Экспорт", f"Статистика экспортирована:\n{filename}")
\ No newline at end of file
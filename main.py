@@ -2,8 +2,6 @@ import tkinter as tk
 from tkinter import messagebox
 from styles import StyleManager
 from forms.login_form import LoginForm
-from forms.main_form import MainForm
-from database import Database
 from auth import AuthSystem
 import os
 import sys
@@ -15,16 +13,48 @@ class RepairServiceApp:
         self.root = tk.Tk()
         self.setup_window()
         
-        # Инициализация систем
+        # Форма авторизации отрисовывается до открытия БД и запуска служб
         self.auth = AuthSystem()
-        self.db = Database()
-        
-        # Запуск формы авторизации
         self.show_login()
+        self.root.update()
+        
+        self.start_services()
         
         # Настройка закрытия окна
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
     
+    def start_services(self):
+        """Открытие БД и запуск фоновых служб"""
+        from database import Database
+        from utils.sla_monitor import SLAMonitor
+        from utils.notification_channel import NotificationChannel, NotificationServer
+        
+        # Один экземпляр Database на приложение (и для авторизации)
+        # REPAIR_DATABASE_URL=postgresql://... - хранение в PostgreSQL
+        self.db = Database(os.environ.get('REPAIR_DATABASE_URL', 'repair_service.db'), concurrent=True)
+        self.auth.db = self.db
+        
+        # REPAIR_TRACE=файл.trace.gz - запись нагрузки на БД для utils.workload_trace
+        self.trace_recorder = None
+        trace_path = os.environ.get('REPAIR_TRACE')
+        if trace_path:
+            from utils.workload_trace import TraceRecorder
+            self.trace_recorder = TraceRecorder(self.db, trace_path).start()
+        
+        # Фоновый контроль сроков заявок
+        self.sla_monitor = SLAMonitor(self.db)
+        self.sla_monitor.start()
+        
+        # Доставка уведомлений (и long-poll сервер, если задан порт)
+        self.notification_channel = NotificationChannel(self.db)
+        self.notification_channel.start()
+        
+        self.notification_server = None
+        notify_port = os.environ.get('REPAIR_NOTIFY_PORT')
+        if notify_port:
+            self.notification_server = NotificationServer(self.notification_channel, port=int(notify_port))
+            self.notification_server.start()
+    
     def setup_window(self):
         """Настройка главного окна"""
         self.root.title("Сервисный центр - Учет заявок")
@@ -65,14 +95,24 @@ class RepairServiceApp:
         for widget in self.root.winfo_children():
             widget.destroy()
         
+        from forms.main_form import MainForm
+        
         # Показать главную форму
-        self.main_form = MainForm(self.root, user, self.db)
+        self.main_form = MainForm(self.root, user, self.db, notifications=self.notification_channel)
     
     def on_closing(self):
         """Обработка закрытия приложения"""
         if messagebox.askokcancel("Выход", "Вы уверены, что хотите выйти?"):
+            if hasattr(self, 'sla_monitor'):
+                self.sla_monitor.stop(timeout=2)
+            if getattr(self, 'notification_server', None):
+                self.notification_server.stop()
+            if hasattr(self, 'notification_channel'):
+                self.notification_channel.stop(timeout=2)
+            if getattr(self, 'trace_recorder', None):
+                self.trace_recorder.stop()
             if hasattr(self, 'db'):
-                self.db.get_connection().close()
+                self.db.close()
             self.root.destroy()
     
     def run(self):
@@ -0,0 +1,254 @@
+"""Исходная схема: таблицы, индексы и триггеры
+
+Для баз, созданных до появления миграций, недостающие таблицы и колонки
+добавляются, существующие не изменяются.
+"""
+from database import Database
+
+def upgrade(ctx):
+    if ctx.dialect != 'sqlite':
+        # Схема PostgreSQL (триггеры на plpgsql) описана в хранилище
+        from storage.postgres import SCHEMA
+        
+        if not ctx.table_exists('repair_time_sketches'):
+            ctx.on_commit(ctx.db.rebuild_repair_sketches)
+        ctx.execute_script(SCHEMA)
+        return
+    
+    # Таблица пользователей
+    ctx.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            userID INTEGER PRIMARY KEY AUTOINCREMENT,
+            fio TEXT NOT NULL,
+            phone TEXT NOT NULL,
+            login TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            type TEXT NOT NULL CHECK(type IN ('Менеджер', 'Мастер', 'Оператор', 'Заказчик', 'Менеджер качества')),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_active INTEGER DEFAULT 1
+        )
+    ''')
+    
+    # Таблица заявок
+    requests_exist = ctx.table_exists('requests')
+    
+    ctx.execute('''
+        CREATE TABLE IF NOT EXISTS requests (
+            requestID INTEGER PRIMARY KEY AUTOINCREMENT,
+            startDate DATE NOT NULL,
+            homeTechType TEXT NOT NULL,
+            homeTechModel TEXT NOT NULL,
+            problemDescription TEXT NOT NULL,
+            requestStatus TEXT NOT NULL CHECK(requestStatus IN ('Новая заявка', 'В процессе ремонта', 'Ожидание запчастей', 'Готова к выдаче')),
+            completionDate DATE,
+            repairParts TEXT,
+            masterID INTEGER,
+            clientID INTEGER NOT NULL,
+            qualityManagerID INTEGER,
+            extendedDeadline DATE,
+            dueDate DATE,
+            estimatedCost REAL DEFAULT 0,
+            actualCost REAL DEFAULT 0,
+            priority INTEGER DEFAULT 1 CHECK(priority BETWEEN 1 AND 5),
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (masterID) REFERENCES users(userID) ON DELETE SET NULL,
+            FOREIGN KEY (clientID) REFERENCES users(userID) ON DELETE CASCADE,
+            FOREIGN KEY (qualityManagerID) REFERENCES users(userID) ON DELETE SET NULL
+        )
+    ''')
+    
+    # Колонка крайнего срока для баз, созданных до ее появления (заполняется в конце)
+    ctx.add_column('requests', 'dueDate', 'DATE')
+    
+    # Таблица комментариев
+    ctx.execute('''
+        CREATE TABLE IF NOT EXISTS comments (
+            commentID INTEGER PRIMARY KEY AUTOINCREMENT,
+            message TEXT NOT NULL,
+            masterID INTEGER NOT NULL,
+            requestID INTEGER NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            is_private INTEGER DEFAULT 0,
+            FOREIGN KEY (masterID) REFERENCES users(userID) ON DELETE CASCADE,
+            FOREIGN KEY (requestID) REFERENCES requests(requestID) ON DELETE CASCADE
+        )
+    ''')
+    
+    # Таблица статистики
+    ctx.execute('''
+        CREATE TABLE IF NOT EXISTS statistics (
+            statID INTEGER PRIMARY KEY AUTOINCREMENT,
+            date DATE NOT NULL,
+            total_requests INTEGER DEFAULT 0,
+            completed_requests INTEGER DEFAULT 0,
+            avg_repair_time REAL DEFAULT 0,
+            total_revenue REAL DEFAULT 0,
+            UNIQUE(date)
+        )
+    ''')
+    
+    # Таблица запчастей
+    ctx.execute('''
+        CREATE TABLE IF NOT EXISTS parts (
+            partID INTEGER PRIMARY KEY AUTOINCREMENT,
+            partName TEXT NOT NULL,
+            vendorCode TEXT UNIQUE,
+            price REAL,
+            quantity INTEGER DEFAULT 0,
+            min_quantity INTEGER DEFAULT 5,
+            supplier TEXT,
+            last_ordered DATE
+        )
+    ''')
+    
+    # Таблица связей запчастей и заявок
+    ctx.execute('''
+        CREATE TABLE IF NOT EXISTS request_parts (
+            requestID INTEGER NOT NULL,
+            partID INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            used_date DATE DEFAULT CURRENT_DATE,
+            PRIMARY KEY (requestID, partID),
+            FOREIGN KEY (requestID) REFERENCES requests(requestID) ON DELETE CASCADE,
+            FOREIGN KEY (partID) REFERENCES parts(partID) ON DELETE CASCADE
+        )
+    ''')
+    
+    # Таблица уведомлений
+    ctx.execute('''
+        CREATE TABLE IF NOT EXISTS notifications (
+            notificationID INTEGER PRIMARY KEY AUTOINCREMENT,
+            userID INTEGER NOT NULL,
+            message TEXT NOT NULL,
+            type TEXT NOT NULL,
+            is_read INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (userID) REFERENCES users(userID) ON DELETE CASCADE
+        )
+    ''')
+    
+    # Счетчики непрочитанных уведомлений (поддерживаются триггерами)
+    counters_exist = ctx.table_exists('notification_counters')
+    
+    ctx.execute('''
+        CREATE TABLE IF NOT EXISTS notification_counters (
+            userID INTEGER PRIMARY KEY,
+            unread INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    
+    if not counters_exist:
+        ctx.execute('''
+            INSERT INTO notification_counters (userID, unread)
+            SELECT userID, COUNT(*) FROM notifications
+            WHERE is_read = 0
+            GROUP BY userID
+        ''')
+    
+    # Отправленные оповещения о сроках (для исключения повторов)
+    ctx.execute('''
+        CREATE TABLE IF NOT EXISTS sla_alerts (
+            requestID INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            dueDate DATE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (requestID, kind, dueDate),
+            FOREIGN KEY (requestID) REFERENCES requests(requestID) ON DELETE CASCADE
+        )
+    ''')
+    
+    # Скетчи длительности ремонта (по дням завершения)
+    sketches_exist = ctx.table_exists('repair_time_sketches')
+    
+    ctx.execute('''
+        CREATE TABLE IF NOT EXISTS repair_time_sketches (
+            period DATE NOT NULL,
+            dimension TEXT NOT NULL,
+            dim_key TEXT NOT NULL DEFAULT '',
+            count INTEGER DEFAULT 0,
+            sketch TEXT NOT NULL,
+            PRIMARY KEY (dimension, period, dim_key)
+        )
+    ''')
+    
+    # Индексы для оптимизации
+    ctx.execute('CREATE INDEX IF NOT EXISTS idx_requests_status ON requests(requestStatus)')
+    ctx.execute('CREATE INDEX IF NOT EXISTS idx_requests_master ON requests(masterID)')
+    ctx.execute('CREATE INDEX IF NOT EXISTS idx_requests_client ON requests(clientID)')
+    ctx.execute('CREATE INDEX IF NOT EXISTS idx_comments_request ON comments(requestID)')
+    ctx.execute('CREATE INDEX IF NOT EXISTS idx_users_type ON users(type)')
+    ctx.execute('CREATE INDEX IF NOT EXISTS idx_requests_priority ON requests(priority)')
+    ctx.execute('CREATE INDEX IF NOT EXISTS idx_requests_updated ON requests(updated_at)')
+    ctx.execute('CREATE INDEX IF NOT EXISTS idx_notifications_user_unread ON notifications(userID, is_read, created_at)')
+    ctx.execute('''
+        CREATE INDEX IF NOT EXISTS idx_requests_open_due ON requests(dueDate)
+        WHERE requestStatus != 'Готова к выдаче'
+    ''')
+    
+    # Триггер для обновления updated_at
+    ctx.execute('''
+        CREATE TRIGGER IF NOT EXISTS update_requests_timestamp
+        AFTER UPDATE ON requests
+        BEGIN
+            UPDATE requests SET updated_at = CURRENT_TIMESTAMP WHERE requestID = NEW.requestID;
+        END;
+    ''')
+    
+    # Триггеры счетчиков непрочитанных уведомлений
+    ctx.execute('''
+        CREATE TRIGGER IF NOT EXISTS notifications_unread_insert
+        AFTER INSERT ON notifications
+        WHEN NEW.is_read = 0
+        BEGIN
+            INSERT INTO notification_counters (userID, unread) VALUES (NEW.userID, 1)
+            ON CONFLICT(userID) DO UPDATE SET unread = unread + 1;
+        END;
+    ''')
+    
+    ctx.execute('''
+        CREATE TRIGGER IF NOT EXISTS notifications_unread_update
+        AFTER UPDATE OF is_read ON notifications
+        WHEN (OLD.is_read = 0) != (NEW.is_read = 0)
+        BEGIN
+            INSERT INTO notification_counters (userID, unread)
+            VALUES (NEW.userID, CASE WHEN NEW.is_read = 0 THEN 1 ELSE 0 END)
+            ON CONFLICT(userID) DO UPDATE
+            SET unread = MAX(0, unread + CASE WHEN NEW.is_read = 0 THEN 1 ELSE -1 END);
+        END;
+    ''')
+    
+    ctx.execute('''
+        CREATE TRIGGER IF NOT EXISTS notifications_unread_delete
+        AFTER DELETE ON notifications
+        WHEN OLD.is_read = 0
+        BEGIN
+            UPDATE notification_counters SET unread = MAX(0, unread - 1) WHERE userID = OLD.userID;
+        END;
+    ''')
+    
+    # Триггеры для расчета крайнего срока
+    ctx.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS requests_due_date_insert
+        AFTER INSERT ON requests
+        BEGIN
+            UPDATE requests SET dueDate = {Database._due_date_expression()} WHERE requestID = NEW.requestID;
+        END;
+    ''')
+    
+    ctx.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS requests_due_date_update
+        AFTER UPDATE OF startDate, priority, extendedDeadline ON requests
+        BEGIN
+            UPDATE requests SET dueDate = {Database._due_date_expression()} WHERE requestID = NEW.requestID;
+        END;
+    ''')
+    
+    # Крайний срок существующих заявок: пакетами, без долгой блокировки
+    # записи (новые и измененные заявки уже обрабатывают триггеры выше)
+    if requests_exist:
+        ctx.backfill('requests', f'dueDate = {Database._due_date_expression("requests")}', 'dueDate IS NULL')
+    
+    if not sketches_exist:
+        ctx.on_commit(ctx.db.rebuild_repair_sketches)
\ No newline at end of file
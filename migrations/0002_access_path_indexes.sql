@@ -0,0 +1,23 @@
+-- Индексы для частых выборок без подходящего индекса
+-- (notifications.userID уже покрыт idx_notifications_user_unread)
+
+-- Фильтры по периоду и сортировка списков заявок
+CREATE INDEX IF NOT EXISTS idx_requests_start ON requests(startDate);
+
+-- Завершенные заявки: длительность ремонта, скетчи, отчеты
+CREATE INDEX IF NOT EXISTS idx_requests_completed ON requests(completionDate)
+    WHERE completionDate IS NOT NULL;
+
+-- Группировка и фильтр по типу техники
+CREATE INDEX IF NOT EXISTS idx_requests_tech_type ON requests(homeTechType);
+
+-- Запчасти заявки и заявки по запчасти
+CREATE INDEX IF NOT EXISTS idx_request_parts_part ON request_parts(partID);
+
+-- Комментарии заявки в порядке времени; индекс только по requestID - его
+-- префикс и становится лишним
+CREATE INDEX IF NOT EXISTS idx_comments_request_time ON comments(requestID, timestamp);
+DROP INDEX IF EXISTS idx_comments_request;
+
+-- Справочник запчастей по названию
+CREATE INDEX IF NOT EXISTS idx_parts_name ON parts(partName);
@@ -0,0 +1,49 @@
+"""Счетчики версий данных для ETag API
+
+updated_at хранится с точностью до секунды: две записи за одну секунду
+давали одинаковый ETag. Теперь каждая заявка несет row_version, а таблица
+data_versions - версии таблиц requests и users; их увеличивают триггеры
+при каждом изменении.
+"""
+
+# Таблицы, изменения которых учитываются в data_versions
+VERSIONED_TABLES = ('requests', 'users')
+
+def upgrade(ctx):
+    if ctx.dialect != 'sqlite':
+        from storage.postgres import VERSIONS_SCHEMA
+        
+        ctx.execute_script(VERSIONS_SCHEMA)
+        return
+    
+    ctx.execute('''
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    for table in VERSIONED_TABLES:
+        ctx.execute('INSERT OR IGNORE INTO data_versions (name) VALUES (?)', (table,))
+    
+    ctx.add_column('requests', 'row_version', 'INTEGER NOT NULL DEFAULT 0')
+    
+    # Версия строки увеличивается тем же триггером, что обновляет updated_at
+    ctx.execute('DROP TRIGGER IF EXISTS update_requests_timestamp')
+    ctx.execute('''
+        CREATE TRIGGER update_requests_timestamp
+        AFTER UPDATE ON requests
+        BEGIN
+            UPDATE requests SET updated_at = CURRENT_TIMESTAMP, row_version = row_version + 1
+            WHERE requestID = NEW.requestID;
+        END;
+    ''')
+    
+    for table in VERSIONED_TABLES:
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            ctx.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_data_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE data_versions SET version = version + 1 WHERE name = '{table}';
+                END;
+            ''')
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""Версии строк для ETag без общего счетчика
+
+Каждое изменение requests и users увеличивало одну строку data_versions:
+в PostgreSQL все записи заявок ждали блокировки этой строки. Теперь
+row_version заявки и пользователя - номер из общей возрастающей
+последовательности, а версия набора для ETag - MAX(row_version) и
+COUNT(*) таблицы (индекс по row_version). В SQLite последовательность -
+таблица из одной строки: запись в базу и так выполняется по одной.
+"""
+
+# Таблицы с версиями строк и их ключи
+STAMPED_TABLES = {'requests': 'requestID', 'users': 'userID'}
+
+def upgrade(ctx):
+    if ctx.dialect != 'sqlite':
+        from storage.postgres import VERSION_STAMPS_SCHEMA
+        
+        ctx.execute_script(VERSION_STAMPS_SCHEMA)
+        return
+    
+    for table in STAMPED_TABLES:
+        for event in ('insert', 'update', 'delete'):
+            ctx.execute(f'DROP TRIGGER IF EXISTS {table}_data_version_{event}')
+    ctx.execute('DROP TABLE IF EXISTS data_versions')
+    
+    ctx.execute('CREATE TABLE IF NOT EXISTS row_version_seq (value INTEGER NOT NULL)')
+    ctx.execute('''
+        INSERT INTO row_version_seq (value)
+        SELECT COALESCE(MAX(row_version), 0) FROM requests
+        WHERE NOT EXISTS (SELECT 1 FROM row_version_seq)
+    ''')
+    
+    ctx.add_column('users', 'row_version', 'INTEGER NOT NULL DEFAULT 0')
+    
+    # Версия заявки по-прежнему обновляется вместе с updated_at
+    ctx.execute('DROP TRIGGER IF EXISTS update_requests_timestamp')
+    ctx.execute('''
+        CREATE TRIGGER update_requests_timestamp
+        AFTER UPDATE ON requests
+        BEGIN
+            UPDATE row_version_seq SET value = value + 1;
+            UPDATE requests SET updated_at = CURRENT_TIMESTAMP,
+                                row_version = (SELECT value FROM row_version_seq)
+            WHERE requestID = NEW.requestID;
+        END;
+    ''')
+    
+    for table, key in STAMPED_TABLES.items():
+        events = ('INSERT',) if table == 'requests' else ('INSERT', 'UPDATE')
+        for event in events:
+            ctx.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_row_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE row_version_seq SET value = value + 1;
+                    UPDATE {table} SET row_version = (SELECT value FROM row_version_seq)
+                    WHERE {key} = NEW.{key};
+                END;
+            ''')
+        ctx.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_row_version ON {table}(row_version)')
\ No newline at end of file
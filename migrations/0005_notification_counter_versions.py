@@ -0,0 +1,14 @@
+"""Версии строк счетчиков непрочитанных уведомлений (PostgreSQL)
+
+Канал уведомлений в PostgreSQL определял изменения по сумме всех
+счетчиков - полный просмотр notification_counters на каждом опросе.
+Теперь строке счетчика ставится номер из row_version_seq (0004), и
+опрос читает MAX(row_version) по индексу. В SQLite канал опрашивает
+PRAGMA data_version, схема не меняется.
+"""
+
+def upgrade(ctx):
+    if ctx.dialect != 'sqlite':
+        from storage.postgres import COUNTER_STAMPS_SCHEMA
+        
+        ctx.execute_script(COUNTER_STAMPS_SCHEMA)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, List
 from enum import Enum
 
@@ -26,6 +26,17 @@ class Priority(Enum):
     MEDIUM_HIGH = 2
     HIGH = 1
 
+# Нормативный срок ремонта (дней) по приоритету
+SLA_DAYS = {
+    Priority.HIGH.value: 3,
+    Priority.MEDIUM_HIGH.value: 5,
+    Priority.MEDIUM.value: 7,
+    Priority.MEDIUM_LOW.value: 10,
+    Priority.LOW.value: 14
+}
+
+DEFAULT_SLA_DAYS = 7
+
 @dataclass
 class User:
     """Модель пользователя"""
@@ -70,7 +81,8 @@ class User:
             'delete_request': [UserType.MANAGER.value],
             'assign_master': [UserType.MANAGER.value, UserType.OPERATOR.value],
             'view_statistics': [UserType.MANAGER.value, UserType.OPERATOR.value, UserType.QUALITY_MANAGER.value],
-            'quality_control': [UserType.QUALITY_MANAGER.value]
+            'quality_control': [UserType.QUALITY_MANAGER.value],
+            'view_diagnostics': [UserType.MANAGER.value]
         }
         
         return self.type in permissions.get(permission, [])
@@ -90,6 +102,7 @@ class Request:
     clientID: int
     qualityManagerID: Optional[int] = None
     extendedDeadline: Optional[str] = None
+    dueDate: Optional[str] = None
     estimatedCost: float = 0.0
     actualCost: float = 0.0
     priority: int = 3
@@ -148,10 +161,27 @@ class Request:
             end = datetime.now()
             return (end - start).days
     
-    def is_overdue(self, threshold_days=7) -> bool:
-        """Проверить, просрочена ли заявка"""
-        days = self.calculate_repair_days()
-        return days is not None and days > threshold_days and self.requestStatus != RequestStatus.READY.value
+    def get_due_date(self) -> Optional[str]:
+        """Крайний срок: продленный или по нормативу приоритета"""
+        if self.dueDate:
+            return self.dueDate
+        if self.extendedDeadline:
+            return self.extendedDeadline
+        if not self.startDate:
+            return None
+        
+        start = datetime.strptime(self.startDate, "%Y-%m-%d")
+        sla_days = SLA_DAYS.get(self.priority, DEFAULT_SLA_DAYS)
+        return (start + timedelta(days=sla_days)).strftime("%Y-%m-%d")
+    
+    def is_overdue(self, threshold_days=0) -> bool:
+        """Проверить, просрочена ли заявка (более чем на threshold_days после срока)"""
+        due_date = self.get_due_date()
+        if not due_date or self.requestStatus == RequestStatus.READY.value:
+            return False
+        
+        days = (datetime.now() - datetime.strptime(due_date, "%Y-%m-%d")).days
+        return days > threshold_days
     
     def is_completed(self) -> bool:
         """Проверить, завершена ли заявка"""
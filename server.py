@@ -0,0 +1,21 @@
+import argparse
+from aiohttp import web
+from api import create_app
+from async_database import AsyncDatabase
+
+def main():
+    """Точка входа REST API сервера"""
+    parser = argparse.ArgumentParser(description="REST API сервисного центра")
+    parser.add_argument('--host', default='127.0.0.1', help="адрес (по умолчанию только локальный)")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--db', default='repair_service.db', help="файл базы данных SQLite или адрес postgresql://...")
+    parser.add_argument('--workers', type=int, default=8, help="размер пула потоков БД")
+    args = parser.parse_args()
+    
+    db = AsyncDatabase(args.db, workers=args.workers, concurrent=True)
+    
+    # Отключение клиента отменяет обработчик и прерывает его запрос к БД
+    web.run_app(create_app(db), host=args.host, port=args.port, handler_cancellation=True)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,13 @@
+from .sqlite import SQLiteBackend
+
+def create_backend(url, **kwargs):
+    """Хранилище по адресу: postgresql://... - PostgreSQL, иначе файл SQLite"""
+    if url.startswith(('postgresql://', 'postgres://')):
+        from .postgres import PostgresBackend
+        return PostgresBackend(url, **kwargs)
+    return SQLiteBackend(url, **kwargs)
+
+__all__ = [
+    'SQLiteBackend',
+    'create_backend'
+]
\ No newline at end of file
@@ -0,0 +1,788 @@
+import io
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+from psycopg2 import errorcodes
+
+from models import SLA_DAYS, DEFAULT_SLA_DAYS
+
+UTC_NOW = "(CURRENT_TIMESTAMP AT TIME ZONE 'UTC')"
+
+def _sla_case(priority):
+    """SQL-выражение норматива дней по приоритету"""
+    cases = ' '.join(f"WHEN {p} THEN {days}" for p, days in sorted(SLA_DAYS.items()))
+    return f"CASE {priority} {cases} ELSE {DEFAULT_SLA_DAYS} END"
+
+SCHEMA = f'''
+    CREATE TABLE IF NOT EXISTS users (
+        userID INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        fio TEXT NOT NULL,
+        phone TEXT NOT NULL,
+        login TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        type TEXT NOT NULL CHECK(type IN ('Менеджер', 'Мастер', 'Оператор', 'Заказчик', 'Менеджер качества')),
+        created_at TIMESTAMP(0) DEFAULT {UTC_NOW},
+        is_active INTEGER DEFAULT 1
+    );
+    
+    CREATE TABLE IF NOT EXISTS requests (
+        requestID INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        startDate DATE NOT NULL,
+        homeTechType TEXT NOT NULL,
+        homeTechModel TEXT NOT NULL,
+        problemDescription TEXT NOT NULL,
+        requestStatus TEXT NOT NULL CHECK(requestStatus IN ('Новая заявка', 'В процессе ремонта', 'Ожидание запчастей', 'Готова к выдаче')),
+        completionDate DATE,
+        repairParts TEXT,
+        masterID INTEGER REFERENCES users(userID) ON DELETE SET NULL,
+        clientID INTEGER NOT NULL REFERENCES users(userID) ON DELETE CASCADE,
+        qualityManagerID INTEGER REFERENCES users(userID) ON DELETE SET NULL,
+        extendedDeadline DATE,
+        dueDate DATE,
+        estimatedCost DOUBLE PRECISION DEFAULT 0,
+        actualCost DOUBLE PRECISION DEFAULT 0,
+        priority INTEGER DEFAULT 1 CHECK(priority BETWEEN 1 AND 5),
+        notes TEXT,
+        created_at TIMESTAMP(0) DEFAULT {UTC_NOW},
+        updated_at TIMESTAMP(0) DEFAULT {UTC_NOW}
+    );
+    
+    CREATE TABLE IF NOT EXISTS comments (
+        commentID INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        message TEXT NOT NULL,
+        masterID INTEGER NOT NULL REFERENCES users(userID) ON DELETE CASCADE,
+        requestID INTEGER NOT NULL REFERENCES requests(requestID) ON DELETE CASCADE,
+        timestamp TIMESTAMP(0) DEFAULT {UTC_NOW},
+        is_private INTEGER DEFAULT 0
+    );
+    
+    CREATE TABLE IF NOT EXISTS statistics (
+        statID INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        date DATE NOT NULL UNIQUE,
+        total_requests INTEGER DEFAULT 0,
+        completed_requests INTEGER DEFAULT 0,
+        avg_repair_time DOUBLE PRECISION DEFAULT 0,
+        total_revenue DOUBLE PRECISION DEFAULT 0
+    );
+    
+    CREATE TABLE IF NOT EXISTS parts (
+        partID INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        partName TEXT NOT NULL,
+        vendorCode TEXT UNIQUE,
+        price DOUBLE PRECISION,
+        quantity INTEGER DEFAULT 0,
+        min_quantity INTEGER DEFAULT 5,
+        supplier TEXT,
+        last_ordered DATE
+    );
+    
+    CREATE TABLE IF NOT EXISTS request_parts (
+        requestID INTEGER NOT NULL REFERENCES requests(requestID) ON DELETE CASCADE,
+        partID INTEGER NOT NULL REFERENCES parts(partID) ON DELETE CASCADE,
+        quantity INTEGER NOT NULL,
+        used_date DATE DEFAULT CURRENT_DATE,
+        PRIMARY KEY (requestID, partID)
+    );
+    
+    CREATE TABLE IF NOT EXISTS notifications (
+        notificationID INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        userID INTEGER NOT NULL REFERENCES users(userID) ON DELETE CASCADE,
+        message TEXT NOT NULL,
+        type TEXT NOT NULL,
+        is_read INTEGER DEFAULT 0,
+        created_at TIMESTAMP(0) DEFAULT {UTC_NOW}
+    );
+    
+    CREATE TABLE IF NOT EXISTS notification_counters (
+        userID INTEGER PRIMARY KEY,
+        unread INTEGER NOT NULL DEFAULT 0
+    );
+    
+    CREATE TABLE IF NOT EXISTS sla_alerts (
+        requestID INTEGER NOT NULL REFERENCES requests(requestID) ON DELETE CASCADE,
+        kind TEXT NOT NULL,
+        dueDate DATE NOT NULL,
+        created_at TIMESTAMP(0) DEFAULT {UTC_NOW},
+        PRIMARY KEY (requestID, kind, dueDate)
+    );
+    
+    CREATE TABLE IF NOT EXISTS repair_time_sketches (
+        period DATE NOT NULL,
+        dimension TEXT NOT NULL,
+        dim_key TEXT NOT NULL DEFAULT '',
+        count INTEGER DEFAULT 0,
+        sketch TEXT NOT NULL,
+        PRIMARY KEY (dimension, period, dim_key)
+    );
+    
+    CREATE INDEX IF NOT EXISTS idx_requests_status ON requests(requestStatus);
+    CREATE INDEX IF NOT EXISTS idx_requests_master ON requests(masterID);
+    CREATE INDEX IF NOT EXISTS idx_requests_client ON requests(clientID);
+    CREATE INDEX IF NOT EXISTS idx_comments_request ON comments(requestID);
+    CREATE INDEX IF NOT EXISTS idx_users_type ON users(type);
+    CREATE INDEX IF NOT EXISTS idx_requests_priority ON requests(priority);
+    CREATE INDEX IF NOT EXISTS idx_requests_updated ON requests(updated_at);
+    CREATE INDEX IF NOT EXISTS idx_notifications_user_unread ON notifications(userID, is_read, created_at);
+    CREATE INDEX IF NOT EXISTS idx_requests_open_due ON requests(dueDate)
+        WHERE requestStatus != 'Готова к выдаче';
+    
+    CREATE OR REPLACE FUNCTION requests_before_write() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' THEN
+            NEW.updated_at := {UTC_NOW};
+        END IF;
+        IF TG_OP = 'INSERT'
+           OR NEW.startDate IS DISTINCT FROM OLD.startDate
+           OR NEW.priority IS DISTINCT FROM OLD.priority
+           OR NEW.extendedDeadline IS DISTINCT FROM OLD.extendedDeadline THEN
+            NEW.dueDate := COALESCE(NEW.extendedDeadline, NEW.startDate + {_sla_case('NEW.priority')});
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    
+    DROP TRIGGER IF EXISTS requests_before_write ON requests;
+    CREATE TRIGGER requests_before_write
+        BEFORE INSERT OR UPDATE ON requests
+        FOR EACH ROW EXECUTE FUNCTION requests_before_write();
+    
+    CREATE OR REPLACE FUNCTION notifications_unread_counter() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            IF OLD.is_read = 0 THEN
+                UPDATE notification_counters SET unread = GREATEST(0, unread - 1) WHERE userID = OLD.userID;
+            END IF;
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            IF NEW.is_read = 0 THEN
+                INSERT INTO notification_counters (userID, unread) VALUES (NEW.userID, 1)
+                ON CONFLICT (userID) DO UPDATE SET unread = notification_counters.unread + 1;
+            END IF;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql;
+    
+    DROP TRIGGER IF EXISTS notifications_unread_counter ON notifications;
+    CREATE TRIGGER notifications_unread_counter
+        AFTER INSERT OR UPDATE OF is_read OR DELETE ON notifications
+        FOR EACH ROW EXECUTE FUNCTION notifications_unread_counter();
+'''
+
+# Счетчики версий данных (для ETag): номер версии строки заявки и общие
+# версии таблиц, увеличиваемые каждым изменяющим запросом
+VERSIONS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS data_versions (
+        name TEXT PRIMARY KEY,
+        version BIGINT NOT NULL DEFAULT 0
+    );
+    INSERT INTO data_versions (name) VALUES ('requests'), ('users') ON CONFLICT DO NOTHING;
+    
+    ALTER TABLE requests ADD COLUMN IF NOT EXISTS row_version INTEGER NOT NULL DEFAULT 0;
+    
+    CREATE OR REPLACE FUNCTION requests_row_version() RETURNS trigger AS $$
+    BEGIN
+        NEW.row_version := OLD.row_version + 1;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    
+    DROP TRIGGER IF EXISTS requests_row_version ON requests;
+    CREATE TRIGGER requests_row_version
+        BEFORE UPDATE ON requests
+        FOR EACH ROW EXECUTE FUNCTION requests_row_version();
+    
+    CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+    BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE name = TG_ARGV[0];
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql;
+    
+    DROP TRIGGER IF EXISTS requests_data_version ON requests;
+    CREATE TRIGGER requests_data_version
+        AFTER INSERT OR UPDATE OR DELETE ON requests
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('requests');
+    
+    DROP TRIGGER IF EXISTS users_data_version ON users;
+    CREATE TRIGGER users_data_version
+        AFTER INSERT OR UPDATE OR DELETE ON users
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('users');
+'''
+
+# Версии строк из последовательности (0004): nextval не блокирует другие
+# транзакции, в отличие от общего счетчика data_versions
+VERSION_STAMPS_SCHEMA = '''
+    DROP TRIGGER IF EXISTS requests_data_version ON requests;
+    DROP TRIGGER IF EXISTS users_data_version ON users;
+    DROP FUNCTION IF EXISTS bump_data_version();
+    DROP TABLE IF EXISTS data_versions;
+    
+    CREATE SEQUENCE IF NOT EXISTS row_version_seq;
+    SELECT setval('row_version_seq', GREATEST(1, (SELECT MAX(row_version) FROM requests)));
+    
+    ALTER TABLE users ADD COLUMN IF NOT EXISTS row_version BIGINT NOT NULL DEFAULT 0;
+    
+    CREATE OR REPLACE FUNCTION stamp_row_version() RETURNS trigger AS $$
+    BEGIN
+        NEW.row_version := nextval('row_version_seq');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    
+    DROP TRIGGER IF EXISTS requests_row_version ON requests;
+    DROP FUNCTION IF EXISTS requests_row_version();
+    CREATE TRIGGER requests_row_version
+        BEFORE INSERT OR UPDATE ON requests
+        FOR EACH ROW EXECUTE FUNCTION stamp_row_version();
+    
+    DROP TRIGGER IF EXISTS users_row_version ON users;
+    CREATE TRIGGER users_row_version
+        BEFORE INSERT OR UPDATE ON users
+        FOR EACH ROW EXECUTE FUNCTION stamp_row_version();
+    
+    CREATE INDEX IF NOT EXISTS idx_requests_row_version ON requests(row_version);
+    CREATE INDEX IF NOT EXISTS idx_users_row_version ON users(row_version);
+'''
+
+# Версии счетчиков непрочитанных (0005): канал уведомлений опрашивает
+# MAX(row_version) по индексу вместо суммы всех счетчиков
+COUNTER_STAMPS_SCHEMA = '''
+    ALTER TABLE notification_counters ADD COLUMN IF NOT EXISTS row_version BIGINT NOT NULL DEFAULT 0;
+    
+    DROP TRIGGER IF EXISTS notification_counters_row_version ON notification_counters;
+    CREATE TRIGGER notification_counters_row_version
+        BEFORE INSERT OR UPDATE ON notification_counters
+        FOR EACH ROW EXECUTE FUNCTION stamp_row_version();
+    
+    CREATE INDEX IF NOT EXISTS idx_notification_counters_row_version ON notification_counters(row_version);
+'''
+
+# PostgreSQL приводит имена без кавычек к нижнему регистру: для
+# совместимости с sqlite3.Row колонки результата получают исходные имена
+CANONICAL_NAMES = {name.lower(): name for name in re.findall(r'\b[a-z]+(?:[A-Z][a-z]*)+\b', SCHEMA)}
+
+# Ключи таблиц для INSERT OR REPLACE и cursor.lastrowid
+PRIMARY_KEYS = {
+    'users': ('userID',),
+    'requests': ('requestID',),
+    'comments': ('commentID',),
+    'statistics': ('statID',),
+    'parts': ('partID',),
+    'request_parts': ('requestID', 'partID'),
+    'notifications': ('notificationID',),
+    'notification_counters': ('userID',),
+    'sla_alerts': ('requestID', 'kind', 'dueDate'),
+    'repair_time_sketches': ('dimension', 'period', 'dim_key')
+}
+IDENTITY_TABLES = {'users', 'requests', 'comments', 'statistics', 'parts', 'notifications'}
+
+STRFTIME_FORMATS = {
+    '%Y': 'YYYY', '%m': 'MM', '%d': 'DD', '%H': 'HH24',
+    '%M': 'MI', '%S': 'SS', '%j': 'DDD', '%W': 'IW', '%%': '%'
+}
+
+LOCK_ERRORS = {errorcodes.LOCK_NOT_AVAILABLE, errorcodes.DEADLOCK_DETECTED, errorcodes.SERIALIZATION_FAILURE}
+
+DML = ('INSERT', 'UPDATE', 'DELETE')
+
+# --- Перевод SQL диалекта SQLite ---
+
+def _outside_strings(sql, replace):
+    """Применить replace(fragment) к частям SQL вне строковых литералов"""
+    parts = re.split(r"('(?:[^']|'')*')", sql)
+    return ''.join(part if i % 2 else replace(part) for i, part in enumerate(parts))
+
+def _split_args(text):
+    """Аргументы вызова функции верхнего уровня"""
+    args, depth, quoted, current = [], 0, False, ''
+    for char in text:
+        if char == "'":
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and char == ',' and depth == 0:
+            args.append(current.strip())
+            current = ''
+            continue
+        current += char
+    args.append(current.strip())
+    return args
+
+def _timestamp(args, utc_offset):
+    """Выражение метки времени по аргументам date()/datetime()/julianday()"""
+    value, *modifiers = args
+    local = "'localtime'" in [m.lower() for m in modifiers]
+    
+    if value.lower() == "'now'":
+        result = UTC_NOW
+    else:
+        result = f"CAST({value} AS TIMESTAMP)"
+    
+    if local:
+        result = f"({result} + INTERVAL '{utc_offset} seconds')"
+    
+    for modifier in modifiers:
+        if modifier.lower() not in ("'localtime'", "'utc'"):
+            result = f"({result} + CAST({modifier} AS INTERVAL))"
+    
+    return result
+
+def _strftime(args, utc_offset):
+    fmt, *rest = args
+    pattern = re.sub(r'%.', lambda m: STRFTIME_FORMATS.get(m.group(0), m.group(0)), fmt)
+    return f"to_char({_timestamp(rest, utc_offset)}, {pattern})"
+
+FUNCTIONS = {
+    'julianday': lambda args, offset: f"(EXTRACT(EPOCH FROM {_timestamp(args, offset)}) / 86400.0 + 2440587.5)",
+    'datetime': lambda args, offset: f"CAST({_timestamp(args, offset)} AS TIMESTAMP(0))",
+    'date': lambda args, offset: f"CAST({_timestamp(args, offset)} AS DATE)",
+    'strftime': _strftime
+}
+
+FUNCTION_CALL = re.compile(r"('(?:[^']|'')*')|\b(julianday|datetime|date|strftime)\s*\(", re.IGNORECASE)
+
+def _translate_functions(sql, utc_offset):
+    """Замена функций даты SQLite выражениями PostgreSQL"""
+    result, pos = [], 0
+    while True:
+        match = FUNCTION_CALL.search(sql, pos)
+        if not match:
+            break
+        if match.group(1):
+            result.append(sql[pos:match.end()])
+            pos = match.end()
+            continue
+        
+        start = end = match.end()
+        depth, quoted = 1, False
+        while depth:
+            if sql[end] == "'":
+                quoted = not quoted
+            elif not quoted:
+                depth += {'(': 1, ')': -1}.get(sql[end], 0)
+            end += 1
+        
+        args = [_translate_functions(arg, utc_offset) for arg in _split_args(sql[start:end - 1])]
+        result.append(sql[pos:match.start()])
+        result.append(FUNCTIONS[match.group(2).lower()](args, utc_offset))
+        pos = end
+    
+    result.append(sql[pos:])
+    return ''.join(result)
+
+def _translate_insert(sql):
+    """INSERT OR IGNORE / INSERT OR REPLACE -> INSERT ... ON CONFLICT"""
+    match = re.match(r'\s*INSERT\s+OR\s+(IGNORE|REPLACE)\s+INTO\s+(\w+)\s*(?:\(([^)]*)\))?', sql, re.IGNORECASE)
+    if not match:
+        return sql
+    
+    mode, table, columns = match.group(1).upper(), match.group(2), match.group(3)
+    body = f"INSERT INTO {sql[match.start(2):]}".rstrip().rstrip(';')
+    
+    if mode == 'IGNORE':
+        return f"{body} ON CONFLICT DO NOTHING"
+    
+    keys = PRIMARY_KEYS[table.lower()]
+    updates = [c.strip() for c in columns.split(',') if c.strip().lower() not in {k.lower() for k in keys}]
+    assignments = ', '.join(f"{c} = EXCLUDED.{c}" for c in updates)
+    return f"{body} ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {assignments}"
+
+@lru_cache(maxsize=512)
+def translate(sql, utc_offset=0):
+    """Перевод запроса SQLite в PostgreSQL
+    
+    Возвращает (запрос или None для пропускаемых PRAGMA, таблица с
+    автоинкрементным ключом для lastrowid или None).
+    """
+    stripped = sql.strip()
+    upper = stripped.upper()
+    
+    if upper.startswith('PRAGMA'):
+        match = re.match(r'PRAGMA\s+table_info\s*\(\s*(\w+)\s*\)', stripped, re.IGNORECASE)
+        if not match:
+            return None, None
+        return (f"SELECT column_name AS name FROM information_schema.columns "
+                f"WHERE table_name = '{match.group(1).lower()}' ORDER BY ordinal_position"), None
+    
+    if re.match(r'BEGIN(\s+(IMMEDIATE|DEFERRED|EXCLUSIVE))?\s*;?$', upper):
+        return 'BEGIN', None
+    
+    sql = _translate_functions(stripped, utc_offset)
+    sql = _translate_insert(sql)
+    sql = _outside_strings(sql, lambda part: re.sub(r'((?:\w+\.)?\w+)\s+LIKE\b', r'CAST(\1 AS TEXT) ILIKE', part))
+    sql = sql.replace('%', '%%')
+    sql = _outside_strings(sql, lambda part: part.replace('?', '%s'))
+    
+    identity_table = None
+    match = re.match(r'INSERT\s+INTO\s+(\w+)', sql, re.IGNORECASE)
+    if match and match.group(1).lower() in IDENTITY_TABLES and re.search(r'\bVALUES\b', sql, re.IGNORECASE) \
+            and 'RETURNING' not in sql.upper():
+        identity_table = match.group(1).lower()
+        sql = f"{sql} RETURNING {PRIMARY_KEYS[identity_table][0]}"
+    
+    return sql, identity_table
+
+def _utc_offset():
+    return time.localtime().tm_gmtoff
+
+def _rollback(raw):
+    """Откат транзакции, открытой явным BEGIN в режиме autocommit"""
+    if not raw.closed and raw.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+        if raw.autocommit:
+            raw.cursor().execute('ROLLBACK')
+        else:
+            raw.rollback()
+
+def _convert_error(error):
+    """Исключение psycopg2 -> аналогичное исключение sqlite3"""
+    message = str(error).strip()
+    if error.pgcode in LOCK_ERRORS:
+        return sqlite3.OperationalError(f"database is locked: {message}")
+    if error.pgcode == errorcodes.QUERY_CANCELED:
+        return sqlite3.OperationalError('interrupted')
+    if isinstance(error, psycopg2.IntegrityError):
+        return sqlite3.IntegrityError(message)
+    return sqlite3.OperationalError(message)
+
+# --- Соединения ---
+
+class PgRow:
+    """Строка результата с доступом по индексу и имени (как sqlite3.Row)"""
+    
+    __slots__ = ('_names', '_index', '_values')
+    
+    def __init__(self, names, index, values):
+        self._names = names
+        self._index = index
+        self._values = values
+    
+    def keys(self):
+        return list(self._names)
+    
+    def __getitem__(self, key):
+        if isinstance(key, (int, slice)):
+            return self._values[key]
+        try:
+            return self._values[self._index[key]]
+        except KeyError:
+            return self._values[self._index[key.lower()]]
+    
+    def __iter__(self):
+        return iter(self._values)
+    
+    def __len__(self):
+        return len(self._values)
+    
+    def __eq__(self, other):
+        return tuple(self) == tuple(other)
+    
+    def __repr__(self):
+        return f"PgRow({dict(zip(self._names, self._values))})"
+
+class PgCursor:
+    """Курсор с интерфейсом sqlite3.Cursor поверх psycopg2"""
+    
+    def __init__(self, connection):
+        self.connection = connection
+        self._cursor = connection._raw.cursor()
+        self._names = None
+        self._index = None
+        self.lastrowid = None
+        self.rowcount = -1
+    
+    @property
+    def description(self):
+        if self._names is None:
+            return None
+        return [(name, None, None, None, None, None, None) for name in self._names]
+    
+    def execute(self, sql, params=()):
+        statement, identity_table = translate(sql, _utc_offset())
+        self._names = None
+        if statement is None:
+            return self
+        
+        self.connection._before(statement)
+        try:
+            self._cursor.execute(statement, tuple(params))
+        except psycopg2.Error as e:
+            self.connection._after_error()
+            raise _convert_error(e) from e
+        
+        self.rowcount = self._cursor.rowcount
+        if self._cursor.description:
+            self._names = [CANONICAL_NAMES.get(column.name, column.name) for column in self._cursor.description]
+            self._index = {}
+            for i, name in enumerate(self._names):
+                self._index[name] = i
+                self._index.setdefault(name.lower(), i)
+        
+        if identity_table:
+            row = self._cursor.fetchone()
+            self.lastrowid = row[0] if row else None
+            self._names = None
+        
+        return self
+    
+    def executemany(self, sql, seq_of_params):
+        statement, identity_table = translate(sql, _utc_offset())
+        if statement is None:
+            return self
+        if identity_table:
+            statement = statement[:statement.upper().rindex(' RETURNING ')]
+        
+        self.connection._before(statement)
+        try:
+            self._cursor.executemany(statement, [tuple(params) for params in seq_of_params])
+        except psycopg2.Error as e:
+            self.connection._after_error()
+            raise _convert_error(e) from e
+        
+        self.rowcount = self._cursor.rowcount
+        self._names = None
+        return self
+    
+    def _wrap(self, values):
+        return PgRow(self._names, self._index, values)
+    
+    def fetchone(self):
+        if self._names is None:
+            return None
+        values = self._cursor.fetchone()
+        return None if values is None else self._wrap(values)
+    
+    def fetchmany(self, size=None):
+        if self._names is None:
+            return []
+        return [self._wrap(values) for values in self._cursor.fetchmany(size or self._cursor.arraysize)]
+    
+    def fetchall(self):
+        if self._names is None:
+            return []
+        return [self._wrap(values) for values in self._cursor.fetchall()]
+    
+    def __iter__(self):
+        return iter(self.fetchall())
+    
+    def close(self):
+        self._cursor.close()
+
+class PgConnection:
+    """Соединение из пула с интерфейсом sqlite3.Connection
+    
+    Соединение psycopg2 работает в режиме autocommit, а транзакции
+    открываются так же, как в sqlite3: при isolation_level не None перед
+    первым изменяющим запросом выполняется BEGIN, фиксация - commit() или
+    выход из with. Ошибка запроса внутри такой транзакции откатывает ее
+    целиком (PostgreSQL не продолжает прерванную транзакцию).
+    
+    В отличие от sqlite3, выход из with еще и возвращает соединение в пул
+    (приложение открывает соединения как with db.get_connection() as conn),
+    после этого соединение закрыто.
+    """
+    
+    def __init__(self, backend, raw):
+        self.backend = backend
+        self._raw = raw
+        self.isolation_level = ''
+        self.row_factory = None
+    
+    @property
+    def in_transaction(self):
+        return self._raw is not None and self._raw.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE
+    
+    def _before(self, statement):
+        if self.isolation_level is not None and not self.in_transaction \
+                and statement.lstrip()[:6].upper() in DML:
+            self._raw.cursor().execute('BEGIN')
+    
+    def _after_error(self):
+        if self.isolation_level is not None:
+            _rollback(self._raw)
+    
+    def cursor(self):
+        if self._raw is None:
+            raise sqlite3.ProgrammingError('Cannot operate on a closed database.')
+        return PgCursor(self)
+    
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+    
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+    
+    def executescript(self, script):
+        """Выполнить скрипт PostgreSQL как есть (без перевода диалекта)"""
+        try:
+            self._raw.cursor().execute(script)
+        except psycopg2.Error as e:
+            self._after_error()
+            raise _convert_error(e) from e
+    
+    def commit(self):
+        if self.in_transaction:
+            self._raw.cursor().execute('COMMIT')
+    
+    def rollback(self):
+        if self.in_transaction:
+            self._raw.cursor().execute('ROLLBACK')
+    
+    def interrupt(self):
+        """Прервать выполняющийся запрос (аналог sqlite3 interrupt)"""
+        self._raw.cancel()
+    
+    def close(self):
+        """Вернуть соединение в пул"""
+        if self._raw is None:
+            return
+        raw, self._raw = self._raw, None
+        self.backend._release(raw)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                self.rollback()
+        finally:
+            self.close()
+        return False
+    
+    def __del__(self):
+        # Соединения, не закрытые ни явно, ни выходом из with, возвращаются
+        # в пул при сборке мусора
+        try:
+            self.close()
+        except Exception:
+            pass
+
+def _copy_value(value):
+    """Значение в текстовом формате COPY"""
+    if value is None:
+        return '\\N'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+def _as_text(value, cursor):
+    return value
+
+def _as_float(value, cursor):
+    return None if value is None else float(value)
+
+# Даты и метки времени возвращаются строками, numeric - float, как в SQLite
+TYPE_CASTERS = [
+    psycopg2.extensions.new_type((1082, 1114), 'SQLITE_TEXT', _as_text),
+    psycopg2.extensions.new_type((1700,), 'SQLITE_REAL', _as_float)
+]
+
+class PostgresBackend:
+    """Хранилище в PostgreSQL (требуется psycopg2)
+    
+    Соединения берутся из пула psycopg2; при исчерпании пула запрос ждет
+    busy_timeout секунд. Запросы приложения пишутся на диалекте SQLite и
+    переводятся функцией translate().
+    """
+    
+    dialect = 'postgresql'
+    
+    def __init__(self, dsn, min_connections=1, max_connections=20, busy_timeout=5.0, wal=False):
+        self.dsn = dsn
+        self.busy_timeout = busy_timeout
+        self.max_connections = max_connections
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._pool = psycopg2.pool.ThreadedConnectionPool(
+            min_connections, max_connections, dsn,
+            options=f"-c timezone=UTC -c lock_timeout={int(busy_timeout * 1000)}"
+        )
+    
+    def _acquire(self):
+        if not self._slots.acquire(timeout=self.busy_timeout):
+            raise sqlite3.OperationalError('database is locked: нет свободных соединений в пуле')
+        
+        try:
+            raw = self._pool.getconn()
+            if raw.autocommit is False:
+                raw.autocommit = True
+                for caster in TYPE_CASTERS:
+                    psycopg2.extensions.register_type(caster, raw)
+        except Exception:
+            self._slots.release()
+            raise
+        
+        return raw
+    
+    def _release(self, raw):
+        try:
+            _rollback(raw)
+            self._pool.putconn(raw, close=bool(raw.closed))
+        finally:
+            self._slots.release()
+    
+    def connect(self, check_same_thread=True):
+        """Соединение из пула (закрытие возвращает его в пул)"""
+        return PgConnection(self, self._acquire())
+    
+    def bulk_insert(self, table, columns, rows):
+        """Пакетная вставка через COPY FROM STDIN; возвращает количество"""
+        buffer = io.StringIO()
+        count = 0
+        for row in rows:
+            buffer.write('\t'.join(_copy_value(value) for value in row) + '\n')
+            count += 1
+        buffer.seek(0)
+        
+        raw = self._acquire()
+        try:
+            with raw.cursor() as cursor:
+                cursor.execute('BEGIN')
+                cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+                
+                # Явно заданные ключи не сдвигают последовательность IDENTITY
+                key = PRIMARY_KEYS.get(table, (None,))[0]
+                if table in IDENTITY_TABLES and key in columns:
+                    cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', '{key.lower()}'), "
+                                   f"COALESCE(MAX({key}), 0) + 1, false) FROM {table}")
+                cursor.execute('COMMIT')
+        except psycopg2.Error as e:
+            _rollback(raw)
+            raise _convert_error(e) from e
+        finally:
+            self._release(raw)
+        
+        return count
+    
+    def stream(self, query, params=(), batch_size=500):
+        """Построчное чтение через курсор на стороне сервера (словари)"""
+        statement, _ = translate(query, _utc_offset())
+        raw = self._acquire()
+        try:
+            raw.autocommit = False
+            with raw.cursor(name=f'stream_{id(raw)}') as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(statement, tuple(params))
+                names = None
+                for values in cursor:
+                    if names is None:
+                        names = [CANONICAL_NAMES.get(column.name, column.name) for column in cursor.description]
+                    yield dict(zip(names, values))
+        except psycopg2.Error as e:
+            raise _convert_error(e) from e
+        finally:
+            _rollback(raw)
+            raw.autocommit = True
+            self._release(raw)
+    
+    def close(self):
+        self._pool.closeall()
\ No newline at end of file
@@ -0,0 +1,51 @@
+import sqlite3
+
+class SQLiteBackend:
+    """Хранилище в файле SQLite (по умолчанию)"""
+    
+    dialect = 'sqlite'
+    
+    def __init__(self, path, busy_timeout=5.0, wal=False):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.wal = wal
+    
+    def connect(self, check_same_thread=True):
+        """Новое соединение (строки - sqlite3.Row)"""
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                               check_same_thread=check_same_thread)
+        conn.row_factory = sqlite3.Row
+        if self.wal:
+            conn.execute('PRAGMA synchronous = NORMAL')
+        return conn
+    
+    def bulk_insert(self, table, columns, rows):
+        """Пакетная вставка строк; возвращает количество"""
+        rows = list(rows)
+        placeholders = ', '.join('?' * len(columns))
+        
+        conn = self.connect()
+        try:
+            with conn:
+                conn.executemany(f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({placeholders})', rows)
+        finally:
+            conn.close()
+        
+        return len(rows)
+    
+    def stream(self, query, params=(), batch_size=500):
+        """Построчное чтение результата запроса порциями (словари)"""
+        conn = self.connect()
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        finally:
+            conn.close()
+    
+    def close(self):
+        pass
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""Общие фикстуры тестов
+
+PostgreSQL для тестов хранилища берется по порядку: адрес из переменной
+REPAIR_TEST_PG_DSN, встроенный сервер pgserver (pip install pgserver),
+контейнер testcontainers (нужен Docker). Если ничего из этого нет, тесты
+с фикстурой pg_dsn пропускаются.
+"""
+import os
+import sys
+import uuid
+from urllib.parse import urlsplit, urlunsplit
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def _embedded_server(directory):
+    try:
+        import pgserver
+    except ImportError:
+        return None, None
+    server = pgserver.get_server(directory, cleanup_mode='stop')
+    return server.get_uri(), server.cleanup
+
+def _container():
+    try:
+        from testcontainers.postgres import PostgresContainer
+    except ImportError:
+        return None, None
+    try:
+        container = PostgresContainer('postgres:16-alpine', driver=None).start()
+    except Exception:
+        # Docker недоступен
+        return None, None
+    return container.get_connection_url(), container.stop
+
+@pytest.fixture(scope='session')
+def pg_server(tmp_path_factory):
+    """Адрес сервера PostgreSQL для тестов (или пропуск)"""
+    pytest.importorskip('psycopg2')
+    
+    dsn = os.environ.get('REPAIR_TEST_PG_DSN')
+    if dsn:
+        yield dsn
+        return
+    
+    dsn, stop = _embedded_server(str(tmp_path_factory.mktemp('pg')))
+    if dsn is None:
+        dsn, stop = _container()
+    if dsn is None:
+        pytest.skip("PostgreSQL недоступен: задайте REPAIR_TEST_PG_DSN или установите pgserver/testcontainers")
+    
+    yield dsn
+    stop()
+
+@pytest.fixture
+def pg_dsn(pg_server):
+    """Адрес отдельной пустой базы на тестовом сервере (удаляется после теста)"""
+    import psycopg2
+    
+    name = f"repair_test_{uuid.uuid4().hex[:12]}"
+    admin = psycopg2.connect(pg_server)
+    admin.autocommit = True
+    admin.cursor().execute(f'CREATE DATABASE {name}')
+    
+    yield urlunsplit(urlsplit(pg_server)._replace(path=f'/{name}'))
+    
+    admin.cursor().execute(f'DROP DATABASE IF EXISTS {name} WITH (FORCE)')
+    admin.close()
+
+@pytest.fixture
+def pg_db(pg_dsn):
+    """Database на PostgreSQL со схемой и демо-данными"""
+    from database import Database
+    
+    db = Database(pg_dsn)
+    yield db
+    db.close()
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """Database на файле SQLite со схемой и демо-данными"""
+    from database import Database
+    
+    db = Database(str(tmp_path / 'repair_service.db'))
+    yield db
+    db.close()
\ No newline at end of file
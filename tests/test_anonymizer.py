@@ -0,0 +1,61 @@
+"""Обезличенная копия базы, которую приложение уже открывало (схема с миграциями)"""
+import sqlite3
+
+import pytest
+
+from database import Database
+from utils.anonymizer import Anonymizer
+
+def rows(path, query):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(query).fetchall()
+    finally:
+        conn.close()
+
+@pytest.fixture
+def source(sqlite_db):
+    path = sqlite_db.db_name
+    with sqlite_db.get_connection() as conn:
+        conn.execute("UPDATE comments SET message = 'Перезвонить по номеру +7 (912) 345-67-89' "
+                     "WHERE commentID = (SELECT MIN(commentID) FROM comments)")
+    sqlite_db.close()
+    return path
+
+def test_copy_of_migrated_database(source, tmp_path):
+    target = str(tmp_path / 'anon.db')
+    counts = Anonymizer('k', upsample=3).run(source, target)
+    
+    for table in ('users', 'parts'):
+        assert counts[table] == rows(source, f'SELECT COUNT(*) FROM {table}')[0][0]
+    for table in ('requests', 'comments', 'request_parts'):
+        assert counts[table] == 3 * rows(source, f'SELECT COUNT(*) FROM {table}')[0][0]
+    
+    # Персональные данные заменены, идентификаторы и связи сохранены
+    original, copy = (dict(rows(path, 'SELECT userID, fio || phone || login FROM users')) for path in (source, target))
+    assert original.keys() == copy.keys()
+    assert not any(original[user_id] == copy[user_id] for user_id in original)
+    assert rows(target, "SELECT COUNT(*) FROM users WHERE password != 'anon'") == [(0,)]
+    assert rows(target, "SELECT COUNT(*) FROM comments WHERE message LIKE '%345-67-89%'") == [(0,)]
+    assert rows(target, '''
+        SELECT COUNT(*) FROM requests r LEFT JOIN users c ON c.userID = r.clientID WHERE c.userID IS NULL
+    ''') == [(0,)]
+    assert rows(target, 'SELECT COUNT(*) FROM requests WHERE dueDate IS NULL') == [(0,)]
+    
+    # Копия открывается приложением: схема актуальна, пересчитанные данные на месте
+    db = Database(target)
+    try:
+        assert db.migrate() == []
+        assert db.get_statistics()['total_requests'] == counts['requests']
+    finally:
+        db.close()
+
+def test_same_key_same_values(source, tmp_path):
+    first, second, other = (str(tmp_path / name) for name in ('a.db', 'b.db', 'c.db'))
+    Anonymizer('k').run(source, first)
+    Anonymizer('k').run(source, second)
+    Anonymizer('other').run(source, other)
+    
+    query = 'SELECT userID, fio, phone, login FROM users ORDER BY userID'
+    assert rows(first, query) == rows(second, query)
+    assert rows(first, query) != rows(other, query)
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""Асинхронный фасад Database"""
+import asyncio
+import sqlite3
+
+import pytest
+
+from async_database import AsyncDatabase
+
+@pytest.fixture
+def async_db(sqlite_db):
+    db = AsyncDatabase(sqlite_db.db_name, workers=2)
+    yield db
+    db.close()
+
+def test_stream_closed_after_pool_shutdown(async_db):
+    connections = []
+    open_connection = async_db.db.open_connection
+    
+    def tracked():
+        conn = open_connection()
+        connections.append(conn)
+        return conn
+    
+    async_db.db.open_connection = tracked
+    
+    async def scenario():
+        stream = async_db.stream('SELECT requestID FROM requests', batch_size=1)
+        first = await stream.__anext__()
+        async_db.close()
+        # Завершение генератора после остановки пула не подменяет исключение
+        await stream.aclose()
+        return first
+    
+    assert 'requestID' in asyncio.run(scenario())
+    with pytest.raises(sqlite3.ProgrammingError):
+        connections[0].execute('SELECT 1')
+
+def test_stream_rows(async_db):
+    async def scenario():
+        return [row['requestID'] async for row in async_db.stream('SELECT requestID FROM requests ORDER BY 1')]
+    
+    ids = asyncio.run(scenario())
+    assert ids == sorted(ids) and len(ids) > 0
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""Советник индексов: рекомендации и миграция вне каталога приложения"""
+import os
+
+import pytest
+
+from utils.index_advisor import IndexAdvisor
+from utils.migrations import Migrator, MIGRATIONS_DIR, migration_files
+
+QUERIES = [('SELECT requestID, startDate FROM requests WHERE homeTechModel = ?', ('Samsung',))]
+
+def indexes(db, table):
+    with db.get_connection() as conn:
+        return {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (table,))}
+
+def test_apply_writes_migration_to_output(sqlite_db, tmp_path):
+    output = str(tmp_path / 'advisor')
+    app_migrations = migration_files(MIGRATIONS_DIR)
+    version = Migrator(sqlite_db).get_version()
+    
+    report = IndexAdvisor(sqlite_db, QUERIES, repeat=1, directory=output).run(apply=True)
+    
+    [recommendation] = report['recommendations']
+    assert recommendation['columns'][0] == 'homeTechModel'
+    assert os.path.dirname(report['migration']) == output
+    assert os.path.basename(report['migration']).startswith(f"{version + 1:04d}_")
+    with open(report['migration'], encoding='utf-8') as f:
+        assert 'CREATE INDEX IF NOT EXISTS' in f.read()
+    
+    # Индекс создан, каталог и версия схемы приложения не изменились
+    assert recommendation['name'] in indexes(sqlite_db, 'requests')
+    assert migration_files(MIGRATIONS_DIR) == app_migrations
+    assert Migrator(sqlite_db).get_version() == version
+    assert report['queries'][0]['plan_after'] != report['queries'][0]['plan_before']
+
+def test_postgres_not_supported(pg_db):
+    with pytest.raises(RuntimeError):
+        IndexAdvisor(pg_db, QUERIES, repeat=1).run()
+
+def test_comments_index_without_redundant_prefix(sqlite_db):
+    assert 'idx_comments_request_time' in indexes(sqlite_db, 'comments')
+    assert 'idx_comments_request' not in indexes(sqlite_db, 'comments')
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""Миграции схемы: план dry-run и пакетное заполнение крайнего срока"""
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from database import Database
+from utils import migrations
+from utils.migrations import Migrator, MigrationContext
+
+# База, созданная до появления миграций (без dueDate и журнала версий)
+LEGACY_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'repair_service.db')
+
+def test_dry_run_on_new_database(tmp_path):
+    path = str(tmp_path / 'new.db')
+    db = Database(path, migrate=False)
+    try:
+        statements = [s for _, batch in db.migrate(dry_run=True) for s in batch]
+    finally:
+        db.close()
+    
+    assert any(s.startswith('CREATE TABLE IF NOT EXISTS requests') for s in statements)
+    # Колонка из CREATE TABLE этого же запуска не добавляется отдельно;
+    # колонки следующих миграций (0003, 0004) - добавляются
+    alters = [s for s in statements if s.startswith('ALTER TABLE')]
+    assert alters == ['ALTER TABLE requests ADD COLUMN row_version INTEGER NOT NULL DEFAULT 0',
+                      'ALTER TABLE users ADD COLUMN row_version INTEGER NOT NULL DEFAULT 0']
+    assert not [s for s in statements if s.startswith('UPDATE requests SET dueDate')]
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == 0
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    path = str(tmp_path / 'legacy.db')
+    shutil.copy(LEGACY_DB, path)
+    conn = sqlite3.connect(path)
+    with conn:
+        for _ in range(7):
+            conn.execute('''
+                INSERT INTO requests (startDate, homeTechType, homeTechModel, problemDescription,
+                                      requestStatus, clientID, priority, extendedDeadline)
+                SELECT startDate, homeTechType, homeTechModel, problemDescription,
+                       requestStatus, clientID, priority, extendedDeadline
+                FROM requests
+            ''')
+    conn.close()
+    return path
+
+def test_due_date_backfill_in_batches(legacy_db, monkeypatch):
+    monkeypatch.setattr(MigrationContext, 'BACKFILL_BATCH_SIZE', 100)
+    
+    # Между пакетами другое соединение может писать без ожидания
+    writer = sqlite3.connect(legacy_db, timeout=0)
+    pauses = []
+    
+    def pause(seconds):
+        with writer:
+            writer.execute("UPDATE users SET phone = phone WHERE userID = 1")
+        pauses.append(seconds)
+    
+    monkeypatch.setattr(migrations.time, 'sleep', pause)
+    
+    db = Database(legacy_db)
+    try:
+        total = sqlite3.connect(legacy_db).execute('SELECT COUNT(*) FROM requests').fetchone()[0]
+        assert len(pauses) == total // 100
+        assert Migrator(db).migrate() == []
+        
+        with db.get_connection() as conn:
+            expected = Database._due_date_expression('requests')
+            assert conn.execute(f'''
+                SELECT COUNT(*) FROM requests WHERE dueDate IS NULL OR dueDate != {expected}
+            ''').fetchone()[0] == 0
+    finally:
+        db.close()
+        writer.close()
\ No newline at end of file
@@ -0,0 +1,55 @@
+"""Канал уведомлений: опрос версии, события подписчиков и ошибки обработчиков"""
+import logging
+
+import pytest
+
+from utils.notification_channel import NotificationChannel
+
+@pytest.fixture(params=['sqlite_db', 'pg_db'])
+def db(request):
+    return request.getfixturevalue(request.param)
+
+@pytest.fixture
+def channel(db):
+    channel = NotificationChannel(db)
+    conn = db.backend.connect(check_same_thread=False)
+    channel.poll(conn)
+    yield channel, conn
+    conn.close()
+
+def test_events(db, channel):
+    channel, conn = channel
+    events = []
+    channel.subscribe(1, events.append)
+    unread = db.get_unread_count(1)
+    
+    # Пока БД не менялась, уведомления не читаются
+    assert not channel.poll(conn)
+    
+    notification_id = db.add_notification(1, "Новая заявка")
+    assert channel.poll(conn)
+    assert events[-1]['unread'] == unread + 1
+    assert [n['notificationID'] for n in events[-1]['notifications']] == [notification_id]
+    
+    # Прочтение меняет только счетчик
+    db.mark_notifications_read([notification_id])
+    assert channel.poll(conn)
+    assert events[-1] == {'user_id': 1, 'unread': unread, 'notifications': []}
+    assert not channel.poll(conn)
+
+def test_failing_callback_is_logged(db, channel, caplog):
+    channel, conn = channel
+    received = []
+    
+    def broken(event):
+        raise ValueError("сбой обработчика")
+    
+    channel.subscribe(1, broken)
+    channel.subscribe(1, received.append)
+    db.add_notification(1, "Проверка")
+    
+    with caplog.at_level(logging.ERROR, logger='utils.notification_channel'):
+        assert channel.poll(conn)
+    
+    assert received
+    assert any(record.exc_info and 'сбой обработчика' in str(record.exc_info[1]) for record in caplog.records)
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""Database на PostgreSQL дает те же результаты, что и на SQLite"""
+import pytest
+
+from utils.migrations import Migrator
+
+def request_ids(rows):
+    return sorted(row['requestID'] for row in rows)
+
+def test_schema_is_current(pg_db):
+    migrator = Migrator(pg_db)
+    assert migrator.is_current()
+    assert migrator.migrate() == []
+
+def test_statistics_match_sqlite(pg_db, sqlite_db):
+    pg, lite = pg_db.get_statistics(), sqlite_db.get_statistics()
+    for key in ('total_requests', 'active_requests', 'completed_requests', 'unique_clients', 'by_status'):
+        assert pg[key] == lite[key]
+    assert pg['avg_repair_days'] == pytest.approx(lite['avg_repair_days'])
+    assert [dict(row) for row in pg['by_month']] == [dict(row) for row in lite['by_month']]
+
+# LIKE в SQLite не различает регистр только для латиницы (ILIKE в PostgreSQL -
+# для любых букв), поэтому поиск сравнивается в точном регистре
+@pytest.mark.parametrize('search, filters', [
+    ('', {}),
+    ('Фен', {}),
+    ('Redmond', {}),
+    ('', {'status': 'Готова к выдаче'}),
+    ('', {'priority': 3}),
+])
+def test_search_matches_sqlite(pg_db, sqlite_db, search, filters):
+    assert request_ids(pg_db.search_requests(search, filters)) == request_ids(sqlite_db.search_requests(search, filters))
+    assert pg_db.count_requests(search, filters) == sqlite_db.count_requests(search, filters)
+
+def test_due_dates_and_overdue_match_sqlite(pg_db, sqlite_db):
+    due = lambda db: {row['requestID']: row['dueDate'] for row in db.search_requests('', {})}
+    assert due(pg_db) == due(sqlite_db)
+    assert request_ids(pg_db.get_overdue_requests()) == request_ids(sqlite_db.get_overdue_requests())
+
+def test_writes(pg_db):
+    request_id = pg_db.search_requests('', {'status': 'Новая заявка'})[0]['requestID']
+    version = pg_db.get_requests_version()
+    row_version = pg_db.get_request(request_id)['row_version']
+    
+    assert pg_db.update_request_status(request_id, 'Готова к выдаче')
+    request = pg_db.get_request(request_id)
+    assert request['requestStatus'] == 'Готова к выдаче'
+    assert request['completionDate']
+    assert request['row_version'] > row_version
+    assert pg_db.get_requests_version() > version
+    
+    comment_id = pg_db.add_comment(request_id, request['masterID'] or 1, "Проверка")
+    assert isinstance(comment_id, int)
+    assert [c['commentID'] for c in pg_db.get_request_comments(request_id)][-1] == comment_id
+
+def test_unread_counters(pg_db):
+    unread = pg_db.get_unread_count(1)
+    ids = [pg_db.add_notification(1, f"Уведомление {i}") for i in range(3)]
+    assert pg_db.get_unread_count(1) == unread + 3
+    
+    assert pg_db.mark_notifications_read(ids[:2]) == 2
+    assert pg_db.get_unread_count(1) == unread + 1
+    pg_db.mark_all_notifications_read(1)
+    assert pg_db.get_unread_count(1) == 0
+
+def test_with_returns_connection_to_pool(pg_db):
+    import sqlite3
+    from database import Database
+    from storage.postgres import PostgresBackend
+    
+    db = Database(pg_db.db_name, backend=PostgresBackend(pg_db.db_name, max_connections=2, busy_timeout=0.5))
+    try:
+        # Ссылки на соединения живы (как в кадре трассировки): пул не должен зависеть от сборки мусора
+        kept = []
+        for _ in range(5):
+            with db.get_connection() as conn:
+                kept.append(conn)
+                assert conn.execute('SELECT COUNT(*) FROM requests').fetchone()[0] > 0
+        
+        with pytest.raises(sqlite3.ProgrammingError):
+            kept[0].execute('SELECT 1')
+        
+        # Исключение внутри with откатывает транзакцию и тоже освобождает соединение
+        for _ in range(3):
+            with pytest.raises(ZeroDivisionError):
+                with db.get_connection() as conn:
+                    kept.append(conn)
+                    conn.execute("UPDATE users SET phone = 'x' WHERE userID = 1")
+                    1 / 0
+        with db.get_connection() as conn:
+            assert conn.execute('SELECT phone FROM users WHERE userID = 1').fetchone()[0] != 'x'
+    finally:
+        db.close()
+
+def test_stream_query(pg_db):
+    rows = list(pg_db.stream_query('SELECT requestID FROM requests ORDER BY requestID', batch_size=2))
+    assert [row['requestID'] for row in rows] == request_ids(pg_db.search_requests('', {}))
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""Перевод запросов диалекта SQLite в PostgreSQL (storage.postgres.translate)"""
+import ast
+import glob
+import os
+import re
+import sqlite3
+
+import pytest
+
+pytest.importorskip('psycopg2')
+
+from storage.postgres import translate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def application_queries():
+    """Постоянные запросы cursor.execute/executemany из database.py, auth.py и форм"""
+    paths = [os.path.join(ROOT, 'database.py'), os.path.join(ROOT, 'auth.py')]
+    paths += sorted(glob.glob(os.path.join(ROOT, 'forms', '*.py')))
+    
+    queries = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                    and node.func.attr in ('execute', 'executemany') and node.args
+                    and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str)):
+                queries.append(pytest.param(node.args[0].value,
+                                            id=f"{os.path.relpath(path, ROOT)}:{node.lineno}"))
+    return queries
+
+QUERIES = application_queries()
+
+def outside_strings(sql):
+    return re.sub(r"'(?:[^']|'')*'", "''", sql)
+
+def test_queries_collected():
+    assert len(QUERIES) > 30
+
+@pytest.mark.parametrize('sql', QUERIES)
+def test_application_query_translates(sql):
+    statement, _ = translate(sql)
+    if statement is None:
+        assert sql.strip().upper().startswith('PRAGMA')
+        return
+    
+    code = outside_strings(statement)
+    assert '?' not in code
+    assert not re.search(r'\b(julianday|strftime)\s*\(', code, re.IGNORECASE)
+    assert not re.search(r'\bINSERT\s+OR\b', code, re.IGNORECASE)
+    assert statement.count('%s') == outside_strings(sql).count('?')
+
+def test_placeholders_and_percent_signs():
+    statement, _ = translate("SELECT '50%?' AS s FROM requests WHERE requestID = ?")
+    assert statement == "SELECT '50%%?' AS s FROM requests WHERE requestID = %s"
+
+def test_insert_into_identity_table_returns_key():
+    statement, table = translate('INSERT INTO comments (message, masterID, requestID) VALUES (?, ?, ?)')
+    assert statement == 'INSERT INTO comments (message, masterID, requestID) VALUES (%s, %s, %s) RETURNING commentID'
+    assert table == 'comments'
+    
+    statement, table = translate('INSERT INTO request_parts (requestID, partID, quantity) VALUES (?, ?, ?)')
+    assert 'RETURNING' not in statement
+    assert table is None
+
+def test_insert_or_ignore():
+    statement, _ = translate('INSERT OR IGNORE INTO sla_alerts (requestID, kind, dueDate) VALUES (?, ?, ?)')
+    assert statement == 'INSERT INTO sla_alerts (requestID, kind, dueDate) VALUES (%s, %s, %s) ON CONFLICT DO NOTHING'
+
+def test_insert_or_replace_updates_non_key_columns():
+    statement, _ = translate('INSERT OR REPLACE INTO repair_time_sketches (period, dimension, dim_key, count, sketch) '
+                             'VALUES (?, ?, ?, ?, ?)')
+    assert statement.endswith('ON CONFLICT (dimension, period, dim_key) '
+                              'DO UPDATE SET count = EXCLUDED.count, sketch = EXCLUDED.sketch')
+
+def test_like_is_case_insensitive_on_text():
+    statement, _ = translate('SELECT * FROM requests r WHERE (r.requestID LIKE ? OR c.fio LIKE ?)')
+    assert statement == ('SELECT * FROM requests r WHERE '
+                         '(CAST(r.requestID AS TEXT) ILIKE %s OR CAST(c.fio AS TEXT) ILIKE %s)')
+
+def test_date_functions():
+    statement, _ = translate("SELECT strftime('%Y-%m', startDate) AS month FROM requests")
+    assert statement == "SELECT to_char(CAST(startDate AS TIMESTAMP), 'YYYY-MM') AS month FROM requests"
+    
+    statement, _ = translate("SELECT 1 FROM requests r WHERE r.dueDate < date('now', 'localtime', ?)", 10800)
+    assert "INTERVAL '10800 seconds'" in statement
+    assert statement.endswith('+ CAST(%s AS INTERVAL)) AS DATE)')
+
+def test_pragmas_and_transactions():
+    assert translate('PRAGMA journal_mode = WAL') == (None, None)
+    statement, _ = translate('PRAGMA table_info(requests)')
+    assert "table_name = 'requests'" in statement
+    assert translate('BEGIN IMMEDIATE') == ('BEGIN', None)
+
+# Выражения SQLite и значение, которое должно получиться в обеих СУБД
+EXPRESSIONS = [
+    ("julianday('2024-03-01') - julianday('2024-02-01')", 29),
+    ("julianday('2024-03-01 12:00:00') - julianday('2024-03-01')", 0.5),
+    ("strftime('%Y-%m', '2024-03-05')", '2024-03'),
+    ("strftime('%d.%m.%Y', '2024-03-05')", '05.03.2024'),
+    ("date('2024-01-31', '+1 day')", '2024-02-01'),
+    ("date('2024-01-31', ?)", '2024-01-24'),
+]
+
+@pytest.mark.parametrize('expression, expected', EXPRESSIONS)
+def test_expression_in_sqlite(expression, expected):
+    params = ('-7 days',) if '?' in expression else ()
+    value = sqlite3.connect(':memory:').execute(f'SELECT {expression}', params).fetchone()[0]
+    assert value == pytest.approx(expected) if isinstance(expected, (int, float)) else value == expected
+
+@pytest.mark.parametrize('expression, expected', EXPRESSIONS)
+def test_expression_in_postgres(pg_server, expression, expected):
+    import psycopg2
+    
+    params = ('-7 days',) if '?' in expression else ()
+    statement, _ = translate(f'SELECT {expression}')
+    with psycopg2.connect(pg_server) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(statement, params)
+            value = cursor.fetchone()[0]
+    
+    if isinstance(expected, (int, float)):
+        assert float(value) == pytest.approx(expected)
+    else:
+        assert str(value) == expected
+
+@pytest.mark.parametrize('sql', QUERIES)
+def test_application_query_is_valid_postgres(pg_db, sql):
+    statement, _ = translate(sql)
+    if statement is None:
+        return
+    
+    conn = pg_db.get_connection()
+    try:
+        # EXPLAIN проверяет синтаксис и имена без выполнения запроса
+        conn._raw.cursor().execute(f'EXPLAIN {statement}', [None] * statement.count('%s'))
+    finally:
+        conn.close()
\ No newline at end of file
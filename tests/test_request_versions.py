@@ -0,0 +1,51 @@
+"""Версии заявок для ETag: меняются при любом изменении и не блокируют запись"""
+import pytest
+
+@pytest.fixture(params=['sqlite_db', 'pg_db'])
+def db(request):
+    return request.getfixturevalue(request.param)
+
+def execute(db, sql, params=()):
+    with db.get_connection() as conn:
+        conn.execute(sql, params)
+
+def test_version_changes(db):
+    request_id = db.search_requests('', {})[0]['requestID']
+    seen = [db.get_requests_version()]
+    
+    # Несколько изменений в одну секунду (updated_at одинаковый)
+    for status in ('В процессе ремонта', 'Ожидание запчастей', 'В процессе ремонта'):
+        db.update_request_status(request_id, status)
+        seen.append(db.get_requests_version())
+    
+    execute(db, "UPDATE users SET fio = fio || ' ' WHERE userID = 1")
+    seen.append(db.get_requests_version())
+    
+    execute(db, 'DELETE FROM comments WHERE requestID = ?', (request_id,))
+    execute(db, 'DELETE FROM requests WHERE requestID = ?', (request_id,))
+    seen.append(db.get_requests_version())
+    
+    assert len(set(seen)) == len(seen)
+
+def test_row_version_of_request(db):
+    request_id = db.search_requests('', {})[0]['requestID']
+    before = db.get_request(request_id)['row_version']
+    db.update_request_status(request_id, 'Ожидание запчастей')
+    assert db.get_request(request_id)['row_version'] > before
+
+def test_writers_do_not_wait_for_version(pg_db):
+    import psycopg2
+    
+    first, second = (row['requestID'] for row in pg_db.search_requests('', {})[:2])
+    connections = [psycopg2.connect(pg_db.db_name) for _ in range(2)]
+    try:
+        for conn, request_id in zip(connections, (first, second)):
+            cursor = conn.cursor()
+            cursor.execute("SET lock_timeout = '1s'")
+            cursor.execute('UPDATE requests SET notes = %s WHERE requestid = %s', ('Проверка', request_id))
+        # Обе транзакции открыты: вторая не ждала блокировки общей строки
+        for conn in connections:
+            conn.commit()
+    finally:
+        for conn in connections:
+            conn.close()
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""Скетчи квантилей и их пересчет при изменении завершенных заявок"""
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from utils.sketches import QuantileSketch, percentile
+
+def sample(seed, size=20_000):
+    rng = random.Random(seed)
+    return [rng.lognormvariate(1.5, 0.8) for _ in range(size)]
+
+@pytest.mark.parametrize('q', [0.5, 0.9, 0.99])
+def test_quantile_accuracy(q):
+    values = sample(1)
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+    
+    # Ошибка по рангу: оценка попадает в окрестность точного квантиля
+    ordered = sorted(values)
+    low = ordered[int(len(ordered) * max(0.0, q - 0.005))]
+    high = ordered[min(len(ordered) - 1, int(len(ordered) * (q + 0.005)))]
+    assert low <= sketch.quantile(q) <= high
+    assert sketch.quantile(0) == min(values)
+    assert sketch.quantile(1) == max(values)
+
+def test_merge_matches_single_sketch():
+    values = sample(2)
+    whole, parts = QuantileSketch(), [QuantileSketch() for _ in range(10)]
+    for i, value in enumerate(values):
+        whole.add(value)
+        parts[i % len(parts)].add(value)
+    
+    merged = QuantileSketch()
+    for part in parts:
+        # Через JSON, как при слиянии дневных скетчей из базы
+        merged.merge(QuantileSketch.from_json(part.to_json()))
+    
+    assert merged.count == len(values)
+    assert (merged.min, merged.max) == (min(values), max(values))
+    for q in (0.5, 0.9, 0.99):
+        assert merged.quantile(q) == pytest.approx(whole.quantile(q), rel=0.02)
+        assert merged.quantile(q) == pytest.approx(percentile(values, q * 100), rel=0.02)
+
+def test_merge_empty():
+    sketch = QuantileSketch()
+    sketch.add(3)
+    assert sketch.merge(QuantileSketch()).count == 1
+    assert QuantileSketch().merge(sketch).quantile(0.5) == 3
+
+def test_single_centroid():
+    sketch = QuantileSketch()
+    assert sketch.quantile(0.5) is None
+    
+    sketch.add(4.5, weight=3)
+    restored = QuantileSketch.from_json(sketch.to_json())
+    for q in (0, 0.5, 0.99, 1):
+        assert sketch.quantile(q) == 4.5
+        assert restored.quantile(q) == 4.5
+    assert restored.count == 3
+
+@pytest.fixture(params=['sqlite_db', 'pg_db'])
+def db(request):
+    return request.getfixturevalue(request.param)
+
+def create_request(db, start_date):
+    with db.get_connection() as conn:
+        cursor = conn.execute('''
+            INSERT INTO requests (startDate, homeTechType, homeTechModel, problemDescription,
+                                  requestStatus, clientID, priority)
+            VALUES (?, 'Пылесос-тест', 'Test', 'Не включается', 'Новая заявка', 1, 1)
+        ''', (start_date,))
+        return cursor.lastrowid
+
+def tech_percentiles(db):
+    return db.get_repair_time_percentiles(dimension='tech_type').get('Пылесос-тест', {'count': 0})
+
+def test_reopened_request_leaves_sketch(db):
+    today = date.today()
+    request_id = create_request(db, (today - timedelta(days=4)).isoformat())
+    
+    assert db.update_request_status(request_id, 'Готова к выдаче')
+    assert tech_percentiles(db)['count'] == 1
+    
+    # Повторное открытие убирает длительность, повторное завершение не удваивает
+    assert db.update_request_status(request_id, 'В процессе ремонта')
+    assert tech_percentiles(db)['count'] == 0
+    assert db.update_request_status(request_id, 'Готова к выдаче')
+    assert tech_percentiles(db)['count'] == 1
+    
+    # Смена даты завершения переносит значение в другой день
+    earlier = (today - timedelta(days=2)).isoformat()
+    assert db.update_request_status(request_id, 'Готова к выдаче', earlier)
+    assert tech_percentiles(db) == {'count': 1, 50: 2.0, 90: 2.0, 99: 2.0}
+    assert db.get_repair_time_percentiles(today.isoformat(), today.isoformat(),
+                                          dimension='tech_type').get('Пылесос-тест') is None
+    
+    stored = tech_percentiles(db)
+    db.rebuild_repair_sketches()
+    assert tech_percentiles(db) == stored
\ No newline at end of file
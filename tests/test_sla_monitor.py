@@ -0,0 +1,94 @@
+"""Инкрементальный контроль сроков: изменения заявок после проверки"""
+from datetime import date, timedelta
+
+import pytest
+
+from models import Priority
+from utils.sla_monitor import SLAMonitor
+
+def alerts(db, request_id):
+    with db.get_connection() as conn:
+        return [tuple(row) for row in conn.execute(
+            'SELECT kind, dueDate FROM sla_alerts WHERE requestID = ? ORDER BY dueDate', (request_id,))]
+
+def create_request(db, start_date):
+    with db.get_connection() as conn:
+        cursor = conn.execute('''
+            INSERT INTO requests (startDate, homeTechType, homeTechModel, problemDescription,
+                                  requestStatus, clientID, priority)
+            VALUES (?, 'Фен', 'Test', 'Не включается', 'Новая заявка', 1, 1)
+        ''', (start_date,))
+        return cursor.lastrowid
+
+def update(db, sql, params):
+    with db.get_connection() as conn:
+        conn.execute(sql, params)
+
+@pytest.fixture(params=['sqlite_db', 'pg_db'])
+def db(request):
+    return request.getfixturevalue(request.param)
+
+@pytest.fixture
+def monitor(db):
+    monitor = SLAMonitor(db)
+    monitor.tick()
+    return monitor
+
+def test_new_request_past_due(db, monitor):
+    request_id = create_request(db, (date.today() - timedelta(days=60)).isoformat())
+    assert monitor.tick() > 0
+    assert [kind for kind, _ in alerts(db, request_id)] == ['overdue']
+
+def test_due_date_moved_earlier(db, monitor):
+    request_id = create_request(db, date.today().isoformat())
+    monitor.tick()
+    assert alerts(db, request_id) == []
+    
+    past = (date.today() - timedelta(days=3)).isoformat()
+    update(db, 'UPDATE requests SET extendedDeadline = ? WHERE requestID = ?', (past, request_id))
+    monitor.tick()
+    assert alerts(db, request_id) == [('overdue', past)]
+
+def test_priority_change(db, monitor):
+    request_id = create_request(db, (date.today() - timedelta(days=5)).isoformat())
+    update(db, 'UPDATE requests SET extendedDeadline = ? WHERE requestID = ?',
+           ((date.today() + timedelta(days=10)).isoformat(), request_id))
+    monitor.tick()
+    assert alerts(db, request_id) == []
+    
+    # Снятие продления: срок пересчитывается по приоритету и уже истек
+    update(db, 'UPDATE requests SET extendedDeadline = NULL, priority = ? WHERE requestID = ?',
+           (Priority.HIGH.value, request_id))
+    monitor.tick()
+    assert [kind for kind, _ in alerts(db, request_id)] == ['overdue']
+
+def test_reopened_request(db, monitor):
+    with db.get_connection() as conn:
+        request_id = conn.execute("""
+            SELECT requestID FROM requests WHERE requestStatus = 'Готова к выдаче' ORDER BY requestID
+        """).fetchone()[0]
+    assert alerts(db, request_id) == []
+    
+    update(db, "UPDATE requests SET requestStatus = 'В процессе ремонта' WHERE requestID = ?", (request_id,))
+    monitor.tick()
+    assert [kind for kind, _ in alerts(db, request_id)] == ['overdue']
+
+def test_failed_check_keeps_thread_running(sqlite_db, monkeypatch):
+    monitor = SLAMonitor(sqlite_db, interval=0.01)
+    calls = []
+    
+    def tick():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("сбой драйвера")
+    
+    monkeypatch.setattr(monitor, 'tick', tick)
+    monitor.start()
+    try:
+        for _ in range(200):
+            if len(calls) > 1:
+                break
+            monitor._stop_event.wait(0.01)
+    finally:
+        monitor.stop()
+    assert len(calls) > 1
\ No newline at end of file
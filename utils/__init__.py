@@ -1,12 +1,31 @@
-from .validators import Validators
-from .generators import QRCodeGenerator, ReportGenerator
-from .exporters import DataExporter
-from .backup import DatabaseBackup
+import importlib
 
-__all__ = [
-    'Validators',
-    'QRCodeGenerator',
-    'ReportGenerator',
-    'DataExporter',
-    'DatabaseBackup'
-]
\ No newline at end of file
+# Подмодули загружаются при первом обращении к имени: exporters и analytics
+# импортируют pandas/openpyxl, generators - qrcode и PIL
+_EXPORTS = {
+    'Validators': 'validators',
+    'QRCodeGenerator': 'generators',
+    'ReportGenerator': 'generators',
+    'DataExporter': 'exporters',
+    'DatabaseBackup': 'backup',
+    'RequestAnalytics': 'analytics',
+    'SLAMonitor': 'sla_monitor',
+    'NotificationChannel': 'notification_channel',
+    'NotificationServer': 'notification_channel',
+    'QueryProfiler': 'query_profiler',
+    'Migrator': 'migrations',
+    'IndexAdvisor': 'index_advisor',
+    'DataGenerator': 'data_generator',
+    'Anonymizer': 'anonymizer',
+    'TraceRecorder': 'workload_trace',
+    'TraceReplayer': 'workload_trace'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
\ No newline at end of file
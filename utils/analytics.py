@@ -0,0 +1,268 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+READY_STATUS = 'Готова к выдаче'
+
+# Порядок категорий совпадает с CHECK-ограничением таблицы requests
+STATUSES = ['Новая заявка', 'В процессе ремонта', 'Ожидание запчастей', 'Готова к выдаче']
+
+# Процент выполнения по статусу (как в Request.get_progress_percentage)
+STATUS_PROGRESS = np.array([25, 75, 50, 100], dtype=np.int64)
+
+# Значение для отсутствующей даты в колонках дней
+NO_DATE = np.iinfo(np.int64).min
+
+def to_day_numbers(values):
+    """Преобразовать строки дат YYYY-MM-DD в номера дней от эпохи (int64)"""
+    dates = pd.to_datetime(pd.Series(values, dtype=object), format='%Y-%m-%d', errors='coerce')
+    days = dates.to_numpy(dtype='datetime64[D]').astype(np.int64)
+    days[dates.isna().to_numpy()] = NO_DATE
+    return days
+
+def today_number():
+    """Номер текущего дня от эпохи"""
+    return int(np.datetime64(datetime.now().strftime('%Y-%m-%d'), 'D').astype(np.int64))
+
+class RequestAnalytics:
+    """Векторизованная аналитика по заявкам
+    
+    Заявки загружаются одним запросом в колоночное представление:
+    даты хранятся как int64-номера дней, статусы и типы техники - как
+    категориальные коды. Все расчеты выполняются над массивами без
+    построчного разбора дат.
+    """
+    
+    def __init__(self, db, date_from=None, date_to=None):
+        self.db = db
+        self.frame = None
+        self.masters = None
+        self.load(date_from, date_to)
+    
+    def load(self, date_from=None, date_to=None):
+        """Загрузка заявок (и списка мастеров) в колонки"""
+        query = '''
+            SELECT r.requestID, r.startDate, r.completionDate, r.extendedDeadline, r.dueDate,
+                   r.requestStatus, r.homeTechType, r.masterID, r.clientID,
+                   r.priority, r.estimatedCost, r.actualCost
+            FROM requests r
+            WHERE 1=1
+        '''
+        params = []
+        
+        if date_from:
+            query += " AND r.startDate >= ?"
+            params.append(date_from)
+        
+        if date_to:
+            query += " AND r.startDate <= ?"
+            params.append(date_to)
+        
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            columns = [description[0] for description in cursor.description]
+            
+            cursor.execute('''
+                SELECT userID, fio FROM users
+                WHERE type = 'Мастер'
+                ORDER BY userID
+            ''')
+            self.masters = pd.DataFrame([tuple(row) for row in cursor.fetchall()],
+                                        columns=['masterID', 'fio'])
+        
+        raw = pd.DataFrame.from_records([tuple(row) for row in rows], columns=columns)
+        
+        self.frame = pd.DataFrame({
+            'requestID': raw['requestID'].to_numpy(dtype=np.int64),
+            'start_day': to_day_numbers(raw['startDate']),
+            'completion_day': to_day_numbers(raw['completionDate']),
+            'deadline_day': to_day_numbers(raw['extendedDeadline']),
+            'due_day': to_day_numbers(raw['dueDate']),
+            'status': pd.Categorical(raw['requestStatus'], categories=STATUSES),
+            'tech_type': pd.Categorical(raw['homeTechType']),
+            'masterID': raw['masterID'].astype('Int64'),
+            'clientID': raw['clientID'].to_numpy(dtype=np.int64),
+            'priority': raw['priority'].fillna(3).to_numpy(dtype=np.int64),
+            'estimated_cost': raw['estimatedCost'].fillna(0).to_numpy(dtype=np.float64),
+            'actual_cost': raw['actualCost'].fillna(0).to_numpy(dtype=np.float64),
+        })
+        
+        return self
+    
+    def __len__(self):
+        return len(self.frame)
+    
+    # --- Поэлементные показатели ---
+    
+    def completed_mask(self):
+        """Маска завершенных заявок"""
+        return (self.frame['status'] == READY_STATUS).to_numpy()
+    
+    def repair_days(self, today=None):
+        """Дни ремонта: до даты завершения, а для незавершенных - до сегодня"""
+        today = today_number() if today is None else today
+        start = self.frame['start_day'].to_numpy()
+        completion = self.frame['completion_day'].to_numpy()
+        
+        end = np.where(completion != NO_DATE, completion, today)
+        return end - start
+    
+    def completion_durations(self):
+        """Длительность ремонта по каждой заявке (NaN, если нет даты завершения)"""
+        start = self.frame['start_day'].to_numpy()
+        completion = self.frame['completion_day'].to_numpy()
+        has_completion = completion != NO_DATE
+        
+        durations = np.where(has_completion, completion, start) - start
+        durations = durations.astype(np.float64)
+        durations[~has_completion] = np.nan
+        return durations
+    
+    def completed_repair_days(self):
+        """Длительность ремонта только по заявкам с датой завершения"""
+        durations = self.completion_durations()
+        return durations[~np.isnan(durations)]
+    
+    def overdue_mask(self, threshold_days=0, today=None):
+        """Маска заявок, срок которых истек более threshold_days дней назад"""
+        today = today_number() if today is None else today
+        due = self.frame['due_day'].to_numpy()
+        return (due != NO_DATE) & (today - due > threshold_days) & ~self.completed_mask()
+    
+    def progress_percentage(self):
+        """Процент выполнения каждой заявки"""
+        codes = self.frame['status'].cat.codes.to_numpy()
+        return np.where(codes >= 0, STATUS_PROGRESS[codes], 0)
+    
+    # --- Агрегаты ---
+    
+    def summary(self):
+        """Общая статистика (аналог Database.get_statistics)"""
+        completed = self.completed_mask()
+        durations = self.completed_repair_days()
+        
+        return {
+            'total_requests': int(len(self.frame)),
+            'active_requests': int((~completed).sum()),
+            'completed_requests': int(completed.sum()),
+            'avg_repair_days': float(durations.mean()) if len(durations) else 0.0,
+            'total_revenue': float(self.frame['actual_cost'].sum()),
+            'unique_clients': int(self.frame['clientID'].nunique())
+        }
+    
+    def sla_percentiles(self, percentiles=(50, 90, 99)):
+        """Перцентили длительности ремонта завершенных заявок"""
+        durations = self.completed_repair_days()
+        
+        if not len(durations):
+            return {p: 0.0 for p in percentiles}
+        
+        values = np.percentile(durations, percentiles)
+        return {p: float(v) for p, v in zip(percentiles, values)}
+    
+    def repair_time_percentiles(self, by='tech_type', percentiles=(50, 90, 99)):
+        """Перцентили длительности ремонта по группам ('tech_type' или 'masterID')"""
+        frame = self.frame.assign(duration=self.completion_durations()).dropna(subset=['duration'])
+        
+        result = {}
+        for key, group in frame.groupby(by, observed=True):
+            values = np.percentile(group['duration'].to_numpy(), percentiles)
+            result[self._group_label(by, key)] = {p: float(v) for p, v in zip(percentiles, values)}
+        
+        return result
+    
+    def repair_time_histogram(self, by='tech_type', bins=(0, 1, 3, 7, 14, 30, 60, np.inf)):
+        """Гистограммы длительности ремонта по группам ('tech_type' или 'masterID')
+        
+        Возвращает словарь {группа: [количество в каждой корзине]}.
+        """
+        frame = self.frame.assign(duration=self.completion_durations()).dropna(subset=['duration'])
+        
+        result = {}
+        for key, group in frame.groupby(by, observed=True):
+            counts, _ = np.histogram(group['duration'].to_numpy(), bins=np.asarray(bins, dtype=np.float64))
+            result[self._group_label(by, key)] = counts.tolist()
+        
+        return result
+    
+    def _group_label(self, by, key):
+        """Подпись группы: ФИО для мастеров, значение категории для остальных"""
+        if by == 'masterID':
+            names = self.masters.set_index('masterID')['fio']
+            return names.get(key, str(key))
+        return str(key)
+    
+    def by_status(self):
+        """Количество заявок по статусам"""
+        counts = self.frame['status'].value_counts(sort=True)
+        return {status: int(count) for status, count in counts.items() if count > 0}
+    
+    def master_throughput(self):
+        """Производительность мастеров: всего, завершено, ср. время, доход
+        
+        Возвращает список кортежей (fio, total, completed, avg_days, revenue),
+        включая мастеров без заявок.
+        """
+        frame = self.frame.assign(
+            completed=self.completed_mask().astype(np.int64),
+            duration=self.completion_durations()
+        )
+        
+        grouped = frame.dropna(subset=['masterID']).groupby('masterID').agg(
+            total=('requestID', 'size'),
+            completed=('completed', 'sum'),
+            avg_days=('duration', 'mean'),
+            revenue=('actual_cost', 'sum')
+        )
+        
+        result = self.masters.set_index('masterID').join(grouped, how='left')
+        result[['total', 'completed', 'revenue']] = result[['total', 'completed', 'revenue']].fillna(0)
+        result = result.sort_values(['completed', 'revenue'], ascending=False)
+        
+        return [(row.fio, int(row.total), int(row.completed),
+                 None if pd.isna(row.avg_days) else float(row.avg_days),
+                 float(row.revenue))
+                for row in result.itertuples()]
+    
+    def tech_type_summary(self):
+        """Сводка по типам техники
+        
+        Возвращает список кортежей (type, count, avg_days, avg_cost, total_cost),
+        отсортированный по количеству заявок.
+        """
+        frame = self.frame.assign(
+            duration=self.completion_durations()
+        )
+        
+        grouped = frame.groupby('tech_type', observed=True).agg(
+            count=('requestID', 'size'),
+            avg_days=('duration', 'mean'),
+            avg_cost=('actual_cost', 'mean'),
+            total_cost=('actual_cost', 'sum')
+        ).sort_values('count', ascending=False)
+        
+        return [(str(tech_type), int(row.count),
+                 None if pd.isna(row.avg_days) else float(row.avg_days),
+                 float(row.avg_cost), float(row.total_cost))
+                for tech_type, row in zip(grouped.index, grouped.itertuples())]
+    
+    def revenue_by_month(self):
+        """Доход и количество заявок по месяцам начала"""
+        months = self.frame['start_day'].to_numpy().astype('datetime64[D]').astype('datetime64[M]')
+        frame = pd.DataFrame({
+            'month': np.datetime_as_string(months, unit='M'),
+            'revenue': self.frame['actual_cost'].to_numpy(),
+            'completed': self.completed_mask().astype(np.int64)
+        })
+        
+        grouped = frame.groupby('month').agg(
+            count=('revenue', 'size'),
+            completed=('completed', 'sum'),
+            revenue=('revenue', 'sum')
+        ).sort_index()
+        
+        return [(month, int(row.count), int(row.completed), float(row.revenue))
+                for month, row in zip(grouped.index, grouped.itertuples())]
\ No newline at end of file
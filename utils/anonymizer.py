@@ -0,0 +1,223 @@
+"""Обезличенная копия рабочей базы данных
+
+python -m utils.anonymizer repair_service.db data/bench/anon.db --upsample 3
+
+Ключ HMAC берется из --key или переменной REPAIR_ANONYMIZE_KEY: с одним
+ключом одинаковые исходные значения всегда дают одинаковые замены.
+"""
+import argparse
+import hashlib
+import hmac
+import os
+import re
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from .data_generator import deferred_indexes, SURNAMES, MALE_NAMES, FEMALE_NAMES, PATRONYMICS
+
+# Порядок копирования: сначала таблицы, на которые ссылаются остальные
+TABLE_ORDER = ('users', 'parts', 'requests', 'comments', 'request_parts', 'notifications', 'sla_alerts', 'statistics')
+
+# Не копируются: журнал миграций и данные, которые пересчитываются (скетчи,
+# счетчики и версии строк, которые ведут триггеры и заполняют миграции)
+SKIPPED_TABLES = ('schema_migrations', 'repair_time_sketches', 'notification_counters', 'row_version_seq')
+SKIPPED_COLUMNS = ('row_version',)
+
+# Таблицы, строки которых размножаются при --upsample, и их поля дат
+CLONED_DATES = {
+    'requests': ('startDate', 'completionDate', 'extendedDeadline', 'dueDate', 'created_at', 'updated_at'),
+    'comments': ('timestamp',),
+    'request_parts': ('used_date',)
+}
+
+# Свободный текст, в котором маскируются номера телефонов
+TEXT_COLUMNS = {
+    'requests': ('notes',),
+    'comments': ('message',),
+    'notifications': ('message',)
+}
+
+PHONE_PATTERN = re.compile(r'\+?\d[\d\-\s()]{8,}\d')
+
+def shift_date(value, days):
+    """Сдвиг даты 'YYYY-MM-DD[ ...]' на days дней (время сохраняется)"""
+    if not value or not days:
+        return value
+    shifted = date.fromisoformat(value[:10]) + timedelta(days=days)
+    return shifted.isoformat() + value[10:]
+
+class Anonymizer:
+    """Потоковое копирование SQLite-базы с обезличиванием
+    
+    ФИО, телефоны, логины и пароли пользователей заменяются значениями,
+    вычисленными из HMAC исходных; идентификаторы сохраняются, поэтому
+    связи users - requests - comments - request_parts не нарушаются.
+    Телефоны в свободном тексте маскируются. При upsample > 1 каждая
+    заявка копируется с новыми идентификаторами и датами, сдвинутыми на
+    детерминированное случайное число дней (вместе с комментариями и
+    запчастями).
+    
+    Источник читается пакетами в одной читающей транзакции (снимок на
+    момент начала), запись - пакетами через Database.bulk_insert, так что
+    время линейно, а память ограничена размером пакета.
+    """
+    
+    def __init__(self, key, upsample=1, jitter_days=30, batch_size=10_000, password='anon'):
+        self.key = key.encode() if isinstance(key, str) else key
+        self.upsample = max(1, upsample)
+        self.jitter_days = jitter_days
+        self.batch_size = batch_size
+        self.password = password
+    
+    def _digest(self, kind, value):
+        return hmac.new(self.key, f"{kind}:{value}".encode(), hashlib.sha256).digest()
+    
+    def fio(self, value):
+        d = self._digest('fio', value)
+        surname, patronymic = SURNAMES[d[0] % len(SURNAMES)], PATRONYMICS[d[1] % len(PATRONYMICS)]
+        if d[2] & 1:
+            return f"{surname} {MALE_NAMES[d[3] % len(MALE_NAMES)]} {patronymic}ич"
+        return f"{surname}а {FEMALE_NAMES[d[3] % len(FEMALE_NAMES)]} {patronymic}на"
+    
+    def phone(self, value):
+        return f"89{int.from_bytes(self._digest('phone', value)[:8], 'big') % 10 ** 9:09d}"
+    
+    def login(self, value):
+        return 'u' + self._digest('login', value).hex()[:16]
+    
+    def scrub(self, text):
+        """Маскирование телефонов в свободном тексте"""
+        if not text:
+            return text
+        return PHONE_PATTERN.sub(lambda match: self.phone(match.group()), text)
+    
+    def jitter(self, request_id, copy):
+        """Сдвиг дат (дней) копии заявки; у оригинала (copy = 0) - без сдвига"""
+        if copy == 0 or not self.jitter_days:
+            return 0
+        value = int.from_bytes(self._digest('jitter', f"{request_id}:{copy}")[:4], 'big')
+        return value % (2 * self.jitter_days + 1) - self.jitter_days
+    
+    def _transform(self, table, columns, row, offsets):
+        """Строки результата для одной исходной строки"""
+        record = dict(zip(columns, row))
+        
+        if table == 'users':
+            record.update(fio=self.fio(record['fio']), phone=self.phone(record['phone']),
+                          login=self.login(record['login']), password=self.password)
+        
+        for column in TEXT_COLUMNS.get(table, ()):
+            if column in record:
+                record[column] = self.scrub(record[column])
+        
+        if table not in CLONED_DATES:
+            return [tuple(record[column] for column in columns)]
+        
+        rows = []
+        for copy in range(self.upsample):
+            clone = dict(record)
+            if copy:
+                days = self.jitter(record['requestID'], copy)
+                clone['requestID'] = record['requestID'] + copy * offsets['requests']
+                if table == 'comments':
+                    clone['commentID'] = record['commentID'] + copy * offsets['comments']
+                for column in CLONED_DATES[table]:
+                    if column in clone:
+                        clone[column] = shift_date(clone[column], days)
+            rows.append(tuple(clone[column] for column in columns))
+        return rows
+    
+    def run(self, source_path, target, log=None):
+        """Копировать source_path в новую БД target; возвращает число строк по таблицам"""
+        from database import Database
+        
+        if '://' not in target and os.path.exists(target):
+            raise FileExistsError(f"Файл {target} уже существует")
+        
+        source = sqlite3.connect(f"file:{os.path.abspath(source_path)}?mode=ro", uri=True)
+        db = Database(target, migrate=False)
+        try:
+            db.migrate()
+            
+            # Одна читающая транзакция: все таблицы копируются из одного снимка
+            source.execute('BEGIN')
+            offsets = {
+                'requests': (source.execute('SELECT MAX(requestID) FROM requests').fetchone()[0] or 0) + 1,
+                'comments': (source.execute('SELECT MAX(commentID) FROM comments').fetchone()[0] or 0) + 1
+            }
+            
+            source_tables = [row[0] for row in source.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+            tables = [t for t in TABLE_ORDER if t in source_tables] + \
+                     [t for t in source_tables if t not in TABLE_ORDER and t not in SKIPPED_TABLES]
+            
+            counts = {}
+            with deferred_indexes(db, [t for t in tables if t in CLONED_DATES or t in ('users', 'parts')]):
+                for table in tables:
+                    counts[table] = self._copy_table(source, db, table, offsets)
+                    if log:
+                        log(f"{table}: {counts[table]}")
+                
+                # В базах без колонки dueDate крайний срок вычисляется (триггеры сняты на время загрузки)
+                if db.dialect == 'sqlite':
+                    with db.get_connection() as conn:
+                        conn.execute(f"UPDATE requests SET dueDate = {Database._due_date_expression('requests')} "
+                                     "WHERE dueDate IS NULL")
+            
+            source.rollback()
+            db.rebuild_repair_sketches()
+        finally:
+            source.close()
+            db.close()
+        
+        return counts
+    
+    def _copy_table(self, source, db, table, offsets):
+        with db.get_connection() as conn:
+            try:
+                target_columns = [d[0] for d in conn.execute(f'SELECT * FROM {table} LIMIT 0').description]
+            except sqlite3.OperationalError:
+                # Таблицы нет в актуальной схеме
+                return 0
+        source_columns = [row[1] for row in source.execute(f'PRAGMA table_info({table})')]
+        columns = [c for c in source_columns if c in target_columns and c not in SKIPPED_COLUMNS]
+        if not columns:
+            return 0
+        
+        cursor = source.execute(f'SELECT {", ".join(columns)} FROM {table} ORDER BY rowid')
+        count = 0
+        while True:
+            rows = cursor.fetchmany(self.batch_size)
+            if not rows:
+                break
+            batch = []
+            for row in rows:
+                batch.extend(self._transform(table, columns, row, offsets))
+            db.bulk_insert(table, columns, batch)
+            count += len(batch)
+        
+        return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Обезличенная копия базы данных")
+    parser.add_argument('source', help="исходный файл SQLite")
+    parser.add_argument('target', help="новый файл SQLite или postgresql://...")
+    parser.add_argument('--key', default=os.environ.get('REPAIR_ANONYMIZE_KEY'),
+                        help="ключ HMAC (по умолчанию REPAIR_ANONYMIZE_KEY)")
+    parser.add_argument('--upsample', type=int, default=1, help="во сколько раз размножить заявки")
+    parser.add_argument('--jitter-days', type=int, default=30, help="максимальный сдвиг дат копий, дней")
+    parser.add_argument('--batch-size', type=int, default=10_000, help="строк в пакете")
+    parser.add_argument('--password', default='anon', help="пароль всех пользователей копии")
+    args = parser.parse_args(argv)
+    
+    if not args.key:
+        parser.error("нужен ключ: --key или REPAIR_ANONYMIZE_KEY")
+    
+    started = time.perf_counter()
+    anonymizer = Anonymizer(args.key, args.upsample, args.jitter_days, args.batch_size, args.password)
+    counts = anonymizer.run(args.source, args.target, log=print)
+    print(f"Готово за {time.perf_counter() - started:.1f} с: {sum(counts.values())} строк")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -20,7 +20,8 @@ class DatabaseBackup:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             backup_file = os.path.join(backup_dir, f'backup_{timestamp}.db')
             
-            # Копирование файла БД
+            # Копирование файла БД (с переносом журнала WAL)
+            DatabaseBackup._checkpoint(db_path)
             shutil.copy2(db_path, backup_file)
             
             # Создание файла с метаданными
@@ -57,6 +58,7 @@ class DatabaseBackup:
             
             with zipfile.ZipFile(zip_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
                 # Добавление файла БД
+                DatabaseBackup._checkpoint(db_path)
                 zipf.write(db_path, os.path.basename(db_path))
                 
                 # Добавление файлов конфигурации
@@ -123,9 +125,15 @@ class DatabaseBackup:
             
             # Создание резервной копии текущей БД
             if os.path.exists(db_path):
+                DatabaseBackup._checkpoint(db_path)
                 temp_backup = db_path + '.temp'
                 shutil.copy2(db_path, temp_backup)
             
+            # Журнал WAL от текущей БД не должен примениться к восстановленной
+            for suffix in ('-wal', '-shm'):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+            
             # Восстановление из обычного файла БД
             if backup_file.endswith('.db'):
                 shutil.copy2(backup_file, db_path)
@@ -226,6 +234,18 @@ class DatabaseBackup:
             print(f"Ошибка при экспорте БД в SQL: {e}")
             return None
     
+    @staticmethod
+    def _checkpoint(db_path):
+        """Перенос журнала WAL в основной файл БД перед копированием"""
+        if not os.path.exists(db_path + '-wal'):
+            return
+        
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        finally:
+            conn.close()
+    
     @staticmethod
     def _calculate_checksum(file_path):
         """Расчет контрольной суммы файла"""
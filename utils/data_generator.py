@@ -0,0 +1,312 @@
+"""Генератор синтетических данных для нагрузочных проверок
+
+python -m utils.data_generator --db data/bench/big.db --requests 1m --seed 1
+
+Дополняет демо-данные (Database.create_demo_data) пользователями,
+запчастями, заявками, комментариями и расходом запчастей. При одинаковых
+seed и end_date сгенерированные строки одинаковы.
+"""
+import argparse
+import bisect
+import math
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+from models import SLA_DAYS, DEFAULT_SLA_DAYS, RequestStatus, UserType
+
+# Сокращения размеров: 10k, 1m ...
+SIZE_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+# Тип техники: (доля заявок, медиана ремонта в днях, базовая стоимость, модели, неисправности, запчасти)
+TECH_CATALOG = {
+    'Холодильник': (0.16, 6, 5000,
+                    ['Indesit DS 316 W белый', 'Indesit DS 314 W серый', 'Samsung RB37A5000', 'Atlant ХМ 4024', 'LG GA-B509'],
+                    ['Не морозит одна из камер', 'Гудит, но не замораживает', 'Течет вода', 'Не включается'],
+                    ['Мотор обдува', 'Компрессор', 'Термостат', 'Уплотнитель двери']),
+    'Стиральная машина': (0.18, 5, 3500,
+                          ['DEXP WM-F610NTMA/WW белый', 'LG F2J3NS0W', 'Bosch WAN24', 'Indesit IWSB 5085'],
+                          ['Перестали работать режимы стирки', 'Не сливает воду', 'Сильно шумит при отжиме', 'Не греет воду'],
+                          ['Тэн', 'Насос слива', 'Подшипник барабана', 'Плата управления']),
+    'Фен': (0.10, 2, 1200,
+            ['Ладомир ТА112 белый', 'Ладомир ТА113 чёрный', 'Philips BHD350', 'Rowenta CV5351'],
+            ['Перестал работать', 'Не греет', 'Искрит при включении'],
+            ['Вентилятор', 'Нагревательный элемент', 'Шнур питания']),
+    'Тостер': (0.07, 2, 1500,
+               ['Redmond RT-437 черный', 'Bosch TAT3A011', 'Tefal TT1A18'],
+               ['Перестал работать', 'Не выключается', 'Подгорает с одной стороны'],
+               ['Плата управления', 'Нагревательный элемент', 'Пружина механизма']),
+    'Мультиварка': (0.09, 4, 2500,
+                    ['Redmond RMC-M95 черный', 'Polaris PMC 0517', 'Moulinex MK7078'],
+                    ['Перестала включаться', 'Не держит давление', 'Ошибка датчика температуры'],
+                    ['Блок питания', 'Датчик температуры', 'Уплотнительное кольцо']),
+    'Микроволновая печь': (0.12, 4, 2200,
+                           ['Samsung ME81KRW-1', 'LG MS2042DB', 'Hyundai HYM-M2002'],
+                           ['Не греет', 'Искрит внутри', 'Не вращается тарелка'],
+                           ['Магнетрон', 'Предохранитель', 'Мотор тарелки']),
+    'Пылесос': (0.11, 3, 1800,
+                ['Dyson V8', 'Samsung VC18M21', 'Xiaomi Mi Vacuum Cleaner G9'],
+                ['Слабая тяга', 'Не заряжается', 'Перегревается'],
+                ['Аккумулятор', 'Двигатель', 'Фильтр']),
+    'Кофемашина': (0.08, 7, 4500,
+                   ['DeLonghi ECAM 22.110', 'Philips EP1220', 'Saeco Lirika'],
+                   ['Не наливает кофе', 'Протекает', 'Не мелет зерна'],
+                   ['Помпа', 'Кофемолка', 'Заварной блок']),
+    'Посудомоечная машина': (0.09, 6, 4000,
+                             ['Bosch SMS25AW01R', 'Electrolux ESF9552', 'Midea MFD45S100'],
+                             ['Не сливает воду', 'Не моет верхнюю корзину', 'Ошибка E15'],
+                             ['Насос', 'Импеллер', 'Датчик уровня воды'])
+}
+
+PRIORITY_WEIGHTS = {1: 10, 2: 20, 3: 40, 4: 20, 5: 10}
+
+COMMENTS = [
+    'Интересная поломка, нужно разобрать и проверить',
+    'Очень странно, будем разбираться!',
+    'Заказали запчасти, ждем поставку',
+    'Клиент просит ускорить ремонт',
+    'Провели диагностику, причина найдена',
+    'Ремонт завершен, можно выдавать',
+    'Позвонили клиенту, согласовали стоимость'
+]
+
+SURNAMES = ['Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Петров', 'Соколов', 'Михайлов',
+            'Новиков', 'Федоров', 'Морозов', 'Волков', 'Алексеев', 'Лебедев', 'Семенов', 'Егоров']
+MALE_NAMES = ['Александр', 'Дмитрий', 'Максим', 'Сергей', 'Андрей', 'Алексей', 'Артем', 'Илья', 'Никита']
+FEMALE_NAMES = ['Анастасия', 'Мария', 'Анна', 'Виктория', 'Екатерина', 'Наталья', 'Ксения', 'Алиса']
+PATRONYMICS = ['Александров', 'Дмитриев', 'Сергеев', 'Андреев', 'Алексеев', 'Иванов', 'Петров', 'Юрьев']
+
+# Таблицы, индексы и триггеры которых снимаются на время загрузки
+LOADED_TABLES = ('users', 'parts', 'requests', 'comments', 'request_parts')
+
+def parse_count(value):
+    """'100k' -> 100000, '10m' -> 10000000"""
+    value = str(value).strip().lower().replace('_', '')
+    if value and value[-1] in SIZE_SUFFIXES:
+        return int(float(value[:-1]) * SIZE_SUFFIXES[value[-1]])
+    return int(value)
+
+@contextmanager
+def deferred_indexes(db, tables=LOADED_TABLES):
+    """Снять индексы и триггеры таблиц на время загрузки и восстановить их после (SQLite)"""
+    if db.dialect != 'sqlite':
+        yield
+        return
+    
+    placeholders = ', '.join('?' * len(tables))
+    with db.get_connection() as conn:
+        objects = conn.execute(f'''
+            SELECT type, name, sql FROM sqlite_master
+            WHERE type IN ('index', 'trigger') AND sql IS NOT NULL AND tbl_name IN ({placeholders})
+        ''', tuple(tables)).fetchall()
+        for kind, name, _ in objects:
+            conn.execute(f'DROP {kind.upper()} IF EXISTS {name}')
+        conn.commit()
+    
+    try:
+        yield
+    finally:
+        with db.get_connection() as conn:
+            for _, _, sql in objects:
+                conn.execute(sql)
+            conn.execute('ANALYZE')
+            conn.commit()
+
+class WeightedChoice:
+    """Выбор по весам за O(log n) (random.choices пересчитывает суммы на каждый вызов)"""
+    
+    def __init__(self, items, weights):
+        self.items = list(items)
+        self.cumulative = []
+        total = 0.0
+        for weight in weights:
+            total += weight
+            self.cumulative.append(total)
+        self.total = total
+    
+    def pick(self, rng):
+        return self.items[bisect.bisect_right(self.cumulative, rng.random() * self.total)]
+
+def zipf_weights(count, exponent):
+    """Веса с перекосом: первые элементы выбираются чаще"""
+    return [1 / (rank + 1) ** exponent for rank in range(count)]
+
+class DataGenerator:
+    """Детерминированный генератор данных поверх демо-набора
+    
+    Распределения: доли типов техники и медианы ремонта из TECH_CATALOG,
+    логнормальные длительности ремонта и стоимости, рост числа заявок к
+    концу периода, перекос нагрузки мастеров (Zipf) и повторные клиенты.
+    Заявки пишутся пакетами через Database.bulk_insert (одна транзакция
+    на пакет); в SQLite индексы и триггеры загружаемых таблиц на это время
+    удаляются и создаются заново после загрузки.
+    """
+    
+    def __init__(self, db, seed=1, end_date=None, years=3, batch_size=50_000):
+        self.db = db
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.end_date = end_date or date.today()
+        self.days = int(years * 365)
+        self.batch_size = batch_size
+    
+    def _next_id(self, table, column):
+        with self.db.get_connection() as conn:
+            return (conn.execute(f'SELECT MAX({column}) FROM {table}').fetchone()[0] or 0) + 1
+    
+    def _fio(self):
+        rng = self.rng
+        surname, patronymic = rng.choice(SURNAMES), rng.choice(PATRONYMICS)
+        if rng.random() < 0.5:
+            return f"{surname} {rng.choice(MALE_NAMES)} {patronymic}ич"
+        return f"{surname}а {rng.choice(FEMALE_NAMES)} {patronymic}на"
+    
+    def _users(self, user_type, count, prefix):
+        start_id = self._next_id('users', 'userID')
+        rows = [(start_id + i, self._fio(), f"89{self.rng.randrange(10 ** 9):09d}",
+                 f"{prefix}{start_id + i}", 'pass', user_type)
+                for i in range(count)]
+        self.db.bulk_insert('users', ['userID', 'fio', 'phone', 'login', 'password', 'type'], rows)
+        return [row[0] for row in rows]
+    
+    def _parts(self):
+        """Каталог запчастей: тип техники -> [(partID, название)]"""
+        part_id = self._next_id('parts', 'partID')
+        rows, catalog = [], {}
+        for tech_type, (_, _, base_cost, models, _, part_names) in TECH_CATALOG.items():
+            for part_name in part_names:
+                for model in models:
+                    brand = model.split()[0]
+                    name = f"{part_name} ({tech_type.lower()}, {brand})"
+                    rows.append((part_id, name, f"GEN-{part_id:06d}", round(base_cost * self.rng.uniform(0.1, 0.5), -1),
+                                 self.rng.randint(0, 30), self.rng.randint(2, 8), brand))
+                    catalog.setdefault(tech_type, []).append((part_id, name))
+                    part_id += 1
+        self.db.bulk_insert('parts', ['partID', 'partName', 'vendorCode', 'price', 'quantity',
+                                      'min_quantity', 'supplier'], rows)
+        return catalog
+    
+    def generate(self, requests, masters=None, clients=None, comments_per_request=1.5, parts_usage=0.4,
+                 log=None):
+        """Создать requests заявок; возвращает количество созданных строк по таблицам"""
+        rng = self.rng
+        self.db.create_demo_data()
+        
+        masters = masters or max(5, min(2000, requests // 2000))
+        clients = clients or max(20, requests // 3)
+        
+        with deferred_indexes(self.db):
+            master_ids = self._users(UserType.MASTER.value, masters, 'master')
+            client_ids = self._users(UserType.CLIENT.value, clients, 'client')
+            quality_ids = self._users(UserType.QUALITY_MANAGER.value, max(1, masters // 20), 'quality')
+            parts_catalog = self._parts()
+            
+            pick_master = WeightedChoice(master_ids, zipf_weights(len(master_ids), 0.8))
+            pick_client = WeightedChoice(client_ids, zipf_weights(len(client_ids), 0.5))
+            pick_type = WeightedChoice(TECH_CATALOG, [entry[0] for entry in TECH_CATALOG.values()])
+            pick_priority = WeightedChoice(PRIORITY_WEIGHTS, PRIORITY_WEIGHTS.values())
+            
+            counts = {'users': masters + clients + len(quality_ids), 'parts': sum(map(len, parts_catalog.values())),
+                      'requests': 0, 'comments': 0, 'request_parts': 0}
+            request_id = self._next_id('requests', 'requestID')
+            begin = self.end_date - timedelta(days=self.days)
+            
+            for offset in range(0, requests, self.batch_size):
+                request_rows, comment_rows, part_rows = [], [], []
+                
+                for _ in range(min(self.batch_size, requests - offset)):
+                    tech_type = pick_type.pick(rng)
+                    _, median_days, base_cost, models, problems, _ = TECH_CATALOG[tech_type]
+                    
+                    # Плотность заявок растет к концу периода
+                    start = begin + timedelta(days=int(self.days * math.sqrt(rng.random())))
+                    age = (self.end_date - start).days
+                    duration = min(90, max(1, round(rng.lognormvariate(math.log(median_days), 0.7))))
+                    priority = pick_priority.pick(rng)
+                    
+                    if duration <= age and rng.random() > 0.02:
+                        status, completion = RequestStatus.READY.value, start + timedelta(days=duration)
+                    elif age < 2 and rng.random() < 0.7:
+                        status, completion = RequestStatus.NEW.value, None
+                    else:
+                        status = RequestStatus.WAITING_PARTS.value if rng.random() < 0.25 else RequestStatus.IN_PROGRESS.value
+                        completion = None
+                    
+                    master_id = None if status == RequestStatus.NEW.value else pick_master.pick(rng)
+                    extended = start + timedelta(days=SLA_DAYS.get(priority, DEFAULT_SLA_DAYS) + 7) \
+                        if rng.random() < 0.05 else None
+                    due = extended or start + timedelta(days=SLA_DAYS.get(priority, DEFAULT_SLA_DAYS))
+                    estimated = round(base_cost * rng.lognormvariate(0, 0.4), -1)
+                    actual = round(estimated * rng.uniform(0.8, 1.2), -1) if completion else 0
+                    finished = completion or self.end_date
+                    created = f"{start.isoformat()} {rng.randrange(9, 20):02d}:{rng.randrange(60):02d}:00"
+                    
+                    used_parts = []
+                    if master_id is not None and rng.random() < parts_usage:
+                        used_parts = rng.sample(parts_catalog[tech_type], rng.randint(1, 3))
+                        for part_id, _ in used_parts:
+                            part_rows.append((request_id, part_id, rng.randint(1, 2),
+                                              min(finished, start + timedelta(days=1)).isoformat()))
+                    
+                    if master_id is not None:
+                        for _ in range(int(rng.expovariate(1 / comments_per_request))):
+                            moment = start + timedelta(days=rng.randint(0, max(0, (finished - start).days)))
+                            comment_rows.append((rng.choice(COMMENTS), master_id, request_id,
+                                                 f"{moment.isoformat()} {rng.randrange(9, 20):02d}:{rng.randrange(60):02d}:00",
+                                                 1 if rng.random() < 0.1 else 0))
+                    
+                    request_rows.append((
+                        request_id, start.isoformat(), tech_type, rng.choice(models), rng.choice(problems),
+                        status, completion.isoformat() if completion else None,
+                        ', '.join(name for _, name in used_parts), master_id, pick_client.pick(rng),
+                        rng.choice(quality_ids) if rng.random() < 0.02 else None,
+                        extended.isoformat() if extended else None, due.isoformat(),
+                        estimated, actual, priority, '', created,
+                        f"{completion.isoformat()} 18:00:00" if completion else created
+                    ))
+                    request_id += 1
+                
+                self.db.bulk_insert('requests', [
+                    'requestID', 'startDate', 'homeTechType', 'homeTechModel', 'problemDescription',
+                    'requestStatus', 'completionDate', 'repairParts', 'masterID', 'clientID',
+                    'qualityManagerID', 'extendedDeadline', 'dueDate', 'estimatedCost', 'actualCost',
+                    'priority', 'notes', 'created_at', 'updated_at'], request_rows)
+                self.db.bulk_insert('comments', ['message', 'masterID', 'requestID', 'timestamp', 'is_private'],
+                                    comment_rows)
+                self.db.bulk_insert('request_parts', ['requestID', 'partID', 'quantity', 'used_date'], part_rows)
+                
+                counts['requests'] += len(request_rows)
+                counts['comments'] += len(comment_rows)
+                counts['request_parts'] += len(part_rows)
+                if log:
+                    log(f"Заявок: {counts['requests']} из {requests}")
+        
+        self.db.rebuild_repair_sketches()
+        return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Генератор синтетических данных")
+    parser.add_argument('--db', default='repair_service.db', help="Файл SQLite или postgresql://...")
+    parser.add_argument('--requests', default='10k', help="число заявок: 10k, 1m, 10m или число")
+    parser.add_argument('--seed', type=int, default=1, help="seed генератора")
+    parser.add_argument('--end-date', help="последняя дата заявок YYYY-MM-DD (по умолчанию сегодня)")
+    parser.add_argument('--years', type=float, default=3, help="период заявок, лет")
+    parser.add_argument('--batch-size', type=int, default=50_000, help="заявок в одной транзакции")
+    args = parser.parse_args(argv)
+    
+    from database import Database
+    
+    end_date = datetime.strptime(args.end_date, '%Y-%m-%d').date() if args.end_date else None
+    db = Database(args.db)
+    try:
+        started = time.perf_counter()
+        generator = DataGenerator(db, args.seed, end_date, args.years, args.batch_size)
+        counts = generator.generate(parse_count(args.requests), log=print)
+        print(f"Готово за {time.perf_counter() - started:.1f} с: " +
+              ', '.join(f"{table} {count}" for table, count in counts.items()))
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
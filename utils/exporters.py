@@ -106,9 +106,91 @@ class DataExporter:
             
             self._write_sheet(ws5, headers, data, "По месяцам")
         
+        # Диаграммы (те же, что на экране статистики)
+        charts = self._statistics_charts(stats)
+        if charts:
+            from openpyxl.drawing.image import Image as XLImage
+            from widgets.raster import to_png
+            
+            ws6 = wb.create_sheet("Диаграммы")
+            row = 1
+            for title, image in charts:
+                ws6.cell(row=row, column=1, value=title).font = Font(bold=True, size=12)
+                ws6.add_image(XLImage(to_png(image)), f'A{row + 1}')
+                # Высота строки по умолчанию - 20 пикселей
+                row += image.height // 20 + 3
+        
         wb.save(filename)
         return filename
     
+    def export_statistics_pdf(self):
+        """Экспорт статистики с диаграммами в PDF (страница A4)"""
+        from PIL import Image, ImageDraw
+        from widgets.raster import load_font
+        
+        stats = self.db.get_statistics()
+        
+        os.makedirs('data/export', exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f'data/export/statistics_{timestamp}.pdf'
+        
+        # A4 при 100 точках на дюйм
+        page = Image.new('RGB', (827, 1169), 'white')
+        draw = ImageDraw.Draw(page)
+        draw.text((40, 40), "Статистика сервисного центра", fill='#2c3e50', font=load_font(('Segoe UI', 16, 'bold')))
+        draw.text((40, 75), datetime.now().strftime('%d.%m.%Y %H:%M'), fill='#7f8c8d', font=load_font(('Segoe UI', 9)))
+        
+        lines = [
+            f"Всего заявок: {stats['total_requests']}",
+            f"Активные заявки: {stats['active_requests']}",
+            f"Завершенные заявки: {stats['completed_requests']}",
+            f"Среднее время ремонта: {stats['avg_repair_days']:.1f} дней",
+            f"Общий доход: {stats['total_revenue']:,.0f}₽"
+        ]
+        body = load_font(('Segoe UI', 11))
+        for i, line in enumerate(lines):
+            draw.text((40, 110 + i * 22), line, fill='#2c3e50', font=body)
+        
+        # Диаграммы в две колонки
+        y = 230
+        for i, (title, image) in enumerate(self._statistics_charts(stats)):
+            x = 40 if i % 2 == 0 else 427
+            if i % 2 == 0 and i:
+                y += 340
+            draw.text((x, y), title, fill='#2c3e50', font=load_font(('Segoe UI', 11, 'bold')))
+            page.paste(image.resize((360, round(image.height * 360 / image.width))), (x, y + 25))
+        
+        page.save(filename, 'PDF', resolution=100)
+        return filename
+    
+    def _statistics_charts(self, stats):
+        """Изображения диаграмм статистики: список (заголовок, изображение PIL)"""
+        from widgets.charts import PieChart, BarChart, LineChart
+        
+        charts = []
+        
+        if stats['by_status']:
+            chart = PieChart.offscreen(width=400, height=300)
+            chart.set_data(stats['by_status'])
+            charts.append(("Статусы заявок", chart.to_image()))
+        
+        if stats['by_tech_type']:
+            chart = BarChart.offscreen(width=400, height=300, top_n=6)
+            chart.set_data({tech_type: count for tech_type, count, _ in stats['by_tech_type']})
+            charts.append(("Типы техники", chart.to_image()))
+        
+        if stats['by_master']:
+            chart = BarChart.offscreen(width=400, height=300, top_n=6)
+            chart.set_data({master: total for master, total, _, _ in stats['by_master'] if master})
+            charts.append(("Заявки по мастерам", chart.to_image()))
+        
+        if len(stats['by_month']) >= 2:
+            chart = LineChart.offscreen(width=400, height=300)
+            chart.set_data([(month, total) for month, total, _ in reversed(stats['by_month'])])
+            charts.append(("Заявки по месяцам", chart.to_image()))
+        
+        return charts
+    
     def _export_to_excel(self, data, filename):
         """Экспорт в Excel"""
         df = pd.DataFrame(data)
@@ -0,0 +1,375 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import time
+from datetime import datetime
+
+from .migrations import Migrator
+
+# Полный просмотр таблицы и временное B-дерево в выводе EXPLAIN QUERY PLAN
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?$')
+TEMP_BTREE = re.compile(r'USE TEMP B-TREE FOR (ORDER BY|GROUP BY|RIGHT PART OF ORDER BY|DISTINCT)')
+
+TABLE_REFERENCE = re.compile(
+    r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!(?:ON|WHERE|LEFT|RIGHT|INNER|OUTER|CROSS|JOIN|GROUP|ORDER|LIMIT)\b)(\w+))?',
+    re.IGNORECASE)
+PREDICATE = re.compile(
+    r"(?:\b(\w+)\.)?\b(\w+)\s*(<>|!=|<=|>=|=|<|>|\bIN\b|\bBETWEEN\b|\bIS\s+NOT\s+NULL\b|\bIS\b)\s*('(?:[^']|'')*')?",
+    re.IGNORECASE)
+CLAUSE_END = r'\b(?:GROUP\s+BY|ORDER\s+BY|LIMIT|HAVING|UNION)\b'
+
+MAX_COVERING_COLUMNS = 5
+
+# Каталог миграций советника: в каталог migrations их переносят вручную
+OUTPUT_DIR = os.path.join('data', 'migrations')
+
+def _clause(sql, keyword):
+    """Текст предложения SQL (WHERE, ORDER BY ...) до следующего предложения"""
+    match = re.search(rf'\b{keyword}\b(.*?)(?={CLAUSE_END}|$)', sql, re.IGNORECASE | re.DOTALL)
+    return match.group(1) if match else ''
+
+class IndexAdvisor:
+    """Советник индексов по журналу запросов
+    
+    Запросы, собранные профилировщиком, повторно выполняются через
+    EXPLAIN QUERY PLAN. Для полных просмотров таблиц и временных B-деревьев
+    сортировки предлагается индекс: сначала колонки условий равенства,
+    затем одна колонка диапазона или колонки сортировки. Условия вида
+    col != 'литерал' переносятся в частичный индекс, а короткий список
+    выбираемых колонок добавляется в индекс как покрывающий. Принятые
+    рекомендации оформляются версионной миграцией в каталоге directory.
+    Работает с SQLite.
+    """
+    
+    def __init__(self, db, queries=None, repeat=20, directory=OUTPUT_DIR):
+        self.db = db
+        self.repeat = repeat
+        self.directory = directory
+        self.queries = queries if queries is not None else self.captured_queries(db.profiler.snapshot())
+        self._columns = {}
+    
+    @staticmethod
+    def captured_queries(snapshot):
+        """Образцы SELECT-запросов из статистики профилировщика (или ее JSON)"""
+        queries = []
+        for stats in snapshot:
+            sql = stats.get('sql')
+            if sql and sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+                queries.append((sql, tuple(stats.get('sample_params') or ())))
+        return queries
+    
+    # --- Анализ ---
+    
+    def explain(self, conn, sql, params=()):
+        """Строки плана выполнения"""
+        return [row[-1] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()]
+    
+    def table_columns(self, conn, table):
+        if table not in self._columns:
+            self._columns[table] = {row[1].lower(): row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+        return self._columns[table]
+    
+    def existing_indexes(self, conn, table):
+        """Списки колонок существующих индексов таблицы (включая первичный ключ)"""
+        primary_key = sorted((row[5], row[1].lower()) for row in conn.execute(f'PRAGMA table_info({table})') if row[5])
+        indexes = [[name for _, name in primary_key]] if primary_key else []
+        for index in conn.execute(f'PRAGMA index_list({table})').fetchall():
+            columns = [row[2].lower() for row in conn.execute(f'PRAGMA index_info({index[1]})') if row[2]]
+            indexes.append(columns)
+        return indexes
+    
+    def _has_primary_key(self, conn, table):
+        return any(row[5] for row in conn.execute(f'PRAGMA table_info({table})'))
+    
+    def recommend(self):
+        """Рекомендации индексов по всем запросам"""
+        recommendations = {}
+        
+        conn = self.db.backend.connect()
+        try:
+            for sql, params in self.queries:
+                try:
+                    plan = self.explain(conn, sql, params)
+                except Exception:
+                    continue
+                
+                for recommendation in self._analyze(conn, sql, plan):
+                    key = (recommendation['table'], tuple(recommendation['columns']), recommendation['where'])
+                    existing = recommendations.setdefault(key, recommendation)
+                    if sql not in existing['queries']:
+                        existing['queries'].append(sql)
+        finally:
+            conn.close()
+        
+        return list(recommendations.values())
+    
+    def _analyze(self, conn, sql, plan):
+        aliases = {}
+        for table, alias in TABLE_REFERENCE.findall(sql):
+            aliases[(alias or table).lower()] = table.lower()
+            aliases.setdefault(table.lower(), table.lower())
+        
+        problems = {}
+        for line in plan:
+            match = FULL_SCAN.match(line)
+            if match and match.group(1).lower() in aliases:
+                alias = (match.group(2) or match.group(1)).lower()
+                problems.setdefault(alias, f"полный просмотр ({line})")
+            
+            match = TEMP_BTREE.search(line)
+            if match:
+                order_aliases = {a for a, _ in self._order_columns(sql, aliases)}
+                if len(order_aliases) == 1:
+                    problems.setdefault(order_aliases.pop(), f"временное B-дерево ({line})")
+        
+        result = []
+        for alias, reason in problems.items():
+            table = aliases.get(alias)
+            if not table or table.startswith('sqlite_'):
+                continue
+            recommendation = self._build(conn, sql, aliases, alias, table, reason)
+            if recommendation:
+                result.append(recommendation)
+        return result
+    
+    def _column(self, conn, aliases, alias, qualifier, column, table):
+        """Имя колонки таблицы alias, если ссылка относится к ней"""
+        if qualifier and qualifier.lower() != alias:
+            return None
+        if not qualifier and len(set(aliases.values())) > 1:
+            return None
+        return self.table_columns(conn, table).get(column.lower())
+    
+    def _order_columns(self, sql, aliases):
+        columns = []
+        for item in _clause(sql, r'ORDER\s+BY').split(','):
+            match = re.match(r'\s*(?:(\w+)\.)?(\w+)', item)
+            if match:
+                qualifier = (match.group(1) or '').lower()
+                alias = qualifier or (next(iter(aliases)) if len(set(aliases.values())) == 1 else '')
+                if alias in aliases:
+                    columns.append((alias, match.group(2)))
+        return columns
+    
+    def _build(self, conn, sql, aliases, alias, table, reason):
+        equality, ranges, partial = [], [], []
+        
+        # Условия соединения важны только для присоединяемых таблиц, не для ведущей
+        conditions = _clause(sql, 'WHERE')
+        if alias != next(iter(aliases), None):
+            conditions += ' ' + ' '.join(re.findall(r'\bON\b(.*?)(?=\b(?:LEFT|RIGHT|INNER|JOIN|WHERE)\b|$)',
+                                                    sql, re.IGNORECASE | re.DOTALL))
+        for qualifier, column, operator, literal in PREDICATE.findall(conditions):
+            name = self._column(conn, aliases, alias, qualifier, column, table)
+            if not name:
+                continue
+            operator = operator.upper()
+            if operator in ('!=', '<>') and literal:
+                partial.append(f"{name} != {literal}")
+            elif re.match(r'IS\s+NOT\s+NULL', operator):
+                partial.append(f"{name} IS NOT NULL")
+            elif operator in ('=', 'IN', 'IS'):
+                equality.append(name)
+            elif operator in ('<', '>', '<=', '>=', 'BETWEEN'):
+                ranges.append(name)
+        
+        order = [name for a, c in self._order_columns(sql, aliases) if a == alias
+                 for name in [self.table_columns(conn, table).get(c.lower())] if name]
+        
+        columns = list(dict.fromkeys(equality))
+        if ranges:
+            columns += [c for c in ranges[:1] if c not in columns]
+        else:
+            columns += [c for c in order if c not in columns]
+        
+        if not columns:
+            return None
+        
+        # Покрывающий индекс для короткого списка выбираемых колонок
+        match = re.search(r'\bSELECT\b(.*?)\bFROM\b', sql, re.IGNORECASE | re.DOTALL)
+        select = match.group(1) if match else '*'
+        selected = [self.table_columns(conn, table).get(c.lower())
+                    for q, c in re.findall(r'(?:\b(\w+)\.)?\b(\w+)\b', select)
+                    if (q or '').lower() in (alias, '' if len(set(aliases.values())) == 1 else alias)]
+        primary_key = self.existing_indexes(conn, table)[0] if self._has_primary_key(conn, table) else []
+        selected = [c for c in dict.fromkeys(selected) if c and c not in columns and c.lower() not in primary_key]
+        if '*' not in select and selected and len(columns) + len(selected) <= MAX_COVERING_COLUMNS:
+            columns += selected
+        
+        lowered = [c.lower() for c in columns]
+        for existing in self.existing_indexes(conn, table):
+            if existing[:len(lowered)] == lowered:
+                return None
+        
+        where = ' AND '.join(dict.fromkeys(partial)) or None
+        name = f"idx_{table}_{'_'.join(lowered)}"[:60] + ('_partial' if where else '')
+        statement = f"CREATE INDEX IF NOT EXISTS {name} ON {table}({', '.join(columns)})"
+        if where:
+            statement += f" WHERE {where}"
+        
+        return {
+            'table': table,
+            'columns': columns,
+            'where': where,
+            'name': name,
+            'statement': statement,
+            'reason': reason,
+            'queries': [sql]
+        }
+    
+    # --- Замеры и применение ---
+    
+    def benchmark(self):
+        """Медианное время выполнения каждого запроса, мс"""
+        results = {}
+        
+        conn = self.db.backend.connect()
+        try:
+            for sql, params in self.queries:
+                timings = []
+                try:
+                    for _ in range(self.repeat):
+                        started = time.perf_counter()
+                        conn.execute(sql, params).fetchall()
+                        timings.append((time.perf_counter() - started) * 1000)
+                except Exception:
+                    continue
+                results[sql] = {
+                    'median_ms': statistics.median(timings),
+                    'plan': self.explain(conn, sql, params)
+                }
+        finally:
+            conn.close()
+        
+        return results
+    
+    def apply(self, recommendations, name='advisor_indexes'):
+        """Записать рекомендации миграцией в self.directory и создать индексы в текущей БД
+        
+        Каталог migrations приложения не меняется (установка может быть только
+        для чтения): проверенный файл переносят туда вручную. Версия схемы
+        текущей БД не записывается, а CREATE INDEX IF NOT EXISTS перенесенной
+        миграции для нее ничего не изменит.
+        """
+        comment = '\n'.join(f"{r['name']}: {r['reason']}" for r in recommendations)
+        migration = Migrator(self.db, self.directory).create(
+            name, [r['statement'] for r in recommendations],
+            comment=f"Создано советником индексов {datetime.now():%Y-%m-%d %H:%M}\n{comment}")
+        
+        conn = self.db.backend.connect()
+        try:
+            try:
+                conn.execute('BEGIN')
+                for statement in migration.statements:
+                    conn.execute(statement)
+                conn.commit()
+            except Exception:
+                # Неприменимая миграция не остается в каталоге
+                conn.rollback()
+                os.remove(migration.path)
+                raise
+            
+            conn.execute('ANALYZE')
+            conn.commit()
+        finally:
+            conn.close()
+        
+        return migration
+    
+    def run(self, apply=False):
+        """Полный цикл: замер, рекомендации, (миграция, повторный замер); возвращает отчет"""
+        if self.db.dialect != 'sqlite':
+            raise RuntimeError("Советник индексов доступен только для SQLite")
+        
+        before = self.benchmark()
+        recommendations = self.recommend()
+        migration = None
+        after = {}
+        
+        if apply and recommendations:
+            migration = self.apply(recommendations)
+            after = self.benchmark()
+        
+        queries = []
+        for sql, result in before.items():
+            entry = {'sql': ' '.join(sql.split()), 'before_ms': round(result['median_ms'], 3),
+                     'plan_before': result['plan']}
+            if sql in after:
+                entry['after_ms'] = round(after[sql]['median_ms'], 3)
+                entry['plan_after'] = after[sql]['plan']
+                entry['speedup'] = round(result['median_ms'] / max(after[sql]['median_ms'], 1e-6), 2)
+            queries.append(entry)
+        
+        return {
+            'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'repeat': self.repeat,
+            'recommendations': recommendations,
+            'migration': migration.path if migration else None,
+            'queries': sorted(queries, key=lambda q: -q['before_ms'])
+        }
+    
+    @staticmethod
+    def format_report(report):
+        """Текстовый отчет"""
+        lines = [f"Советник индексов - {report['created']}", '']
+        
+        if report['recommendations']:
+            lines.append('Рекомендации:')
+            for r in report['recommendations']:
+                lines.append(f"  {r['statement']}")
+                lines.append(f"    причина: {r['reason']}; запросов: {len(r['queries'])}")
+        else:
+            lines.append('Рекомендаций нет')
+        
+        if report['migration']:
+            lines += ['', f"Миграция: {report['migration']}"]
+        
+        lines += ['', f"{'до, мс':>10} {'после, мс':>10} {'ускор.':>7}  запрос"]
+        for q in report['queries']:
+            after = f"{q['after_ms']:10.3f}" if 'after_ms' in q else f"{'-':>10}"
+            speedup = f"{q['speedup']:7.2f}" if 'speedup' in q else f"{'-':>7}"
+            lines.append(f"{q['before_ms']:10.3f} {after} {speedup}  {q['sql'][:100]}")
+        
+        return '\n'.join(lines)
+    
+    @staticmethod
+    def save_report(report, directory='data/export'):
+        """Сохранение отчета в JSON и TXT; возвращает путь к JSON"""
+        os.makedirs(directory, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(directory, f'index_report_{timestamp}')
+        
+        with open(path + '.json', 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+        with open(path + '.txt', 'w', encoding='utf-8') as f:
+            f.write(IndexAdvisor.format_report(report))
+        
+        return path + '.json'
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Советник индексов по JSON-дампу профилировщика")
+    parser.add_argument('profile', help="файл query_profile_*.json из окна диагностики")
+    parser.add_argument('--db', default='repair_service.db', help="файл базы данных")
+    parser.add_argument('--apply', action='store_true', help="создать миграцию и индексы в БД")
+    parser.add_argument('--output', default=OUTPUT_DIR, help="каталог файла миграции")
+    parser.add_argument('--repeat', type=int, default=20, help="повторов замера каждого запроса")
+    args = parser.parse_args(argv)
+    
+    from database import Database
+    
+    with open(args.profile, encoding='utf-8') as f:
+        queries = IndexAdvisor.captured_queries(json.load(f)['queries'])
+    
+    db = Database(args.db)
+    try:
+        report = IndexAdvisor(db, queries, repeat=args.repeat, directory=args.output).run(apply=args.apply)
+    finally:
+        db.close()
+    
+    print(IndexAdvisor.format_report(report))
+    print(f"\nОтчет: {IndexAdvisor.save_report(report)}")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,362 @@
+import argparse
+import importlib.util
+import os
+import re
+import sqlite3
+import time
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+# Имя файла миграции: 0001_short_name.sql или 0001_short_name.py (функция upgrade(ctx))
+MIGRATION_FILE = re.compile(r'^(\d{4})_(\w+)\.(sql|py)$')
+
+CREATE_TABLE = re.compile(r'^CREATE TABLE (?:IF NOT EXISTS )?(\w+)', re.IGNORECASE)
+
+def split_statements(script):
+    """Разбиение SQL-скрипта на запросы (тела триггеров BEGIN ... END не разрываются)"""
+    statements, current = [], ''
+    for line in script.splitlines():
+        if not current.strip() and line.strip().startswith('--'):
+            continue
+        current += line + '\n'
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ''
+    if current.strip():
+        statements.append(current.strip())
+    return statements
+
+def _load_upgrade(path, version, name):
+    spec = importlib.util.spec_from_file_location(f"migrations.m{version:04d}_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    
+    if not callable(getattr(module, 'upgrade', None)):
+        raise ValueError(f"В миграции нет функции upgrade(ctx): {path}")
+    return module.upgrade
+
+class Migration:
+    """Миграция схемы: номер версии и список SQL-запросов или функция upgrade(ctx)"""
+    
+    def __init__(self, version, name, statements=(), path=None, upgrade=None):
+        self.version = version
+        self.name = name
+        self.statements = list(statements)
+        self.path = path
+        self.upgrade = upgrade
+    
+    @classmethod
+    def from_file(cls, path):
+        match = MIGRATION_FILE.match(os.path.basename(path))
+        if not match:
+            raise ValueError(f"Некорректное имя файла миграции: {path}")
+        
+        version, name = int(match.group(1)), match.group(2)
+        if match.group(3) == 'py':
+            return cls(version, name, path=path, upgrade=_load_upgrade(path, version, name))
+        
+        with open(path, encoding='utf-8') as f:
+            statements = split_statements(f.read())
+        
+        return cls(version, name, statements, path)
+    
+    def run(self, ctx):
+        """Выполнить миграцию в контексте ctx"""
+        if self.upgrade is not None:
+            self.upgrade(ctx)
+            return
+        for statement in self.statements:
+            ctx.execute(statement)
+    
+    def __repr__(self):
+        if self.upgrade is not None:
+            return f"Migration({self.version}, {self.name!r}, python)"
+        return f"Migration({self.version}, {self.name!r}, statements={len(self.statements)})"
+
+def migration_files(directory=MIGRATIONS_DIR):
+    """Имена файлов миграций в порядке версий"""
+    if not os.path.isdir(directory):
+        return []
+    
+    names = sorted(name for name in os.listdir(directory) if MIGRATION_FILE.match(name))
+    versions = [int(name[:4]) for name in names]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Повторяющиеся номера миграций в {directory}")
+    
+    return names
+
+def load_migrations(directory=MIGRATIONS_DIR, after=0):
+    """Миграции из каталога в порядке версий (с номером больше after)"""
+    return [Migration.from_file(os.path.join(directory, name))
+            for name in migration_files(directory) if int(name[:4]) > after]
+
+class MigrationContext:
+    """Контекст выполнения миграции
+    
+    Передается в upgrade(ctx) миграций на Python; SQL-миграции выполняются
+    через него же. В режиме dry_run изменяющие запросы только записываются
+    в statements, чтение схемы (table_exists, column_names) выполняется;
+    таблицы, которые создает этот же запуск (created_tables: имя -> CREATE
+    TABLE, общий для всех его миграций), считаются существующими.
+    """
+    
+    # Строк в одной транзакции backfill
+    BACKFILL_BATCH_SIZE = 5000
+    
+    def __init__(self, migrator, conn, dry_run=False, created_tables=None):
+        self.migrator = migrator
+        self.db = migrator.db
+        self.dialect = migrator.db.dialect
+        self.conn = conn
+        self.dry_run = dry_run
+        self.statements = []
+        self.callbacks = []
+        self.created_tables = {} if created_tables is None else created_tables
+    
+    def execute(self, sql, params=()):
+        """Выполнить изменяющий запрос (в dry_run - только записать)"""
+        statement = ' '.join(sql.split())
+        self.statements.append(statement)
+        
+        match = CREATE_TABLE.match(statement)
+        if match and not self.table_exists(match.group(1)):
+            self.created_tables[match.group(1)] = statement
+        
+        if self.dry_run:
+            return None
+        return self.conn.execute(sql, params)
+    
+    def execute_script(self, script):
+        """Выполнить скрипт из нескольких запросов в диалекте текущей БД"""
+        if self.dialect == 'sqlite':
+            for statement in split_statements(script):
+                self.execute(statement)
+            return
+        
+        self.statements.append(f"-- скрипт {self.dialect}: {len(script)} символов")
+        if not self.dry_run:
+            self.conn.executescript(script)
+    
+    def table_exists(self, table):
+        if table in self.created_tables:
+            return True
+        if self.dialect == 'sqlite':
+            return self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                     (table,)).fetchone() is not None
+        return self.conn.execute('SELECT to_regclass(?) IS NOT NULL', (table.lower(),)).fetchone()[0]
+    
+    def column_names(self, table):
+        if self.dialect == 'sqlite':
+            return [row[1] for row in self.conn.execute(f'PRAGMA table_info({table})').fetchall()]
+        return [row[0] for row in self.conn.execute(
+            'SELECT column_name FROM information_schema.columns WHERE table_name = ? ORDER BY ordinal_position',
+            (table.lower(),)).fetchall()]
+    
+    def add_column(self, table, column, definition):
+        """Добавить колонку, если ее нет; возвращает True, если колонка добавлена
+        
+        Колонка, описанная в CREATE TABLE этого же запуска миграций, тоже
+        считается существующей (в dry_run таблица еще не создана).
+        """
+        created = self.created_tables.get(table, '')
+        if column in self.column_names(table) or re.search(rf'[(,]\s*{column}\s', created):
+            return False
+        self.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+        return True
+    
+    def backfill(self, table, assignments, where, pause=0.02):
+        """Заполнение колонки большой таблицы пакетами по ключу
+        
+        UPDATE table SET assignments WHERE where выполняется диапазонами
+        первичного ключа по BACKFILL_BATCH_SIZE строк, каждый диапазон -
+        отдельной транзакцией с паузой pause между ними: запись не
+        блокируется на все время миграции. Изменения схемы, сделанные до
+        вызова, фиксируются (новые строки к этому моменту уже должны
+        заполняться триггерами); затем транзакция миграции открывается снова.
+        В PostgreSQL UPDATE не блокирует чтение и выполняется одним запросом.
+        """
+        update = f'UPDATE {table} SET {assignments} WHERE ({where})'
+        if self.dry_run or self.dialect != 'sqlite':
+            self.execute(update)
+            return
+        
+        self.statements.append(f"{' '.join(update.split())} -- пакетами по {self.BACKFILL_BATCH_SIZE} строк")
+        primary_key = [row[1] for row in self.conn.execute(f'PRAGMA table_info({table})').fetchall() if row[5]]
+        key = primary_key[0] if len(primary_key) == 1 else 'rowid'
+        
+        self.conn.execute('COMMIT')
+        last = None
+        while True:
+            after = f'{key} > ?' if last is not None else '1'
+            params = (last,) if last is not None else ()
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                keys = self.conn.execute(f'SELECT {key} FROM {table} WHERE {after} ORDER BY {key} LIMIT ?',
+                                         params + (self.BACKFILL_BATCH_SIZE,)).fetchall()
+                if keys:
+                    self.conn.execute(f'{update} AND {after} AND {key} <= ?', params + (keys[-1][0],))
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+            if len(keys) < self.BACKFILL_BATCH_SIZE:
+                break
+            last = keys[-1][0]
+            # Пауза между пакетами дает пройти ожидающим записям
+            time.sleep(pause)
+        
+        self.conn.execute('BEGIN IMMEDIATE')
+    
+    def on_commit(self, callback):
+        """Вызвать callback после фиксации миграции (в dry_run не вызывается)"""
+        self.callbacks.append(callback)
+
+class Migrator:
+    """Применение версионных миграций схемы
+    
+    Версия схемы SQLite хранится в PRAGMA user_version (в PostgreSQL -
+    максимальная версия в schema_migrations), журнал примененных миграций -
+    в таблице schema_migrations. Каждая миграция выполняется одной
+    транзакцией вместе с записью новой версии.
+    
+    При запуске приложения, если версия схемы совпадает с номером последнего
+    файла миграции, никакие DDL-запросы не выполняются.
+    """
+    
+    def __init__(self, db, directory=MIGRATIONS_DIR):
+        self.db = db
+        self.directory = directory
+    
+    def _ensure_table(self, conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+    
+    def get_version(self, conn=None):
+        """Текущая версия схемы"""
+        if conn is None:
+            with self.db.get_connection() as conn:
+                return self.get_version(conn)
+        
+        if self.db.dialect == 'sqlite':
+            return conn.execute('PRAGMA user_version').fetchone()[0]
+        
+        if not conn.execute("SELECT to_regclass('schema_migrations') IS NOT NULL").fetchone()[0]:
+            return 0
+        return conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_migrations').fetchone()[0]
+    
+    def latest_version(self):
+        """Номер последней миграции (по именам файлов, без их загрузки)"""
+        files = migration_files(self.directory)
+        return int(files[-1][:4]) if files else 0
+    
+    def is_current(self, conn=None):
+        """Схема в актуальной версии"""
+        return self.get_version(conn) >= self.latest_version()
+    
+    def pending(self, conn=None):
+        """Еще не примененные миграции"""
+        return load_migrations(self.directory, after=self.get_version(conn))
+    
+    def migrate(self, dry_run=False):
+        """Применить все ожидающие миграции
+        
+        Возвращает список пар (миграция, выполненные запросы); в режиме
+        dry_run запросы только собираются, схема не изменяется.
+        """
+        conn = self.db.get_connection()
+        try:
+            if self.is_current(conn):
+                return []
+            
+            pending = self.pending(conn)
+            if not dry_run:
+                self._ensure_table(conn)
+                conn.commit()
+            
+            created_tables = {}
+            return [(migration, self.apply(conn, migration, dry_run, created_tables)) for migration in pending]
+        finally:
+            self.db.release_connection(conn)
+    
+    def apply(self, conn, migration, dry_run=False, created_tables=None):
+        """Применить одну миграцию в транзакции; возвращает выполненные запросы"""
+        ctx = MigrationContext(self, conn, dry_run, created_tables)
+        if dry_run:
+            migration.run(ctx)
+            return ctx.statements
+        
+        isolation_level = conn.isolation_level
+        conn.isolation_level = None
+        
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                migration.run(ctx)
+                conn.execute('INSERT INTO schema_migrations (version, name) VALUES (?, ?)',
+                             (migration.version, migration.name))
+                if self.db.dialect == 'sqlite':
+                    conn.execute(f'PRAGMA user_version = {int(migration.version)}')
+                conn.execute('COMMIT')
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                raise
+        finally:
+            conn.isolation_level = isolation_level
+        
+        for callback in ctx.callbacks:
+            callback()
+        return ctx.statements
+    
+    def create(self, name, statements, comment=None):
+        """Записать новую миграцию со следующим номером; возвращает ее"""
+        version = max(self.latest_version(), self.get_version()) + 1
+        slug = re.sub(r'\W+', '_', name).strip('_').lower() or 'migration'
+        path = os.path.join(self.directory, f"{version:04d}_{slug}.sql")
+        
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            if comment:
+                f.write(''.join(f"-- {line}\n" for line in comment.splitlines()))
+                f.write('\n')
+            f.write(';\n\n'.join(s.rstrip(';') for s in statements) + ';\n')
+        
+        return Migration(version, slug, statements, path)
+
+def main(argv=None):
+    """Командная строка: python -m utils.migrations --db repair_service.db [--dry-run | --status]"""
+    from database import Database
+    
+    parser = argparse.ArgumentParser(description="Версионные миграции схемы БД")
+    parser.add_argument('--db', default='repair_service.db', help="Файл SQLite или postgresql://...")
+    parser.add_argument('--dry-run', action='store_true', help="Показать запросы без изменения схемы")
+    parser.add_argument('--status', action='store_true', help="Показать версию схемы и ожидающие миграции")
+    args = parser.parse_args(argv)
+    
+    # Database применяет миграции при открытии - для --dry-run и --status их откладываем
+    db = Database(args.db, migrate=False)
+    migrator = Migrator(db)
+    
+    try:
+        if args.status:
+            version = migrator.get_version()
+            print(f"Версия схемы: {version}, последняя миграция: {migrator.latest_version()}")
+            for name in migration_files(migrator.directory):
+                if int(name[:4]) > version:
+                    print(f"  ожидает: {name}")
+            return
+        
+        for migration, statements in migrator.migrate(dry_run=args.dry_run):
+            print(f"-- {migration.version:04d}_{migration.name}")
+            for statement in statements:
+                print(f"{statement};")
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
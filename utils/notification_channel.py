@@ -0,0 +1,247 @@
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+logger = logging.getLogger(__name__)
+
+class NotificationChannel:
+    """Канал доставки уведомлений (публикация/подписка)
+    
+    Фоновый поток опрашивает PRAGMA data_version на собственном соединении.
+    Значение меняется только после фиксации транзакции другим соединением
+    (в том числе из другого экземпляра приложения), поэтому пока БД не
+    менялась, таблица уведомлений не читается. После изменения читаются
+    только строки с notificationID больше последнего и счетчики подписчиков.
+    В PostgreSQL версией служат последний notificationID и последняя версия
+    строки счетчиков (оба - по индексу, без чтения всех счетчиков).
+    """
+    
+    VERSION_QUERIES = {
+        'sqlite': 'PRAGMA data_version',
+        'postgresql': '''
+            SELECT (SELECT COALESCE(MAX(notificationID), 0) FROM notifications) || ':' ||
+                   (SELECT COALESCE(MAX(row_version), 0) FROM notification_counters)
+        '''
+    }
+    
+    def __init__(self, db, poll_interval=0.5):
+        self.db = db
+        self.poll_interval = poll_interval
+        self._subscribers = {}
+        self._next_token = 0
+        self._unread = {}
+        self._last_id = None
+        self._version = None
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def subscribe(self, user_id, callback):
+        """Подписка на события пользователя; возвращает токен подписки
+        
+        callback вызывается из фонового потока со словарем
+        {'user_id', 'unread', 'notifications'}.
+        """
+        with self._condition:
+            self._next_token += 1
+            self._subscribers[self._next_token] = (user_id, callback)
+            self._unread.pop(user_id, None)
+            return self._next_token
+    
+    def unsubscribe(self, token):
+        """Отмена подписки"""
+        with self._condition:
+            self._subscribers.pop(token, None)
+    
+    def start(self):
+        """Запуск фонового потока"""
+        if self._thread and self._thread.is_alive():
+            return
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='NotificationChannel', daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout=None):
+        """Остановка фонового потока"""
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def _run(self):
+        conn = None
+        
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    if conn is None:
+                        conn = self.db.backend.connect(check_same_thread=False)
+                    self.poll(conn)
+                except Exception:
+                    # Ошибка опроса (в том числе драйвера PostgreSQL) не останавливает
+                    # поток; соединение могло оборваться - открывается заново
+                    logger.exception("Ошибка канала уведомлений")
+                    conn = self._discard(conn)
+                self._stop_event.wait(self.poll_interval)
+        finally:
+            self._discard(conn)
+    
+    @staticmethod
+    def _discard(conn):
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        return None
+    
+    def poll(self, conn):
+        """Одна проверка; возвращает True, если БД изменилась"""
+        version = conn.execute(self.VERSION_QUERIES[self.db.dialect]).fetchone()[0]
+        if version == self._version:
+            return False
+        self._version = version
+        
+        if self._last_id is None:
+            rows = []
+            last_id = conn.execute('SELECT MAX(notificationID) FROM notifications').fetchone()[0] or 0
+        else:
+            rows = conn.execute('''
+                SELECT notificationID, userID, message, type, created_at
+                FROM notifications
+                WHERE notificationID > ?
+                ORDER BY notificationID
+            ''', (self._last_id,)).fetchall()
+            last_id = rows[-1]['notificationID'] if rows else self._last_id
+        
+        with self._condition:
+            subscribers = list(self._subscribers.values())
+        
+        counts = {}
+        user_ids = sorted({user_id for user_id, _ in subscribers})
+        if user_ids:
+            placeholders = ','.join('?' * len(user_ids))
+            counts = dict(conn.execute(f'''
+                SELECT userID, unread FROM notification_counters
+                WHERE userID IN ({placeholders})
+            ''', user_ids).fetchall())
+        
+        events = {}
+        for user_id in user_ids:
+            unread = counts.get(user_id, 0)
+            notifications = [dict(row) for row in rows if row['userID'] == user_id]
+            if notifications or self._unread.get(user_id) != unread:
+                events[user_id] = {'user_id': user_id, 'unread': unread, 'notifications': notifications}
+            self._unread[user_id] = unread
+        
+        for user_id, callback in subscribers:
+            if user_id in events:
+                try:
+                    callback(events[user_id])
+                except Exception:
+                    logger.exception("Ошибка обработчика уведомлений пользователя %s", user_id)
+        
+        with self._condition:
+            self._last_id = last_id
+            self._condition.notify_all()
+        
+        return True
+    
+    def wait(self, user_id, after_id=0, timeout=25):
+        """Ожидание уведомлений пользователя с notificationID > after_id (long-poll)"""
+        deadline = time.monotonic() + timeout
+        
+        while True:
+            notifications = self._fetch(user_id, after_id)
+            remaining = deadline - time.monotonic()
+            if notifications or remaining <= 0 or self._stop_event.is_set():
+                break
+            
+            with self._condition:
+                seen = self._last_id
+                self._condition.wait_for(
+                    lambda: self._last_id != seen or self._stop_event.is_set(), remaining)
+        
+        return {
+            'unread': self.db.get_unread_count(user_id),
+            'last_id': notifications[-1]['notificationID'] if notifications else after_id,
+            'notifications': notifications
+        }
+    
+    def _fetch(self, user_id, after_id, limit=50):
+        """Уведомления пользователя после указанного"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT notificationID, userID, message, type, created_at
+                FROM notifications
+                WHERE userID = ? AND notificationID > ?
+                ORDER BY notificationID
+                LIMIT ?
+            ''', (user_id, after_id, limit))
+            
+            return [dict(row) for row in cursor.fetchall()]
+
+class NotificationServer(ThreadingHTTPServer):
+    """Локальный HTTP long-poll сервер уведомлений
+    
+    GET /notifications?user_id=<id>&after=<notificationID>&timeout=<сек>
+    отвечает, как только у пользователя появятся новые уведомления
+    (или по истечении timeout), JSON-объектом из NotificationChannel.wait.
+    """
+    
+    daemon_threads = True
+    max_timeout = 60
+    
+    def __init__(self, channel, host='127.0.0.1', port=8765):
+        super().__init__((host, port), _LongPollHandler)
+        self.channel = channel
+        self._thread = None
+    
+    def start(self):
+        """Запуск сервера в фоновом потоке"""
+        self._thread = threading.Thread(target=self.serve_forever, name='NotificationServer', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Остановка сервера"""
+        self.shutdown()
+        self.server_close()
+
+class _LongPollHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов long-poll"""
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != '/notifications':
+            self.send_error(404)
+            return
+        
+        params = parse_qs(url.query)
+        try:
+            user_id = int(params['user_id'][0])
+            after_id = int(params.get('after', ['0'])[0])
+            timeout = min(float(params.get('timeout', ['25'])[0]), self.server.max_timeout)
+        except (KeyError, ValueError):
+            self.send_error(400, explain="Ожидаются параметры user_id, after, timeout")
+            return
+        
+        result = self.server.channel.wait(user_id, after_id, timeout)
+        body = json.dumps(result, ensure_ascii=False, default=str).encode('utf-8')
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
\ No newline at end of file
@@ -0,0 +1,364 @@
+import bisect
+import json
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+
+from .sketches import percentile
+
+# Границы корзин гистограммы длительности, мс
+HISTOGRAM_BOUNDS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Модули, кадры которых не считаются источником запроса
+INTERNAL_MODULES = ('utils.query_profiler', 'utils.write_queue', 'storage', 'async_database',
+                    'concurrent', 'threading', 'asyncio', 'contextlib', 'functools')
+
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN '
+}
+
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+
+# Размер пакета строк при итерации по курсору (for row in cursor)
+ITER_BATCH_SIZE = 256
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql):
+    """Нормализованный текст запроса: литералы заменены на ?, списки IN свернуты"""
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    sql = re.sub(r'\(\s*\?(?:\s*,\s*\?)+\s*\)', '(...)', sql)
+    return ' '.join(sql.split())
+
+def params_shape(params):
+    """Форма параметров без значений: (int, str, ...)"""
+    if not params:
+        return '()'
+    if isinstance(params, dict):
+        return '{' + ', '.join(sorted(params)) + '}'
+    return '(' + ', '.join(type(value).__name__ for value in params) + ')'
+
+# Код функции -> (подпись или None для внутренних модулей, функция формы или виджета)
+_code_labels = {}
+
+def _code_label(frame):
+    code = frame.f_code
+    entry = _code_labels.get(code)
+    if entry is None:
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith(INTERNAL_MODULES):
+            entry = (None, False)
+        else:
+            name = getattr(code, 'co_qualname', code.co_name)
+            entry = (f"{module}.{name}" if '.' not in name else name, module.startswith(('forms.', 'widgets.')))
+        _code_labels[code] = entry
+    return entry
+
+def find_caller():
+    """Источник запроса: метод формы или виджета, иначе первый внешний кадр
+    
+    Подпись и вид кадра вычисляются один раз для каждой функции (по объекту
+    кода), поэтому обход стека при каждом запросе - только поиск в словаре.
+    """
+    frame = sys._getframe(2)
+    fallback = None
+    
+    while frame is not None:
+        label, preferred = _code_label(frame)
+        if preferred:
+            return label
+        if label is not None and fallback is None:
+            fallback = label
+        frame = frame.f_back
+    
+    return fallback or '?'
+
+class QueryStats:
+    """Статистика одного отпечатка запроса"""
+    
+    def __init__(self, fingerprint, window):
+        self.fingerprint = fingerprint
+        self.count = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        self.recent = deque(maxlen=window)
+        self.callers = {}
+        self.shapes = set()
+        self.sql = None
+        self.sample_params = ()
+    
+    def add(self, duration_ms, rows, caller, shape, sql=None, params=()):
+        self.count += 1
+        self.rows += rows
+        self.total += duration_ms
+        self.max = max(self.max, duration_ms)
+        self.histogram[bisect.bisect_left(HISTOGRAM_BOUNDS, duration_ms)] += 1
+        self.recent.append(duration_ms)
+        self.callers[caller] = self.callers.get(caller, 0) + 1
+        self.shapes.add(shape)
+        if sql is not None:
+            # Последний вызов - образец для повторного выполнения (советник индексов)
+            self.sql = sql
+            self.sample_params = params
+    
+    def to_dict(self):
+        recent = list(self.recent)
+        return {
+            'fingerprint': self.fingerprint,
+            'count': self.count,
+            'rows': self.rows,
+            'total_ms': round(self.total, 3),
+            'avg_ms': round(self.total / self.count, 3) if self.count else 0.0,
+            'max_ms': round(self.max, 3),
+            'p50_ms': round(percentile(recent, 50), 3),
+            'p95_ms': round(percentile(recent, 95), 3),
+            'histogram': dict(zip([f"<={b}" for b in HISTOGRAM_BOUNDS] + ['>'], self.histogram)),
+            'callers': dict(sorted(self.callers.items(), key=lambda item: -item[1])),
+            'params': sorted(self.shapes),
+            'sql': self.sql,
+            'sample_params': list(self.sample_params)
+        }
+
+class QueryProfiler:
+    """Профилировщик запросов к БД
+    
+    Соединения из Database.get_connection оборачиваются прокси, которые
+    замеряют каждый запрос вместе с выборкой строк. Для каждого отпечатка
+    хранятся счетчики, гистограмма и скользящее окно последних длительностей
+    (для p50/p95). Запросы дольше threshold_ms попадают в журнал медленных
+    запросов вместе с планом выполнения.
+    """
+    
+    def __init__(self, threshold_ms=100, window=500, slow_log_size=200,
+                 log_path='logs/slow_queries.log', dialect='sqlite'):
+        self.threshold_ms = threshold_ms
+        self.window = window
+        self.log_path = log_path
+        self.dialect = dialect
+        self.enabled = True
+        self.slow_log = deque(maxlen=slow_log_size)
+        # Подписчики на каждый запрос: listener(sql, params, duration, many)
+        self.listeners = []
+        self._stats = {}
+        self._lock = threading.Lock()
+    
+    def wrap(self, conn):
+        """Обернуть соединение (без изменений, если профилирование выключено)"""
+        return ProfiledConnection(conn, self) if self.enabled else conn
+    
+    def record(self, conn, sql, params, rows, duration, caller, many=False):
+        """Учесть выполненный запрос (duration в секундах)"""
+        duration_ms = duration * 1000
+        key = fingerprint(sql)
+        shape = f"{len(params)}x" if many else params_shape(params)
+        
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = QueryStats(key, self.window)
+            stats.add(duration_ms, rows, caller, shape, None if many else sql, () if many else params)
+        
+        if duration_ms >= self.threshold_ms:
+            self._log_slow(conn, sql, params, rows, duration_ms, caller, many)
+        
+        for listener in self.listeners:
+            listener(sql, params, duration, many)
+    
+    def _log_slow(self, conn, sql, params, rows, duration_ms, caller, many):
+        entry = {
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'duration_ms': round(duration_ms, 3),
+            'rows': rows,
+            'caller': caller,
+            'fingerprint': fingerprint(sql),
+            'params': f"{len(params)}x" if many else repr(tuple(params) if params else ())[:200],
+            'plan': [] if many else self.explain(conn, sql, params)
+        }
+        
+        with self._lock:
+            self.slow_log.append(entry)
+        
+        try:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(f"{entry['time']} - {entry['duration_ms']:.1f} ms - {caller} - "
+                        f"{entry['fingerprint']}\n")
+                for line in entry['plan']:
+                    f.write(f"    {line}\n")
+        except OSError:
+            pass
+    
+    def explain(self, conn, sql, params=()):
+        """План выполнения запроса (список строк)"""
+        if not sql.lstrip().upper().startswith(EXPLAINABLE):
+            return []
+        
+        try:
+            rows = conn.execute(EXPLAIN_PREFIXES[self.dialect] + sql, params or ()).fetchall()
+        except Exception as e:
+            return [f"план недоступен: {e}"]
+        
+        return [str(row[-1]) for row in rows]
+    
+    def snapshot(self, sort_by='total_ms'):
+        """Статистика по отпечаткам, по убыванию sort_by"""
+        with self._lock:
+            stats = [s.to_dict() for s in self._stats.values()]
+        return sorted(stats, key=lambda s: -s[sort_by])
+    
+    def slow_queries(self):
+        """Журнал медленных запросов (новые первыми)"""
+        with self._lock:
+            return list(reversed(self.slow_log))
+    
+    def reset(self):
+        """Очистка статистики и журнала"""
+        with self._lock:
+            self._stats = {}
+            self.slow_log.clear()
+    
+    def dump_json(self, filepath):
+        """Сохранение статистики и журнала медленных запросов в JSON"""
+        data = {
+            'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'threshold_ms': self.threshold_ms,
+            'histogram_bounds_ms': list(HISTOGRAM_BOUNDS),
+            'queries': self.snapshot(),
+            'slow_queries': self.slow_queries()
+        }
+        
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+        
+        return filepath
+
+class ProfiledCursor:
+    """Курсор, замеряющий execute и выборку строк
+    
+    Время запроса включает выборку: замер завершается при чтении всех
+    строк, следующем execute или закрытии курсора.
+    """
+    
+    def __init__(self, cursor, connection):
+        self._cursor = cursor
+        self._connection = connection
+        self._pending = None
+    
+    def _start(self, sql, params, many):
+        self._finish()
+        self._pending = [sql, params, 0, 0.0, find_caller(), many]
+    
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending:
+            sql, params, rows, duration, caller, many = pending
+            if many or rows == 0:
+                rows = max(rows, self._cursor.rowcount)
+            self._connection._profiler.record(self._connection._conn, sql, params, rows,
+                                              duration, caller, many)
+    
+    def _timed(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        except Exception:
+            # Ошибочный запрос в статистику не попадает
+            self._pending = None
+            raise
+        finally:
+            if self._pending:
+                self._pending[3] += time.perf_counter() - started
+    
+    def execute(self, sql, params=()):
+        self._start(sql, params, False)
+        self._timed(self._cursor.execute, sql, params)
+        if self._cursor.description is None:
+            self._finish()
+        return self
+    
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        self._start(sql, seq_of_params, True)
+        self._timed(self._cursor.executemany, sql, seq_of_params)
+        self._finish()
+        return self
+    
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is None:
+            self._finish()
+        elif self._pending:
+            self._pending[2] += 1
+        return row
+    
+    def fetchmany(self, size=None):
+        rows = self._timed(self._cursor.fetchmany, *(() if size is None else (size,)))
+        if self._pending:
+            self._pending[2] += len(rows)
+            if not rows:
+                self._finish()
+        return rows
+    
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        if self._pending:
+            self._pending[2] += len(rows)
+        self._finish()
+        return rows
+    
+    def __iter__(self):
+        # Строки читаются пакетами, как при итерации исходного курсора;
+        # замер завершается на пустом пакете (в fetchmany)
+        while True:
+            rows = self.fetchmany(ITER_BATCH_SIZE)
+            if not rows:
+                return
+            yield from rows
+    
+    def close(self):
+        self._finish()
+        self._cursor.close()
+    
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+    
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+class ProfiledConnection:
+    """Соединение, выдающее профилируемые курсоры"""
+    
+    def __init__(self, conn, profiler):
+        object.__setattr__(self, '_conn', conn)
+        object.__setattr__(self, '_profiler', profiler)
+    
+    def cursor(self):
+        return ProfiledCursor(self._conn.cursor(), self)
+    
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+    
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+    
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+    
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._conn.__exit__(exc_type, exc_value, traceback)
\ No newline at end of file
@@ -0,0 +1,146 @@
+import json
+
+def percentile(values, p):
+    """Точный перцентиль p (0-100) списка значений (ближайший ранг)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+class QuantileSketch:
+    """Потоковый скетч квантилей (упрощенный merging t-digest)
+    
+    Хранит отсортированный список центроидов (среднее, вес). Размер
+    центроида ограничен величиной 4 * N * q * (1 - q) / compression, поэтому
+    хвосты распределения (p90/p99) хранятся точнее середины. Скетчи
+    можно объединять, что позволяет считать перцентили за любой период
+    слиянием дневных скетчей без полного сканирования заявок.
+    """
+    
+    def __init__(self, compression=100):
+        self.compression = compression
+        self.centroids = []
+        self.count = 0
+        self.min = None
+        self.max = None
+        self._buffer = []
+    
+    def add(self, value, weight=1):
+        """Добавить значение"""
+        value = float(value)
+        self._buffer.append((value, weight))
+        self.count += weight
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        
+        if len(self._buffer) >= self.compression * 5:
+            self._compress()
+    
+    def merge(self, other):
+        """Объединить с другим скетчем"""
+        if not other.count:
+            return self
+        
+        self._buffer.extend(other.centroids)
+        self._buffer.extend(other._buffer)
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._compress()
+        return self
+    
+    def _compress(self):
+        """Слияние буфера с центроидами"""
+        if not self._buffer:
+            return
+        
+        points = sorted(self.centroids + self._buffer)
+        self._buffer = []
+        
+        total = sum(weight for _, weight in points)
+        merged = []
+        cumulative = 0
+        mean, weight = points[0]
+        
+        for next_mean, next_weight in points[1:]:
+            q_left = cumulative / total
+            q_right = (cumulative + weight + next_weight) / total
+            limit = 4 * total * min(q_left * (1 - q_left), q_right * (1 - q_right)) / self.compression
+            
+            if weight + next_weight <= max(1, limit):
+                mean = (mean * weight + next_mean * next_weight) / (weight + next_weight)
+                weight += next_weight
+            else:
+                merged.append((mean, weight))
+                cumulative += weight
+                mean, weight = next_mean, next_weight
+        
+        merged.append((mean, weight))
+        self.centroids = merged
+    
+    def quantile(self, q):
+        """Оценка квантиля q (0..1)"""
+        self._compress()
+        
+        if not self.centroids:
+            return None
+        
+        if len(self.centroids) == 1 or q <= 0:
+            return self.min if q <= 0 else self.centroids[0][0]
+        
+        if q >= 1:
+            return self.max
+        
+        target = q * self.count
+        cumulative = 0
+        prev_mean, prev_center = self.min, 0
+        
+        for mean, weight in self.centroids:
+            center = cumulative + weight / 2
+            
+            if target < center:
+                if center == prev_center:
+                    return mean
+                ratio = (target - prev_center) / (center - prev_center)
+                return prev_mean + (mean - prev_mean) * ratio
+            
+            cumulative += weight
+            prev_mean, prev_center = mean, center
+        
+        # Между центром последнего центроида и максимумом
+        if self.count == prev_center:
+            return self.max
+        ratio = (target - prev_center) / (self.count - prev_center)
+        return prev_mean + (self.max - prev_mean) * ratio
+    
+    def percentiles(self, percentiles=(50, 90, 99)):
+        """Перцентили в виде словаря {p: значение}"""
+        return {p: self.quantile(p / 100) for p in percentiles}
+    
+    def to_json(self):
+        """Сериализация в JSON"""
+        self._compress()
+        return json.dumps({
+            'c': self.compression,
+            'n': self.count,
+            'min': self.min,
+            'max': self.max,
+            'm': [[round(mean, 4), weight] for mean, weight in self.centroids]
+        })
+    
+    @classmethod
+    def from_json(cls, data):
+        """Десериализация из JSON"""
+        payload = json.loads(data)
+        sketch = cls(payload.get('c', 100))
+        sketch.count = payload['n']
+        sketch.min = payload['min']
+        sketch.max = payload['max']
+        sketch.centroids = [(mean, weight) for mean, weight in payload['m']]
+        return sketch
+    
+    def __len__(self):
+        return self.count
+    
+    def __repr__(self):
+        return f"QuantileSketch(count={self.count}, centroids={len(self.centroids)})"
\ No newline at end of file
@@ -0,0 +1,177 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+
+READY_STATUS = 'Готова к выдаче'
+
+logger = logging.getLogger(__name__)
+
+class SLAMonitor:
+    """Фоновый контроль сроков заявок
+    
+    Раз в interval секунд проверяет только заявки, пересекшие порог с
+    прошлой проверки: диапазон dueDate между прежним и новым горизонтом
+    (по частичному индексу idx_requests_open_due), а также заявки, созданные
+    или измененные после последней проверки (перенос срока, смена
+    приоритета, возврат в работу; по индексу idx_requests_updated).
+    Повторные оповещения отсекаются таблицей sla_alerts, уведомления
+    пишутся одним пакетом.
+    """
+    
+    # Вид оповещения: (нижняя граница, горизонт) в днях от сегодня, тип, текст
+    ALERTS = {
+        'due_soon': (0, 1, 'warning', "Срок заявки #{requestID} истекает {dueDate}"),
+        'overdue': (None, -1, 'error', "Заявка #{requestID} просрочена (срок {dueDate})")
+    }
+    
+    def __init__(self, db, interval=60):
+        self.db = db
+        self.interval = interval
+        self._horizons = {}
+        self._last_request_id = None
+        self._last_scan = None
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """Запуск фонового потока"""
+        if self._thread and self._thread.is_alive():
+            return
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='SLAMonitor', daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout=None):
+        """Остановка фонового потока"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.tick()
+            except Exception:
+                # Ошибка одной проверки (в том числе драйвера PostgreSQL) не останавливает поток
+                logger.exception("Ошибка контроля сроков")
+            self._stop_event.wait(self.interval)
+    
+    def tick(self, today=None):
+        """Одна проверка; возвращает количество созданных уведомлений"""
+        today = today or datetime.now().date()
+        horizons = {}
+        ranges = {}
+        
+        for kind, (floor, horizon, _, _) in self.ALERTS.items():
+            horizons[kind] = (today + timedelta(days=horizon)).isoformat()
+            
+            # Нижняя граница (исключая): прежний горизонт или начало окна
+            lower = self._horizons.get(kind)
+            if floor is not None:
+                floor_date = (today + timedelta(days=floor - 1)).isoformat()
+                lower = max(lower, floor_date) if lower else floor_date
+            ranges[kind] = (lower, horizons[kind])
+        
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Время БД (UTC, как updated_at) до чтения: изменения во время
+            # проверки попадут в следующую
+            cursor.execute("SELECT datetime('now')")
+            scan_started = cursor.fetchone()[0]
+            
+            candidates = []
+            for kind, (lower, upper) in ranges.items():
+                candidates.extend((kind, row) for row in self._due_between(cursor, lower, upper))
+            
+            # Новые и измененные заявки могли сразу попасть за горизонт
+            if self._last_request_id is not None:
+                for row in self._changed_since(cursor, self._last_request_id, self._last_scan):
+                    for kind, (lower, upper) in ranges.items():
+                        floor = self.ALERTS[kind][0]
+                        in_window = floor is None or row['dueDate'] >= (today + timedelta(days=floor)).isoformat()
+                        if row['dueDate'] <= upper and in_window:
+                            candidates.append((kind, row))
+            
+            cursor.execute("SELECT MAX(requestID) FROM requests")
+            last_request_id = cursor.fetchone()[0] or 0
+            
+            notifications = self._register_alerts(cursor, candidates)
+            self.db.add_notifications(notifications, cursor)
+            conn.commit()
+        
+        self._horizons = horizons
+        self._last_request_id = last_request_id
+        self._last_scan = scan_started
+        return len(notifications)
+    
+    def _due_between(self, cursor, lower, upper):
+        """Открытые заявки со сроком в (lower, upper]"""
+        query = '''
+            SELECT requestID, dueDate, masterID FROM requests
+            WHERE requestStatus != 'Готова к выдаче'
+            AND dueDate <= ?
+        '''
+        params = [upper]
+        
+        if lower:
+            if lower >= upper:
+                return []
+            query += " AND dueDate > ?"
+            params.append(lower)
+        
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    
+    def _changed_since(self, cursor, request_id, scanned_at):
+        """Открытые заявки, созданные после указанной или измененные с момента scanned_at
+        
+        updated_at хранится с точностью до секунды, поэтому граница
+        включается: повторно прочитанные строки отсекает sla_alerts.
+        """
+        cursor.execute('''
+            SELECT requestID, dueDate, masterID FROM requests
+            WHERE requestID > ?
+            AND requestStatus != 'Готова к выдаче'
+            AND dueDate IS NOT NULL
+            UNION
+            SELECT requestID, dueDate, masterID FROM requests
+            WHERE updated_at >= ?
+            AND requestStatus != 'Готова к выдаче'
+            AND dueDate IS NOT NULL
+        ''', (request_id, scanned_at))
+        return cursor.fetchall()
+    
+    def _register_alerts(self, cursor, candidates):
+        """Отметить оповещения как отправленные и сформировать уведомления"""
+        if not candidates:
+            return []
+        
+        cursor.execute('''
+            SELECT userID FROM users
+            WHERE type = 'Менеджер качества' AND is_active = 1
+        ''')
+        quality_managers = [row[0] for row in cursor.fetchall()]
+        
+        notifications = []
+        for kind, row in candidates:
+            cursor.execute('''
+                INSERT OR IGNORE INTO sla_alerts (requestID, kind, dueDate)
+                VALUES (?, ?, ?)
+            ''', (row['requestID'], kind, row['dueDate']))
+            
+            if cursor.rowcount == 0:
+                continue
+            
+            _, _, notification_type, template = self.ALERTS[kind]
+            message = template.format(requestID=row['requestID'], dueDate=row['dueDate'])
+            
+            recipients = list(quality_managers)
+            if row['masterID'] and row['masterID'] not in recipients:
+                recipients.append(row['masterID'])
+            
+            notifications.extend((user_id, message, notification_type) for user_id in recipients)
+        
+        return notifications
\ No newline at end of file
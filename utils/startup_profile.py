@@ -0,0 +1,155 @@
+"""Профиль импорта и замер запуска приложения
+
+python -m utils.startup_profile [--db repair_service.db] [--repeat 5] [--json файл]
+
+Каждый замер выполняется в новом процессе интерпретатора: время импорта
+main (python -X importtime), открытие БД с актуальной схемой и с нуля,
+отрисовка окна входа (если есть дисплей). Отдельно проверяется, что
+тяжелые библиотеки не загружаются до входа пользователя.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Библиотеки, которые должны загружаться только при первом использовании
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'PIL', 'qrcode', 'psycopg2', 'aiohttp')
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+# Запуск в отдельном процессе: импорт, открытие БД, окно входа
+STARTUP_SCRIPT = '''
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from database import Database
+from auth import AuthSystem
+db = Database(sys.argv[1], concurrent=True)
+auth = AuthSystem(db)
+opened = time.perf_counter()
+db.close()
+window_ms = None
+try:
+    import tkinter as tk
+    from forms.login_form import LoginForm
+    shown = time.perf_counter()
+    root = tk.Tk()
+    LoginForm(root, lambda user: None, auth)
+    root.update()
+    window_ms = (time.perf_counter() - shown) * 1000
+    root.destroy()
+except tk.TclError:
+    pass
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'db_open_ms': (opened - imported) * 1000,
+    'window_ms': window_ms,
+    'heavy_modules': sorted(m for m in sys.modules if m.split('.')[0] in %r and '.' not in m)
+}))
+''' % (HEAVY_MODULES,)
+
+def _run(args, cwd):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    return subprocess.run([sys.executable] + args, cwd=cwd, env=env,
+                          capture_output=True, text=True, encoding='utf-8', check=True)
+
+def _measure(db_path, cwd):
+    # Результат - последняя строка вывода (перед ней могут быть сообщения приложения)
+    return json.loads(_run(['-c', STARTUP_SCRIPT, db_path], cwd).stdout.splitlines()[-1])
+
+def import_profile(module='main', top=15, cwd=None):
+    """Профиль импорта модуля: общее время и самые долгие модули (мс)"""
+    result = _run(['-X', 'importtime', '-c', f'import {module}'], cwd or ROOT)
+    
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            entries.append({
+                'module': match.group(4),
+                'self_ms': int(match.group(1)) / 1000,
+                'cumulative_ms': int(match.group(2)) / 1000,
+                'depth': len(match.group(3)) // 2
+            })
+    
+    total = next((e['cumulative_ms'] for e in entries if e['module'] == module), 0.0)
+    return {
+        'module': module,
+        'total_ms': round(total, 3),
+        'top': sorted(entries, key=lambda e: -e['cumulative_ms'])[:top],
+        'heavy_modules': sorted({e['module'] for e in entries if e['module'] in HEAVY_MODULES})
+    }
+
+def startup_benchmark(db_path, repeat=5, cwd=None):
+    """Замер запуска: медианы по repeat новым процессам, первый запуск на пустой БД"""
+    cwd = cwd or ROOT
+    db_path = os.path.abspath(db_path)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        cold = _measure(os.path.join(tmp, 'cold.db'), cwd)
+    
+    # Первый запуск приводит схему к актуальной версии, дальше замеряется обычный старт
+    _measure(db_path, cwd)
+    runs = [_measure(db_path, cwd) for _ in range(repeat)]
+    
+    def median(key):
+        values = [run[key] for run in runs if run[key] is not None]
+        return round(statistics.median(values), 3) if values else None
+    
+    return {
+        'db': db_path,
+        'repeat': repeat,
+        'import_ms': median('import_ms'),
+        'db_open_ms': median('db_open_ms'),
+        'window_ms': median('window_ms'),
+        'total_ms': round(median('import_ms') + median('db_open_ms'), 3),
+        'cold_db_open_ms': round(cold['db_open_ms'], 3),
+        'heavy_modules': runs[-1]['heavy_modules']
+    }
+
+def format_report(profile, benchmark):
+    """Текстовый отчет"""
+    lines = [f"Импорт {profile['module']}: {profile['total_ms']:.1f} мс"]
+    for entry in profile['top']:
+        lines.append(f"  {entry['cumulative_ms']:8.1f} мс  {'  ' * entry['depth']}{entry['module']}")
+    
+    window = f"{benchmark['window_ms']:.1f} мс" if benchmark['window_ms'] is not None else "нет дисплея"
+    lines += [
+        '',
+        f"Запуск (медиана из {benchmark['repeat']}, {benchmark['db']}):",
+        f"  импорт модулей:          {benchmark['import_ms']:.1f} мс",
+        f"  открытие БД:             {benchmark['db_open_ms']:.1f} мс",
+        f"  открытие пустой БД:      {benchmark['cold_db_open_ms']:.1f} мс",
+        f"  отрисовка окна входа:    {window}",
+        f"  тяжелые модули до входа: {', '.join(benchmark['heavy_modules']) or 'нет'}"
+    ]
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Профиль импорта и замер запуска приложения")
+    parser.add_argument('--db', default='repair_service.db', help="файл базы данных")
+    parser.add_argument('--repeat', type=int, default=5, help="число запусков для медианы")
+    parser.add_argument('--top', type=int, default=15, help="число модулей в профиле импорта")
+    parser.add_argument('--json', help="сохранить результат в JSON")
+    args = parser.parse_args(argv)
+    
+    profile = import_profile('main', args.top, os.getcwd())
+    benchmark = startup_benchmark(args.db, args.repeat, os.getcwd())
+    print(format_report(profile, benchmark))
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'import_profile': profile, 'startup': benchmark}, f, ensure_ascii=False, indent=2)
+    
+    # Ненулевой код возврата, если тяжелые библиотеки загружаются при запуске
+    return 1 if benchmark['heavy_modules'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,375 @@
+"""Запись и воспроизведение нагрузки на БД
+
+Запись: REPAIR_TRACE=logs/shift.trace.gz python main.py
+Воспроизведение: python -m utils.workload_trace replay logs/shift.trace.gz --db copy.db --clients 10 --speed 0
+"""
+import argparse
+import gzip
+import hashlib
+import inspect
+import json
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from .query_profiler import fingerprint
+from .sketches import percentile
+
+TRACE_VERSION = 1
+
+# Методы Database, которые не записываются: служебные, без обращения к БД или с потоковым результатом
+EXCLUDED_METHODS = {'get_connection', 'release_connection', 'close', 'init_database', 'migrate',
+                    'create_demo_data', 'bulk_insert', 'stream_query', 'get_lock_metrics'}
+
+# Потоки, запросы которых относятся к записанным вызовам других потоков
+INTERNAL_THREADS = {'WriteQueue'}
+
+# Колонки с персональными данными и паролями (в нижнем регистре): их
+# параметры в запросах записываются хэшами
+PII_COLUMNS = {'fio', 'phone', 'login', 'password', 'message', 'notes', 'problemdescription'}
+
+# Аргументы методов Database с персональными данными
+PII_ARGUMENTS = {'search_term', 'message', 'notifications'}
+
+# Параметр запроса и колонка, с которой он сравнивается или в которую записывается
+COLUMN_PARAMETER = re.compile(r'(?:\w+\.)?(\w+)\s*(?:=|!=|<>|<=|>=|<|>|\bLIKE\b)\s*\?$', re.IGNORECASE)
+INSERT_COLUMNS = re.compile(r'^\s*INSERT\s+(?:OR\s+\w+\s+)?INTO\s+\w+\s*\(([^)]*)\)\s*VALUES\s*\(', re.IGNORECASE)
+
+def traced_methods(db):
+    """Имена открытых методов Database, вызовы которых записываются"""
+    return sorted(name for name, member in inspect.getmembers(type(db), inspect.isfunction)
+                  if not name.startswith('_') and name not in EXCLUDED_METHODS)
+
+def parameter_columns(sql):
+    """Колонка (в нижнем регистре) для каждого параметра ? запроса или None"""
+    parts = re.split(r"('(?:[^']|'')*')", sql)
+    code = ''.join("''" if i % 2 else part for i, part in enumerate(parts))
+    
+    insert = INSERT_COLUMNS.match(code)
+    values_at = insert.end() if insert else -1
+    insert_columns = [c.strip().lower() for c in insert.group(1).split(',')] if insert else []
+    
+    columns = []
+    for match in re.finditer(r'\?', code):
+        if insert and match.start() >= values_at and len(columns) < len(insert_columns):
+            columns.append(insert_columns[len(columns)])
+            continue
+        column = COLUMN_PARAMETER.search(code[:match.end()])
+        columns.append(column.group(1).lower() if column else None)
+    return columns
+
+def event_key(event):
+    """Ключ группировки события: метод Database или отпечаток SQL-запроса"""
+    return event.get('f') or event['op']
+
+class TraceRecorder:
+    """Запись вызовов методов Database и прямых SQL-запросов в сжатый файл
+    
+    Вызовы методов перехватываются на экземпляре db; вложенные вызовы и
+    запросы внутри них не записываются. Запросы, выполненные напрямую через
+    get_connection (формы, фоновые службы), приходят от профилировщика
+    запросов (db.profiler должен быть включен). Каждое событие - строка
+    JSON: смещение от начала записи (с), номер сессии (потока), операция,
+    аргументы и длительность (мс); у запросов - еще отпечаток (fingerprint).
+    
+    Персональные данные и пароли (строковые параметры колонок PII_COLUMNS,
+    аргументы PII_ARGUMENTS и все строки запросов к таблице users) заменяются
+    хэшами со случайной солью записи: одинаковые значения дают одинаковый
+    хэш, исходные значения из записи не восстанавливаются.
+    """
+    
+    def __init__(self, db, path):
+        self.db = db
+        self.path = path
+        self._salt = secrets.token_bytes(16)
+        self._signatures = {}
+        self._file = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._sessions = {}
+        self._started = None
+        self.events = 0
+    
+    def start(self):
+        self._file = gzip.open(self.path, 'wt', encoding='utf-8')
+        self._started = time.perf_counter()
+        self._write({'version': TRACE_VERSION, 'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                     'db': self.db.db_name, 'dialect': self.db.dialect})
+        
+        for name in traced_methods(self.db):
+            setattr(self.db, name, self._wrap(name, getattr(self.db, name)))
+        self.db.profiler.listeners.append(self._on_query)
+        return self
+    
+    def stop(self):
+        """Снять перехват и закрыть файл; возвращает число событий"""
+        if self._file is None:
+            return self.events
+        
+        for name in traced_methods(self.db):
+            self.db.__dict__.pop(name, None)
+        if self._on_query in self.db.profiler.listeners:
+            self.db.profiler.listeners.remove(self._on_query)
+        
+        with self._lock:
+            self._file.close()
+            self._file = None
+        return self.events
+    
+    def _write(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str)
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + '\n')
+    
+    def _session(self):
+        name = threading.current_thread().name
+        with self._lock:
+            return self._sessions.setdefault(name, len(self._sessions))
+    
+    def _event(self, op, started, duration, error=None, **fields):
+        record = {'t': round(started - self._started, 4), 's': self._session(), 'op': op,
+                  'd': round(duration * 1000, 3), **fields}
+        if error is not None:
+            record['e'] = type(error).__name__
+        self._write(record)
+        self.events += 1
+    
+    def _scrub(self, value):
+        """Хэш строки (рекурсивно для списков); остальные значения без изменений"""
+        if isinstance(value, str):
+            return '~' + hashlib.sha256(self._salt + value.encode('utf-8')).hexdigest()[:12]
+        if isinstance(value, (list, tuple)):
+            return [self._scrub(item) for item in value]
+        return value
+    
+    def _scrub_arguments(self, name, method, args, kwargs):
+        signature = self._signatures.get(name)
+        if signature is None:
+            signature = self._signatures[name] = inspect.signature(method)
+        try:
+            bound = signature.bind(*args, **kwargs)
+        except TypeError:
+            return list(args), kwargs
+        
+        args = [self._scrub(value) if param in PII_ARGUMENTS else value
+                for param, value in zip(signature.parameters, bound.args)]
+        kwargs = {param: self._scrub(value) if param in PII_ARGUMENTS else value
+                  for param, value in bound.kwargs.items()}
+        return args, kwargs
+    
+    def _scrub_params(self, sql, params):
+        params = list(params or ())
+        if not any(isinstance(value, str) for value in params):
+            return params
+        
+        users = re.search(r'\busers\b', sql, re.IGNORECASE) is not None
+        columns = parameter_columns(sql)
+        columns += [None] * (len(params) - len(columns))
+        # В запросах к users неизвестная колонка считается персональной (кроме роли type)
+        return [self._scrub(value) if column in PII_COLUMNS or (users and column != 'type') else value
+                for value, column in zip(params, columns)]
+    
+    def _wrap(self, name, method):
+        def traced(*args, **kwargs):
+            depth = getattr(self._local, 'depth', 0)
+            self._local.depth = depth + 1
+            started = time.perf_counter()
+            error = None
+            try:
+                return method(*args, **kwargs)
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                self._local.depth = depth
+                if depth == 0:
+                    duration = time.perf_counter() - started
+                    scrubbed_args, scrubbed_kwargs = self._scrub_arguments(name, method, args, kwargs)
+                    self._event(name, started, duration, error, a=scrubbed_args, k=scrubbed_kwargs)
+        return traced
+    
+    def _on_query(self, sql, params, duration, many):
+        # Пакетные вставки (executemany) не воспроизводятся
+        if many or getattr(self._local, 'depth', 0) or threading.current_thread().name in INTERNAL_THREADS:
+            return
+        # Профилировщик сообщает о запросе после выборки строк
+        self._event('sql', time.perf_counter() - duration, duration, q=sql, f=fingerprint(sql),
+                    p=self._scrub_params(sql, params))
+
+def load_trace(path):
+    """Заголовок и события записи"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        events = [json.loads(line) for line in f if line.strip()]
+    return header, events
+
+class TraceReplayer:
+    """Воспроизведение записи на другой БД или сборке
+    
+    Каждый из clients клиентов повторяет все сессии записи, каждая сессия -
+    в своем потоке, с исходными интервалами между событиями, деленными на
+    speed (speed = 0 - без пауз). Запросы, изменяющие данные, тоже
+    выполняются: воспроизводить запись следует на копии БД.
+    """
+    
+    def __init__(self, db, events, clients=1, speed=1.0):
+        self.db = db
+        self.events = events
+        self.clients = clients
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(list)
+        self._errors = defaultdict(int)
+        self._max_lag = 0.0
+    
+    def _execute(self, event):
+        if event['op'] == 'sql':
+            conn = self.db.get_connection()
+            try:
+                cursor = conn.execute(event['q'], event['p'])
+                if cursor.description is not None:
+                    cursor.fetchall()
+                conn.commit()
+            finally:
+                self.db.release_connection(conn)
+            return
+        getattr(self.db, event['op'])(*event.get('a', ()), **event.get('k', {}))
+    
+    def _run_session(self, events, started):
+        for event in events:
+            if self.speed:
+                delay = started + event['t'] / self.speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                lag = -delay if delay < 0 else 0.0
+            else:
+                lag = 0.0
+            
+            begin = time.perf_counter()
+            error = False
+            try:
+                self._execute(event)
+            except Exception:
+                error = True
+            latency = (time.perf_counter() - begin) * 1000
+            
+            key = event_key(event)
+            with self._lock:
+                self._latencies[key].append(latency)
+                self._max_lag = max(self._max_lag, lag)
+                if error:
+                    self._errors[key] += 1
+    
+    def run(self):
+        """Воспроизвести запись; возвращает отчет"""
+        sessions = defaultdict(list)
+        for event in self.events:
+            sessions[event['s']].append(event)
+        
+        started = time.perf_counter()
+        threads = [threading.Thread(target=self._run_session, args=(session_events, started),
+                                    name=f'replay-{client}-{session}', daemon=True)
+                   for client in range(self.clients)
+                   for session, session_events in sessions.items()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        
+        recorded = defaultdict(list)
+        for event in self.events:
+            recorded[event_key(event)].append(event['d'])
+        
+        operations = {}
+        for op, latencies in sorted(self._latencies.items(), key=lambda item: -sum(item[1])):
+            operations[op] = {
+                'count': len(latencies),
+                'errors': self._errors.get(op, 0),
+                'p50_ms': round(percentile(latencies, 50), 3),
+                'p90_ms': round(percentile(latencies, 90), 3),
+                'p99_ms': round(percentile(latencies, 99), 3),
+                'max_ms': round(max(latencies), 3),
+                'recorded_p50_ms': round(percentile(recorded[op], 50), 3)
+            }
+        
+        total = sum(len(latencies) for latencies in self._latencies.values())
+        return {
+            'clients': self.clients,
+            'speed': self.speed,
+            'sessions': len(sessions),
+            'events': total,
+            'errors': sum(self._errors.values()),
+            'elapsed_s': round(elapsed, 3),
+            'ops_per_s': round(total / elapsed, 1) if elapsed else 0.0,
+            'max_lag_s': round(self._max_lag, 3),
+            'operations': operations
+        }
+
+def _short(key, width=48):
+    return key if len(key) <= width else key[:width - 1] + '…'
+
+def format_report(report):
+    lines = [
+        f"Клиентов: {report['clients']}, сессий в записи: {report['sessions']}, скорость: "
+        f"{report['speed'] or 'без пауз'}",
+        f"Операций: {report['events']} за {report['elapsed_s']:.1f} с ({report['ops_per_s']}/с), "
+        f"ошибок: {report['errors']}, макс. отставание: {report['max_lag_s']:.2f} с",
+        '',
+        f"{'Операция':<48} {'Кол-во':>7} {'Ошибки':>7} {'p50':>9} {'p90':>9} {'p99':>9} {'Макс.':>9} {'p50 зап.':>9}"
+    ]
+    for op, stats in report['operations'].items():
+        lines.append(f"{_short(op):<48} {stats['count']:>7} {stats['errors']:>7} {stats['p50_ms']:>9.2f} "
+                     f"{stats['p90_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['max_ms']:>9.1f} "
+                     f"{stats['recorded_p50_ms']:>9.2f}")
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Запись и воспроизведение нагрузки на БД")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    show = commands.add_parser('show', help="сводка по записи")
+    show.add_argument('trace', help="файл записи (.trace.gz)")
+    
+    replay = commands.add_parser('replay', help="воспроизвести запись")
+    replay.add_argument('trace', help="файл записи (.trace.gz)")
+    replay.add_argument('--db', required=True, help="файл SQLite или postgresql://... (лучше копия)")
+    replay.add_argument('--clients', type=int, default=1, help="число одновременных клиентов")
+    replay.add_argument('--speed', type=float, default=1.0, help="ускорение (0 - без пауз)")
+    replay.add_argument('--json', help="сохранить отчет в JSON")
+    args = parser.parse_args(argv)
+    
+    header, events = load_trace(args.trace)
+    
+    if args.command == 'show':
+        counts = defaultdict(int)
+        for event in events:
+            counts[event_key(event)] += 1
+        duration = events[-1]['t'] if events else 0
+        print(f"Запись {header['created']} ({header['db']}, {header['dialect']}): "
+              f"{len(events)} событий за {duration:.1f} с")
+        for op, count in sorted(counts.items(), key=lambda item: -item[1]):
+            print(f"  {_short(op):<48} {count}")
+        return 0
+    
+    from database import Database
+    
+    db = Database(args.db, concurrent=True)
+    try:
+        report = TraceReplayer(db, events, args.clients, args.speed).run()
+    finally:
+        db.close()
+    
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 1 if report['errors'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
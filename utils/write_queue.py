@@ -0,0 +1,212 @@
+import queue
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+def is_lock_error(error):
+    """Ошибка блокировки БД (database is locked / busy)"""
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+class LockMetrics:
+    """Метрики ожидания блокировок при записи"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Сброс метрик"""
+        with self._lock:
+            self.transactions = 0
+            self.operations = 0
+            self.retries = 0
+            self.failures = 0
+            self.lock_wait_total = 0.0
+            self.lock_wait_max = 0.0
+            self.queue_wait_total = 0.0
+            self.queue_wait_max = 0.0
+    
+    def record_transaction(self, operations, lock_wait, retries):
+        with self._lock:
+            self.transactions += 1
+            self.operations += operations
+            self.retries += retries
+            self.lock_wait_total += lock_wait
+            self.lock_wait_max = max(self.lock_wait_max, lock_wait)
+    
+    def record_failure(self, retries):
+        with self._lock:
+            self.failures += 1
+            self.retries += retries
+    
+    def record_queue_wait(self, seconds):
+        with self._lock:
+            self.queue_wait_total += seconds
+            self.queue_wait_max = max(self.queue_wait_max, seconds)
+    
+    def snapshot(self):
+        """Текущие значения метрик (время в миллисекундах)"""
+        with self._lock:
+            transactions = self.transactions or 1
+            operations = self.operations or 1
+            return {
+                'transactions': self.transactions,
+                'operations': self.operations,
+                'avg_batch': self.operations / transactions,
+                'retries': self.retries,
+                'failures': self.failures,
+                'lock_wait_avg_ms': self.lock_wait_total / transactions * 1000,
+                'lock_wait_max_ms': self.lock_wait_max * 1000,
+                'queue_wait_avg_ms': self.queue_wait_total / operations * 1000,
+                'queue_wait_max_ms': self.queue_wait_max * 1000
+            }
+
+def run_transaction(conn, operations, metrics=None, retries=5, backoff=0.05):
+    """Выполнить операции operation(cursor) одной транзакцией BEGIN IMMEDIATE
+    
+    Каждая операция выполняется в своей точке сохранения: ошибка одной
+    операции не откатывает остальные. При блокировке БД транзакция
+    повторяется с экспоненциальной задержкой. Возвращает список пар
+    (успех, результат или исключение) в порядке операций.
+    """
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    
+    try:
+        return _run_transaction(conn, operations, metrics, retries, backoff)
+    finally:
+        conn.isolation_level = isolation_level
+
+def _run_transaction(conn, operations, metrics, retries, backoff):
+    for attempt in range(retries + 1):
+        started = time.monotonic()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            lock_wait = time.monotonic() - started
+            
+            cursor = conn.cursor()
+            results = []
+            for operation in operations:
+                cursor.execute('SAVEPOINT write_operation')
+                try:
+                    results.append((True, operation(cursor)))
+                except sqlite3.OperationalError as e:
+                    if is_lock_error(e):
+                        raise
+                    cursor.execute('ROLLBACK TO write_operation')
+                    results.append((False, e))
+                except Exception as e:
+                    cursor.execute('ROLLBACK TO write_operation')
+                    results.append((False, e))
+                cursor.execute('RELEASE write_operation')
+            
+            conn.execute('COMMIT')
+        except sqlite3.OperationalError as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            if not is_lock_error(e) or attempt == retries:
+                if metrics:
+                    metrics.record_failure(attempt)
+                raise
+            time.sleep(backoff * (2 ** attempt) * (0.5 + random.random()))
+            continue
+        
+        if metrics:
+            metrics.record_transaction(len(operations), lock_wait, attempt)
+        return results
+
+class WriteQueue:
+    """Очередь записи с единственным писателем
+    
+    Мелкие записи (комментарии, уведомления, смена статусов) из разных
+    потоков собираются в пакеты до max_batch операций или max_delay секунд
+    и фиксируются одной транзакцией на выделенном соединении.
+    """
+    
+    def __init__(self, db, max_batch=50, max_delay=0.02, retries=5, backoff=0.05):
+        self.db = db
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.retries = retries
+        self.backoff = backoff
+        self.metrics = db.lock_metrics
+        self._queue = queue.Queue()
+        self._thread = None
+    
+    def submit(self, operation):
+        """Поставить операцию operation(cursor) в очередь; возвращает Future"""
+        future = Future()
+        self._queue.put((operation, future, time.monotonic()))
+        return future
+    
+    def execute(self, operation):
+        """Выполнить операцию через очередь и дождаться результата"""
+        return self.submit(operation).result()
+    
+    def flush(self):
+        """Дождаться записи всех поставленных ранее операций"""
+        self.execute(lambda cursor: None)
+    
+    def start(self):
+        """Запуск потока-писателя"""
+        if self._thread and self._thread.is_alive():
+            return
+        
+        self._thread = threading.Thread(target=self._run, name='WriteQueue', daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout=None):
+        """Остановка после записи уже поставленных операций"""
+        if self._thread:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def _run(self):
+        conn = self.db.get_connection()
+        stopping = False
+        
+        try:
+            while not stopping:
+                item = self._queue.get()
+                if item is None:
+                    break
+                
+                batch = [item]
+                deadline = time.monotonic() + self.max_delay
+                while len(batch) < self.max_batch:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+                
+                self._apply(conn, batch)
+        finally:
+            self.db.release_connection(conn)
+    
+    def _apply(self, conn, batch):
+        try:
+            results = run_transaction(conn, [operation for operation, _, _ in batch],
+                                      self.metrics, self.retries, self.backoff)
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        
+        finished = time.monotonic()
+        for (_, future, submitted), (ok, value) in zip(batch, results):
+            self.metrics.record_queue_wait(finished - submitted)
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
\ No newline at end of file
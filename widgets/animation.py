@@ -0,0 +1,124 @@
+"""Единый таймер кадров для анимированных виджетов"""
+import time
+
+class FrameClock:
+    """Таймер кадров: один after() на окно вместо таймера у каждого виджета
+    
+    Подписчик - функция frame(dt), вызываемая раз в кадр со временем от
+    прошлого кадра (с); она возвращает False, когда анимация закончена.
+    Кадры идут не чаще fps в секунду; если цикл событий опаздывает,
+    пропущенные кадры не догоняются: следующий кадр получает больший dt
+    (не больше max_dt), а пропуски учитываются в статистике. Анимации
+    скрытых (не отображаемых) виджетов приостанавливаются.
+    """
+    
+    def __init__(self, root, fps=30, max_dt=0.1, idle_interval=0.25):
+        self.root = root
+        self.interval = 1.0 / fps
+        self.max_dt = max_dt
+        self.idle_interval = idle_interval
+        self._subscribers = {}  # виджет -> (frame, время прошлого кадра)
+        self._after_id = None
+        self._due = None
+        self.reset_stats()
+    
+    def reset_stats(self):
+        self.frames = 0
+        self.dropped = 0
+        self.busy_total = 0.0
+        self.busy_max = 0.0
+    
+    def subscribe(self, widget, frame):
+        """Вызывать frame(dt) каждый кадр, пока виджет существует и frame не вернет False"""
+        self._subscribers[widget] = (frame, time.perf_counter())
+        self._schedule(0.0)
+    
+    def unsubscribe(self, widget):
+        self._subscribers.pop(widget, None)
+        if not self._subscribers and self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+    
+    def is_active(self, widget):
+        return widget in self._subscribers
+    
+    def _schedule(self, delay):
+        if self._after_id is not None:
+            return
+        self._due = time.perf_counter() + delay
+        self._after_id = self.root.after(max(1, round(delay * 1000)), self._tick)
+    
+    def _tick(self):
+        self._after_id = None
+        started = time.perf_counter()
+        
+        # Опоздание больше кадра - кадры пропущены
+        late = started - self._due
+        if late > self.interval:
+            self.dropped += int(late / self.interval)
+        
+        visible = 0
+        for widget, (frame, last) in list(self._subscribers.items()):
+            try:
+                if not widget.winfo_exists():
+                    self._subscribers.pop(widget, None)
+                    continue
+                if not widget.winfo_viewable():
+                    # Скрытый виджет ждет; время паузы в dt не попадает
+                    self._subscribers[widget] = (frame, started)
+                    continue
+            except Exception:
+                self._subscribers.pop(widget, None)
+                continue
+            
+            visible += 1
+            self._subscribers[widget] = (frame, started)
+            if frame(min(started - last, self.max_dt)) is False:
+                self._subscribers.pop(widget, None)
+        
+        busy = time.perf_counter() - started
+        self.frames += 1
+        self.busy_total += busy
+        self.busy_max = max(self.busy_max, busy)
+        
+        if self._subscribers:
+            # Только скрытые анимации - проверка видимости реже
+            delay = self.interval - busy if visible else self.idle_interval
+            self._schedule(max(0.0, delay))
+    
+    def stats(self):
+        """Статистика кадров (время в миллисекундах)"""
+        return {
+            'subscribers': len(self._subscribers),
+            'frames': self.frames,
+            'dropped': self.dropped,
+            'busy_avg_ms': self.busy_total / self.frames * 1000 if self.frames else 0.0,
+            'busy_max_ms': self.busy_max * 1000
+        }
+
+def frame_clock(widget, fps=30):
+    """Общий таймер кадров окна виджета"""
+    root = widget._root()
+    clock = getattr(root, '_frame_clock', None)
+    if clock is None:
+        clock = root._frame_clock = FrameClock(root, fps)
+    return clock
+
+class Tween:
+    """Плавный переход значения за duration секунд (ease-out)"""
+    
+    def __init__(self, start, end, duration=0.3):
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.elapsed = 0.0
+    
+    def advance(self, dt):
+        """Сдвинуть время; возвращает текущее значение"""
+        self.elapsed = min(self.duration, self.elapsed + dt)
+        t = self.elapsed / self.duration if self.duration else 1.0
+        return self.start + (self.end - self.start) * (1 - (1 - t) ** 3)
+    
+    @property
+    def done(self):
+        return self.elapsed >= self.duration
\ No newline at end of file
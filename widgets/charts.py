@@ -1,17 +1,149 @@
 import tkinter as tk
 from tkinter import ttk
 from styles import StyleManager
+from .animation import Tween, frame_clock
+import bisect
+import heapq
 import math
+from operator import itemgetter
 
-class PieChart(tk.Canvas):
-    """Круговая диаграмма"""
-    def __init__(self, parent, width=300, height=300, **kwargs):
+class Scene(list):
+    """Кадр диаграммы: элементы (ключ, тип, координаты, параметры)"""
+    
+    def add(self, key, kind, *coords, **options):
+        # Координаты округляются: сдвиги меньше 0.1 пикселя не перерисовываются
+        self.append((key, kind, tuple(round(c, 1) for c in coords), options))
+
+def top_categories(data, n, other_label="Другие"):
+    """Не больше n категорий: n - 1 наибольших по убыванию и сумма остальных
+    
+    Наибольшие выбираются кучей (heapq.nlargest) без полной сортировки.
+    Если категорий не больше n, данные возвращаются без изменений.
+    """
+    if n is None or len(data) <= n:
+        return dict(data)
+    
+    top = dict(heapq.nlargest(n - 1, data.items(), key=itemgetter(1)))
+    top[other_label] = top.get(other_label, 0) + sum(data.values()) - sum(top.values())
+    return top
+
+class SceneCanvas(tk.Canvas):
+    """Холст с инкрементальной перерисовкой
+    
+    Диаграмма описывает кадр (Scene) вместо прямого создания элементов.
+    Элемент холста с тем же ключом и типом переиспользуется: меняются
+    только его координаты и изменившиеся параметры; новые элементы
+    создаются, пропавшие удаляются.
+    
+    При raster=True кадр рисуется в изображение PIL (widgets.raster, с
+    кэшем по хэшу кадра) и показывается одним элементом холста. Кадры
+    анимации рисуются элементами холста: растр строится только для
+    итогового кадра и не вытесняет из кэша изображения других диаграмм.
+    Диаграмма из offscreen() не имеет окна: она только строит кадры для
+    to_image (отчеты, экспорт).
+    """
+    
+    _offscreen = False
+    
+    def __init__(self, parent, raster=False, **kwargs):
+        if not self._offscreen:
+            super().__init__(parent, **kwargs)
+        self.raster = raster
+        self.background = kwargs.get('bg', '#ffffff')
+        self._items = {}  # ключ -> (id, тип, координаты, параметры)
+        self._image_key = None
+        self._photo = None
+    
+    @classmethod
+    def offscreen(cls, **options):
+        """Диаграмма без окна Tk (работает и без дисплея)"""
+        chart = cls.__new__(cls)
+        chart._offscreen = True
+        chart.__init__(None, **options)
+        return chart
+    
+    def bind(self, *args, **kwargs):
+        if not self._offscreen:
+            return super().bind(*args, **kwargs)
+    
+    def _draw(self):
+        if self._offscreen:
+            return
+        scene = self._scene()
+        raster = self.raster and not self._animating()
+        self._render(self._raster_scene(scene) if raster else scene)
+    
+    def _animating(self):
+        """Идет ли анимация (промежуточные кадры не растеризуются)"""
+        return False
+    
+    def _raster_scene(self, scene):
+        from PIL import ImageTk
+        from .raster import image_cache
+        
+        image, key = image_cache.get(scene, self.width, self.height, self.background)
+        if key != self._image_key:
+            self._photo = ImageTk.PhotoImage(image, master=self)
+            self._image_key = key
+        
+        frame = Scene()
+        frame.add('image', 'image', 0, 0, image=self._photo, anchor=tk.NW)
+        return frame
+    
+    def to_image(self):
+        """Изображение PIL текущего кадра"""
+        from .raster import image_cache
+        return image_cache.get(self._scene(), self.width, self.height, self.background)[0]
+    
+    def _scene(self):
+        raise NotImplementedError
+    
+    def _render(self, scene):
+        items = {}
+        created = reordered = False
+        
+        for key, kind, coords, options in scene:
+            old = self._items.pop(key, None)
+            
+            # Параметр, которого нет в новом кадре, не сбросить через itemconfigure
+            if old is not None and (old[1] != kind or old[3].keys() - options.keys()):
+                self.delete(old[0])
+                old = None
+            
+            if old is None:
+                item = getattr(self, f'create_{kind}')(*coords, **options)
+                created = True
+            else:
+                item = old[0]
+                if old[2] != coords:
+                    self.coords(item, *coords)
+                if old[3] != options:
+                    self.itemconfigure(item, **{name: value for name, value in options.items()
+                                                if old[3].get(name) != value})
+                # Новые элементы создаются поверх; порядок кадра нужно восстановить
+                reordered = reordered or created
+            
+            items[key] = (item, kind, coords, options)
+        
+        for old in self._items.values():
+            self.delete(old[0])
+        self._items = items
+        
+        if reordered:
+            for item, *_ in items.values():
+                self.tag_raise(item)
+
+class PieChart(SceneCanvas):
+    """Круговая диаграмма (не больше max_slices сегментов, остальные - в "Другие")"""
+    def __init__(self, parent, width=300, height=300, max_slices=7, **kwargs):
         super().__init__(parent, width=width, height=height,
                         bg=StyleManager.COLORS['white'],
                         highlightthickness=0, **kwargs)
         self.width = width
         self.height = height
+        self.max_slices = max_slices
         self.data = {}
+        self.slices = {}
         self.colors = []
         
         # Цвета по умолчанию
@@ -26,25 +158,29 @@ class PieChart(tk.Canvas):
         ]
     
     def set_data(self, data, colors=None):
-        """Установить данные для диаграммы"""
-        self.data = data
-        self.colors = colors or self.default_colors
+        """Установить данные для диаграммы (те же данные не перерисовываются)"""
+        colors = list(colors or self.default_colors)
+        if self._items and data == self.data and colors == self.colors:
+            return
+        self.data = dict(data)
+        self.slices = top_categories(self.data, self.max_slices)
+        self.colors = colors
         self._draw()
     
-    def _draw(self):
-        self.delete("all")
+    def _scene(self):
+        scene = Scene()
         
         if not self.data:
             # Отображаем сообщение об отсутствии данных
-            self.create_text(self.width//2, self.height//2,
-                           text="Нет данных",
-                           fill=StyleManager.COLORS['gray'],
-                           font=StyleManager.FONTS['body'])
-            return
+            scene.add('empty', 'text', self.width//2, self.height//2,
+                      text="Нет данных",
+                      fill=StyleManager.COLORS['gray'],
+                      font=StyleManager.FONTS['body'])
+            return scene
         
-        total = sum(self.data.values())
+        total = sum(self.slices.values())
         if total == 0:
-            return
+            return scene
         
         center_x = self.width // 2
         center_y = self.height // 2
@@ -54,7 +190,7 @@ class PieChart(tk.Canvas):
         
         # Рисуем сегменты
         segments = []
-        for i, (label, value) in enumerate(self.data.items()):
+        for i, (label, value) in enumerate(self.slices.items()):
             angle = 360 * (value / total)
             
             # Цвет сегмента
@@ -67,11 +203,11 @@ class PieChart(tk.Canvas):
             y2 = center_y + radius
             
             # Рисуем сегмент
-            segment = self.create_arc(x1, y1, x2, y2,
-                                    start=start_angle, extent=angle,
-                                    fill=color, outline=StyleManager.COLORS['white'],
-                                    width=2)
-            segments.append((segment, label, value, color, start_angle, angle))
+            scene.add(('segment', label), 'arc', x1, y1, x2, y2,
+                      start=round(start_angle, 2), extent=round(angle, 2),
+                      fill=color, outline=StyleManager.COLORS['white'],
+                      width=2)
+            segments.append((label, value, color))
             
             start_angle += angle
         
@@ -79,44 +215,60 @@ class PieChart(tk.Canvas):
         legend_x = self.width - 150
         legend_y = 30
         
-        for i, (segment, label, value, color, start_angle, angle) in enumerate(segments):
+        for i, (label, value, color) in enumerate(segments):
             # Квадратик цвета
-            self.create_rectangle(legend_x, legend_y + i*25,
-                                legend_x + 15, legend_y + i*25 + 15,
-                                fill=color, outline=StyleManager.COLORS['gray_dark'])
+            scene.add(('legend_box', label), 'rectangle', legend_x, legend_y + i*25,
+                      legend_x + 15, legend_y + i*25 + 15,
+                      fill=color, outline=StyleManager.COLORS['gray_dark'])
             
             # Процент
             percentage = (value / total) * 100
             
             # Текст
             text = f"{label}: {value} ({percentage:.1f}%)"
-            self.create_text(legend_x + 25, legend_y + i*25 + 7,
-                           text=text,
-                           anchor=tk.W,
-                           fill=StyleManager.COLORS['dark'],
-                           font=StyleManager.FONTS['small'])
+            scene.add(('legend_text', label), 'text', legend_x + 25, legend_y + i*25 + 7,
+                      text=text,
+                      anchor=tk.W,
+                      fill=StyleManager.COLORS['dark'],
+                      font=StyleManager.FONTS['small'])
         
         # Центральный текст (общее количество)
-        self.create_text(center_x, center_y,
-                       text=str(total),
-                       fill=StyleManager.COLORS['dark'],
-                       font=('Segoe UI', 16, 'bold'))
-        
-        self.create_text(center_x, center_y + 20,
-                       text="Всего",
-                       fill=StyleManager.COLORS['gray_dark'],
-                       font=StyleManager.FONTS['small'])
+        scene.add('total', 'text', center_x, center_y,
+                  text=str(total),
+                  fill=StyleManager.COLORS['dark'],
+                  font=('Segoe UI', 16, 'bold'))
+        
+        scene.add('total_label', 'text', center_x, center_y + 20,
+                  text="Всего",
+                  fill=StyleManager.COLORS['gray_dark'],
+                  font=StyleManager.FONTS['small'])
+        
+        return scene
 
-class BarChart(tk.Canvas):
-    """Столбчатая диаграмма"""
-    def __init__(self, parent, width=400, height=300, title="", **kwargs):
+class BarChart(SceneCanvas):
+    """Столбчатая диаграмма
+    
+    top_n ограничивает число столбцов (остальные суммируются в "Другие").
+    Если столбцов больше, чем помещается (max_bars или по ширине),
+    рисуется только видимое окно; колесо мыши прокручивает длинный хвост.
+    Масштаб оси - по всем столбцам, чтобы при прокрутке он не менялся.
+    """
+    
+    # Минимальная ширина столбца при автоматическом выборе окна, пикселей
+    MIN_BAR_WIDTH = 20
+    
+    def __init__(self, parent, width=400, height=300, title="", top_n=None, max_bars=None, **kwargs):
         super().__init__(parent, width=width, height=height,
                         bg=StyleManager.COLORS['white'],
                         highlightthickness=0, **kwargs)
         self.width = width
         self.height = height
         self.title = title
+        self.top_n = top_n
+        self.max_bars = max_bars
         self.data = {}
+        self.bars = []
+        self.offset = 0
         self.colors = []
         
         # Цвета по умолчанию
@@ -127,49 +279,72 @@ class BarChart(tk.Canvas):
             StyleManager.COLORS['danger'],
             StyleManager.COLORS['info']
         ]
+        
+        self.bind('<MouseWheel>', lambda event: self.scroll(-1 if event.delta > 0 else 1))
+        self.bind('<Button-4>', lambda event: self.scroll(-1))
+        self.bind('<Button-5>', lambda event: self.scroll(1))
+    
+    @property
+    def visible_bars(self):
+        """Число столбцов в окне"""
+        if self.max_bars:
+            return self.max_bars
+        return max(1, int((self.width - 120) / (self.MIN_BAR_WIDTH * 1.5)))
     
     def set_data(self, data, colors=None):
-        """Установить данные для диаграммы"""
-        self.data = data
-        self.colors = colors or self.default_colors
+        """Установить данные для диаграммы (те же данные не перерисовываются)"""
+        colors = list(colors or self.default_colors)
+        if self._items and data == self.data and colors == self.colors:
+            return
+        self.data = dict(data)
+        self.bars = list(top_categories(self.data, self.top_n).items())
+        self.offset = max(0, min(self.offset, len(self.bars) - self.visible_bars))
+        self.colors = colors
         self._draw()
     
-    def _draw(self):
-        self.delete("all")
+    def scroll(self, bars):
+        """Сдвиг окна на bars столбцов"""
+        offset = max(0, min(self.offset + bars, len(self.bars) - self.visible_bars))
+        if offset != self.offset:
+            self.offset = offset
+            self._draw()
+    
+    def _scene(self):
+        scene = Scene()
         
         if not self.data:
             # Отображаем сообщение об отсутствии данных
-            self.create_text(self.width//2, self.height//2,
-                           text="Нет данных",
-                           fill=StyleManager.COLORS['gray'],
-                           font=StyleManager.FONTS['body'])
-            return
+            scene.add('empty', 'text', self.width//2, self.height//2,
+                      text="Нет данных",
+                      fill=StyleManager.COLORS['gray'],
+                      font=StyleManager.FONTS['body'])
+            return scene
         
         # Заголовок
         if self.title:
-            self.create_text(self.width//2, 20,
-                           text=self.title,
-                           fill=StyleManager.COLORS['dark'],
-                           font=StyleManager.FONTS['heading'])
+            scene.add('title', 'text', self.width//2, 20,
+                      text=self.title,
+                      fill=StyleManager.COLORS['dark'],
+                      font=StyleManager.FONTS['heading'])
         
         padding = 60
         chart_width = self.width - padding * 2
         chart_height = self.height - padding * 2
         
-        max_value = max(self.data.values()) if self.data else 1
-        bar_width = chart_width / (len(self.data) * 1.5)
+        window = self.bars[self.offset:self.offset + self.visible_bars]
+        max_value = max(value for _, value in self.bars)
+        bar_width = chart_width / (len(window) * 1.5)
         
         x = padding + bar_width / 4
-        color_index = 0
         
         # Оси
-        self.create_line(padding, self.height - padding,
-                        self.width - padding, self.height - padding,
-                        fill=StyleManager.COLORS['gray_dark'], width=2)
+        scene.add('axis_x', 'line', padding, self.height - padding,
+                  self.width - padding, self.height - padding,
+                  fill=StyleManager.COLORS['gray_dark'], width=2)
         
-        self.create_line(padding, padding,
-                        padding, self.height - padding,
-                        fill=StyleManager.COLORS['gray_dark'], width=2)
+        scene.add('axis_y', 'line', padding, padding,
+                  padding, self.height - padding,
+                  fill=StyleManager.COLORS['gray_dark'], width=2)
         
         # Сетка
         grid_lines = 5
@@ -178,19 +353,20 @@ class BarChart(tk.Canvas):
             value = max_value * (1 - i / grid_lines)
             
             # Горизонтальная линия сетки
-            self.create_line(padding, y, self.width - padding, y,
-                           fill=StyleManager.COLORS['light_dark'], 
-                           dash=(2, 2))
+            scene.add(('grid', i), 'line', padding, y, self.width - padding, y,
+                      fill=StyleManager.COLORS['light_dark'],
+                      dash=(2, 2))
             
             # Подпись значения
-            self.create_text(padding - 10, y,
-                           text=f"{value:.0f}",
-                           anchor=tk.E,
-                           fill=StyleManager.COLORS['gray_dark'],
-                           font=StyleManager.FONTS['small'])
-        
-        for label, value in self.data.items():
-            bar_height = (value / max_value) * chart_height
+            scene.add(('grid_label', i), 'text', padding - 10, y,
+                      text=f"{value:.0f}",
+                      anchor=tk.E,
+                      fill=StyleManager.COLORS['gray_dark'],
+                      font=StyleManager.FONTS['small'])
+        
+        # Ключи - позиции в окне: при прокрутке элементы переиспользуются
+        for slot, (label, value) in enumerate(window):
+            bar_height = (value / max_value) * chart_height if max_value else 0
             
             # Рисуем столбец
             x1 = x
@@ -198,52 +374,122 @@ class BarChart(tk.Canvas):
             x2 = x + bar_width
             y2 = self.height - padding
             
-            color = self.colors[color_index % len(self.colors)]
+            # Цвет - по месту в полном списке, а не в окне
+            color = self.colors[(self.offset + slot) % len(self.colors)]
             
             # Основной прямоугольник
-            self.create_rectangle(x1, y1, x2, y2,
-                                fill=color,
-                                outline=StyleManager.COLORS['gray_dark'])
+            scene.add(('bar', slot), 'rectangle', x1, y1, x2, y2,
+                      fill=color,
+                      outline=StyleManager.COLORS['gray_dark'])
             
             # Верхняя грань (для 3D эффекта)
-            self.create_polygon(x1, y1, x2, y1, 
-                              x2+2, y1-2, x1+2, y1-2,
-                              fill=StyleManager.lighten_color(color, 0.3),
-                              outline='')
+            scene.add(('bar_top', slot), 'polygon', x1, y1, x2, y1,
+                      x2+2, y1-2, x1+2, y1-2,
+                      fill=StyleManager.lighten_color(color, 0.3),
+                      outline='')
             
             # Правая грань (для 3D эффекта)
-            self.create_polygon(x2, y1, x2, y2,
-                              x2+2, y2-2, x2+2, y1-2,
-                              fill=StyleManager.darken_color(color, 0.3),
-                              outline='')
+            scene.add(('bar_side', slot), 'polygon', x2, y1, x2, y2,
+                      x2+2, y2-2, x2+2, y1-2,
+                      fill=StyleManager.darken_color(color, 0.3),
+                      outline='')
             
             # Подпись значения
-            self.create_text(x + bar_width/2, y1 - 10,
-                           text=str(value),
-                           fill=StyleManager.COLORS['dark'],
-                           font=StyleManager.FONTS['small_bold'])
+            scene.add(('value', slot), 'text', x + bar_width/2, y1 - 10,
+                      text=str(value),
+                      fill=StyleManager.COLORS['dark'],
+                      font=StyleManager.FONTS['small_bold'])
             
             # Подпись категории
             label_y = self.height - padding + 20
             label_text = label if len(label) <= 15 else label[:12] + "..."
             
-            self.create_text(x + bar_width/2, label_y,
-                           text=label_text,
-                           fill=StyleManager.COLORS['dark'],
-                           font=StyleManager.FONTS['small'])
+            scene.add(('label', slot), 'text', x + bar_width/2, label_y,
+                      text=label_text,
+                      fill=StyleManager.COLORS['dark'],
+                      font=StyleManager.FONTS['small'])
             
             x += bar_width * 1.5
-            color_index += 1
+        
+        # Полоса прокрутки, если столбцы не помещаются
+        if len(window) < len(self.bars):
+            track_y = self.height - padding + 38
+            thumb_start = padding + chart_width * self.offset / len(self.bars)
+            thumb_end = padding + chart_width * (self.offset + len(window)) / len(self.bars)
+            scene.add('scroll_track', 'line', padding, track_y, self.width - padding, track_y,
+                      fill=StyleManager.COLORS['light_dark'], width=4)
+            scene.add('scroll_thumb', 'line', thumb_start, track_y, thumb_end, track_y,
+                      fill=StyleManager.COLORS['gray_dark'], width=4)
+            scene.add('scroll_label', 'text', self.width - padding, track_y + 12,
+                      text=f"{self.offset + 1}–{self.offset + len(window)} из {len(self.bars)}",
+                      anchor=tk.E,
+                      fill=StyleManager.COLORS['gray_dark'],
+                      font=StyleManager.FONTS['small'])
         
         # Подпись оси Y
-        self.create_text(padding//2, padding//2,
-                       text="Количество",
-                       angle=90,
-                       fill=StyleManager.COLORS['dark'],
-                       font=StyleManager.FONTS['small'])
+        scene.add('axis_title', 'text', padding//2, padding//2,
+                  text="Количество",
+                  angle=90,
+                  fill=StyleManager.COLORS['dark'],
+                  font=StyleManager.FONTS['small'])
+        
+        return scene
+
+def lttb(xs, ys, threshold):
+    """Индексы точек ряда, выбранных алгоритмом LTTB (Largest-Triangle-Three-Buckets)
+    
+    Первая и последняя точки сохраняются; из каждой корзины выбирается
+    точка, образующая наибольший треугольник с предыдущей выбранной и
+    средним следующей корзины, поэтому пики и провалы не теряются.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    
+    selected = [0]
+    bucket = (n - 2) / (threshold - 2)
+    a = 0
+    
+    for i in range(threshold - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+        next_end = min(int((i + 2) * bucket) + 1, n)
+        
+        # Среднее следующей корзины (для последней - последняя точка)
+        count = next_end - end
+        avg_x = sum(xs[end:next_end]) / count
+        avg_y = sum(ys[end:next_end]) / count
+        
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        
+        selected.append(best)
+        a = best
+    
+    selected.append(n - 1)
+    return selected
 
-class LineChart(tk.Canvas):
-    """Линейный график"""
+class LineChart(SceneCanvas):
+    """Линейный график
+    
+    Длинный ряд прореживается (LTTB) до ширины области графика: на уровне
+    масштаба L весь ряд сокращается до ширины * 2**L точек один раз, и
+    видимое окно - срез этого уровня. Колесо мыши масштабирует вокруг
+    курсора, перетаскивание сдвигает окно, двойной щелчок показывает весь ряд.
+    """
+    
+    padding = 60
+    
+    # Точки-маркеры рисуются, если на точку приходится не меньше пикселей
+    MARKER_SPACING = 12
+    
+    # Минимальное число точек в окне при увеличении
+    MIN_VIEW = 10
+    
     def __init__(self, parent, width=400, height=300, title="", **kwargs):
         super().__init__(parent, width=width, height=height,
                         bg=StyleManager.COLORS['white'],
@@ -253,108 +499,224 @@ class LineChart(tk.Canvas):
         self.title = title
         self.data = []  # Список кортежей (x, y)
         self.color = StyleManager.COLORS['secondary']
+        self.view = None  # (начало, конец) - индексы видимого окна; None - весь ряд
+        self._xs = []
+        self._ys = []
+        self._levels = {}  # уровень масштаба -> индексы прореженного ряда
+        self._drag_x = None
+        
+        self.bind('<MouseWheel>', self._on_wheel)
+        self.bind('<Button-4>', self._on_wheel)
+        self.bind('<Button-5>', self._on_wheel)
+        self.bind('<ButtonPress-1>', self._on_press)
+        self.bind('<B1-Motion>', self._on_drag)
+        self.bind('<Double-Button-1>', lambda event: self.reset_view())
+    
+    @property
+    def chart_width(self):
+        return self.width - self.padding * 2
     
     def set_data(self, data, color=None):
-        """Установить данные для графика"""
+        """Установить данные для графика (те же данные не перерисовываются)"""
+        data = [tuple(point) for point in data]
+        if self._items and data == self.data and (color or self.color) == self.color:
+            return
         self.data = data
         if color:
             self.color = color
+        
+        # Подписи по X - строки (дни, месяцы): точки идут равномерно
+        if all(isinstance(x, (int, float)) for x, _ in data):
+            self._xs = [x for x, _ in data]
+        else:
+            self._xs = list(range(len(data)))
+        self._ys = [y for _, y in data]
+        self._levels = {}
+        
+        # Увеличенное окно сохраняется, если помещается в новый ряд
+        if self.view is not None and self.view[1] > len(data):
+            self.view = None
         self._draw()
     
-    def _draw(self):
-        self.delete("all")
+    def set_view(self, start, end):
+        """Показать точки с индексами [start, end)"""
+        n = len(self.data)
+        span = min(n, max(self.MIN_VIEW, end - start))
+        start = max(0, min(start, n - span))
+        view = None if span >= n else (start, start + span)
+        if view != self.view:
+            self.view = view
+            self._draw()
+    
+    def reset_view(self):
+        """Показать весь ряд"""
+        self.set_view(0, len(self.data))
+    
+    def zoom(self, factor, anchor=None):
+        """Масштаб окна: factor < 1 - увеличение; anchor - индекс, остающийся на месте"""
+        start, end = self.view or (0, len(self.data))
+        anchor = (start + end) / 2 if anchor is None else anchor
+        span = max(self.MIN_VIEW, round((end - start) * factor))
+        new_start = round(anchor - (anchor - start) * span / (end - start))
+        self.set_view(new_start, new_start + span)
+    
+    def pan(self, points):
+        """Сдвиг окна на points точек (отрицательное - влево)"""
+        if self.view is not None:
+            start, end = self.view
+            self.set_view(start + points, end + points)
+    
+    def _index_at(self, x):
+        start, end = self.view or (0, len(self.data))
+        fraction = min(1.0, max(0.0, (x - self.padding) / self.chart_width))
+        return start + fraction * (end - start)
+    
+    def _on_wheel(self, event):
+        if len(self.data) < 2:
+            return
+        up = event.delta > 0 if event.num not in (4, 5) else event.num == 4
+        self.zoom(0.8 if up else 1.25, self._index_at(event.x))
+    
+    def _on_press(self, event):
+        self._drag_x = event.x
+    
+    def _on_drag(self, event):
+        if self.view is None or self._drag_x is None:
+            return
+        start, end = self.view
+        pixels_per_point = self.chart_width / (end - start)
+        shift = int((self._drag_x - event.x) / pixels_per_point)
+        if shift:
+            self._drag_x -= shift * pixels_per_point
+            self.pan(shift)
+    
+    def _level(self, level):
+        """Индексы ряда, прореженного до ширины * 2**level точек (с кэшем)"""
+        indices = self._levels.get(level)
+        if indices is None:
+            indices = self._levels[level] = lttb(self._xs, self._ys, self.chart_width * 2 ** level)
+        return indices
+    
+    def visible_indices(self):
+        """Индексы точек, которые рисуются в текущем окне"""
+        n = len(self.data)
+        start, end = self.view or (0, n)
+        if n <= self.chart_width:
+            return list(range(start, end))
+        
+        # Уровень, на котором в окно попадает не меньше ширины точек
+        level = max(0, math.ceil(math.log2(n / (end - start))))
+        if self.chart_width * 2 ** level >= n:
+            return list(range(start, end))
+        
+        indices = self._level(level)
+        # Соседние точки за краями окна - чтобы линия доходила до осей
+        first = max(0, bisect.bisect_left(indices, start) - 1)
+        last = bisect.bisect_left(indices, end) + 1
+        return [i for i in indices[first:last] if start <= i < end] or [start, end - 1]
+    
+    def _scene(self):
+        scene = Scene()
         
         if len(self.data) < 2:
             # Отображаем сообщение об отсутствии данных
-            self.create_text(self.width//2, self.height//2,
-                           text="Недостаточно данных",
-                           fill=StyleManager.COLORS['gray'],
-                           font=StyleManager.FONTS['body'])
-            return
+            scene.add('empty', 'text', self.width//2, self.height//2,
+                      text="Недостаточно данных",
+                      fill=StyleManager.COLORS['gray'],
+                      font=StyleManager.FONTS['body'])
+            return scene
         
         # Заголовок
         if self.title:
-            self.create_text(self.width//2, 20,
-                           text=self.title,
-                           fill=StyleManager.COLORS['dark'],
-                           font=StyleManager.FONTS['heading'])
+            scene.add('title', 'text', self.width//2, 20,
+                      text=self.title,
+                      fill=StyleManager.COLORS['dark'],
+                      font=StyleManager.FONTS['heading'])
         
-        padding = 60
-        chart_width = self.width - padding * 2
+        padding = self.padding
+        chart_width = self.chart_width
         chart_height = self.height - padding * 2
         
-        # Находим мин/макс значения
-        x_values = [point[0] for point in self.data]
-        y_values = [point[1] for point in self.data]
+        indices = self.visible_indices()
+        if len(indices) < 2:
+            return scene
         
-        min_x = min(x_values)
-        max_x = max(x_values)
+        # Находим мин/макс значения в окне
+        min_x = self._xs[indices[0]]
+        max_x = self._xs[indices[-1]]
+        y_values = [self._ys[i] for i in indices]
         min_y = min(y_values)
         max_y = max(y_values)
         
         # Масштабируем данные
         scaled_points = []
-        for x, y in self.data:
+        for i in indices:
+            x, y = self._xs[i], self._ys[i]
             scaled_x = padding + ((x - min_x) / (max_x - min_x)) * chart_width if max_x != min_x else padding
             scaled_y = self.height - padding - ((y - min_y) / (max_y - min_y)) * chart_height if max_y != min_y else self.height - padding
             scaled_points.append((scaled_x, scaled_y))
         
         # Оси
-        self.create_line(padding, self.height - padding,
-                        self.width - padding, self.height - padding,
-                        fill=StyleManager.COLORS['gray_dark'], width=2)
-        
-        self.create_line(padding, padding,
-                        padding, self.height - padding,
-                        fill=StyleManager.COLORS['gray_dark'], width=2)
-        
-        # Рисуем линию
-        for i in range(1, len(scaled_points)):
-            x1, y1 = scaled_points[i-1]
-            x2, y2 = scaled_points[i]
-            
-            # Линия
-            self.create_line(x1, y1, x2, y2,
-                           fill=self.color, width=3, smooth=True)
-            
-            # Точки
-            self.create_oval(x1-4, y1-4, x1+4, y1+4,
-                           fill=self.color,
-                           outline=StyleManager.COLORS['white'],
-                           width=2)
-        
-        # Последняя точка
-        if scaled_points:
-            x_last, y_last = scaled_points[-1]
-            self.create_oval(x_last-4, y_last-4, x_last+4, y_last+4,
-                           fill=self.color,
-                           outline=StyleManager.COLORS['white'],
-                           width=2)
+        scene.add('axis_x', 'line', padding, self.height - padding,
+                  self.width - padding, self.height - padding,
+                  fill=StyleManager.COLORS['gray_dark'], width=2)
+        
+        scene.add('axis_y', 'line', padding, padding,
+                  padding, self.height - padding,
+                  fill=StyleManager.COLORS['gray_dark'], width=2)
+        
+        # Линия - один элемент холста на весь ряд
+        few = len(scaled_points) * self.MARKER_SPACING <= chart_width
+        scene.add('series', 'line', *[c for point in scaled_points for c in point],
+                  fill=self.color, width=3 if few else 2, smooth=few)
+        
+        # Точки - только если их немного
+        if few:
+            for slot, (x, y) in enumerate(scaled_points):
+                scene.add(('point', slot), 'oval', x-4, y-4, x+4, y+4,
+                          fill=self.color,
+                          outline=StyleManager.COLORS['white'],
+                          width=2)
         
         # Подписи осей
-        self.create_text(padding//2, padding//2,
-                       text="Значение",
-                       angle=90,
-                       fill=StyleManager.COLORS['dark'],
-                       font=StyleManager.FONTS['small'])
-        
-        # Подписи точек
-        for i, ((x, y), (scaled_x, scaled_y)) in enumerate(zip(self.data, scaled_points)):
-            if i % max(1, len(self.data)//5) == 0:  # Показываем примерно 5 подписей
-                self.create_text(scaled_x, self.height - padding + 15,
-                               text=str(x),
-                               fill=StyleManager.COLORS['dark'],
-                               font=StyleManager.FONTS['small'])
-                
-                self.create_text(padding - 15, scaled_y,
-                               text=str(y),
-                               anchor=tk.E,
-                               fill=StyleManager.COLORS['dark'],
-                               font=StyleManager.FONTS['small'])
+        scene.add('axis_title', 'text', padding//2, padding//2,
+                  text="Значение",
+                  angle=90,
+                  fill=StyleManager.COLORS['dark'],
+                  font=StyleManager.FONTS['small'])
+        
+        # Примерно 5 подписей по каждой оси; элементы подписей переиспользуются при сдвиге
+        labels = 5
+        step = max(1, len(indices) // labels)
+        for slot, position in enumerate(range(0, len(indices), step)):
+            scene.add(('x_label', slot), 'text', scaled_points[position][0], self.height - padding + 15,
+                      text=str(self.data[indices[position]][0]),
+                      fill=StyleManager.COLORS['dark'],
+                      font=StyleManager.FONTS['small'])
+        
+        for slot in range(labels if max_y != min_y else 1):
+            value = min_y + (max_y - min_y) * slot / (labels - 1)
+            scene.add(('y_label', slot), 'text', padding - 15,
+                      self.height - padding - chart_height * slot / (labels - 1),
+                      text=f"{value:.4g}",
+                      anchor=tk.E,
+                      fill=StyleManager.COLORS['dark'],
+                      font=StyleManager.FONTS['small'])
+        
+        # Положение окна в длинном ряду
+        if self.view is not None:
+            start, end = self.view
+            scene.add('view_label', 'text', self.width - padding, self.height - padding + 35,
+                      text=f"{start + 1}–{end} из {len(self.data)}",
+                      anchor=tk.E,
+                      fill=StyleManager.COLORS['gray_dark'],
+                      font=StyleManager.FONTS['small'])
+        
+        return scene
 
-class GaugeChart(tk.Canvas):
+class GaugeChart(SceneCanvas):
     """Спидометр/датчик"""
-    def __init__(self, parent, width=200, height=200, 
+    def __init__(self, parent, width=200, height=200,
                  min_value=0, max_value=100, **kwargs):
         super().__init__(parent, width=width, height=height,
                         bg=StyleManager.COLORS['white'],
@@ -366,16 +728,45 @@ class GaugeChart(tk.Canvas):
         self.value = min_value
         self.title = ""
         self.unit = ""
+        self._shown = min_value  # значение, которое сейчас показывает стрелка
+        self._tween = None
     
-    def set_value(self, value, title="", unit=""):
-        """Установить значение датчика"""
-        self.value = max(self.min_value, min(self.max_value, value))
+    def set_value(self, value, title="", unit="", animate=False):
+        """Установить значение датчика (то же значение не перерисовывается)
+        
+        animate=True - стрелка плавно переходит к значению (кадры от FrameClock).
+        """
+        value = max(self.min_value, min(self.max_value, value))
+        if self._items and (value, title, unit) == (self.value, self.title, self.unit):
+            return
+        self.value = value
         self.title = title
         self.unit = unit
+        
+        if animate and self._items:
+            self._tween = Tween(self._shown, value)
+            frame_clock(self).subscribe(self, self._animate)
+            return
+        
+        if self._tween is not None:
+            frame_clock(self).unsubscribe(self)
+            self._tween = None
+        self._shown = value
         self._draw()
     
-    def _draw(self):
-        self.delete("all")
+    def _animating(self):
+        return self._tween is not None
+    
+    def _animate(self, dt):
+        self._shown = self._tween.advance(dt)
+        if self._tween.done:
+            self._tween = None
+            self._draw()
+            return False
+        self._draw()
+    
+    def _scene(self):
+        scene = Scene()
         
         center_x = self.width // 2
         center_y = self.height - 30
@@ -394,19 +785,19 @@ class GaugeChart(tk.Canvas):
         ]
         
         # Рисуем цветовые зоны
-        for zone_start, zone_end, color in zones:
+        for i, (zone_start, zone_end, color) in enumerate(zones):
             zone_extent = extent * (zone_end - zone_start)
             zone_start_angle = start_angle + extent * zone_start
             
-            self.create_arc(center_x - radius, center_y - radius,
-                          center_x + radius, center_y + radius,
-                          start=zone_start_angle, extent=zone_extent,
-                          style=tk.ARC,
-                          outline=color,
-                          width=15)
+            scene.add(('zone', i), 'arc', center_x - radius, center_y - radius,
+                      center_x + radius, center_y + radius,
+                      start=zone_start_angle, extent=zone_extent,
+                      style=tk.ARC,
+                      outline=color,
+                      width=15)
         
         # Текущее значение
-        percentage = (self.value - self.min_value) / (self.max_value - self.min_value)
+        percentage = (self._shown - self.min_value) / (self.max_value - self.min_value)
         needle_angle = start_angle + extent * percentage
         
         # Рисуем стрелку
@@ -414,36 +805,38 @@ class GaugeChart(tk.Canvas):
         needle_x = center_x + needle_length * math.cos(math.radians(needle_angle))
         needle_y = center_y - needle_length * math.sin(math.radians(needle_angle))
         
-        self.create_line(center_x, center_y, needle_x, needle_y,
-                        fill=StyleManager.COLORS['dark'],
-                        width=3)
+        scene.add('needle', 'line', center_x, center_y, needle_x, needle_y,
+                  fill=StyleManager.COLORS['dark'],
+                  width=3)
         
         # Центральная точка
-        self.create_oval(center_x-8, center_y-8, center_x+8, center_y+8,
-                        fill=StyleManager.COLORS['dark'],
-                        outline='')
+        scene.add('hub', 'oval', center_x-8, center_y-8, center_x+8, center_y+8,
+                  fill=StyleManager.COLORS['dark'],
+                  outline='')
         
         # Отображение значения
-        value_text = f"{self.value:.1f}{self.unit}"
-        self.create_text(center_x, center_y - radius//2,
-                       text=value_text,
-                       fill=StyleManager.COLORS['dark'],
-                       font=('Segoe UI', 16, 'bold'))
+        value_text = f"{self._shown:.1f}{self.unit}"
+        scene.add('value', 'text', center_x, center_y - radius//2,
+                  text=value_text,
+                  fill=StyleManager.COLORS['dark'],
+                  font=('Segoe UI', 16, 'bold'))
         
         # Заголовок
         if self.title:
-            self.create_text(center_x, 20,
-                           text=self.title,
-                           fill=StyleManager.COLORS['dark'],
-                           font=StyleManager.FONTS['body_bold'])
+            scene.add('title', 'text', center_x, 20,
+                      text=self.title,
+                      fill=StyleManager.COLORS['dark'],
+                      font=StyleManager.FONTS['body_bold'])
         
         # Минимальное и максимальное значения
-        self.create_text(center_x - radius, center_y + 10,
-                       text=str(self.min_value),
-                       fill=StyleManager.COLORS['gray_dark'],
-                       font=StyleManager.FONTS['small'])
-        
-        self.create_text(center_x + radius, center_y + 10,
-                       text=str(self.max_value),
-                       fill=StyleManager.COLORS['gray_dark'],
-                       font=StyleManager.FONTS['small'])
\ No newline at end of file
+        scene.add('min', 'text', center_x - radius, center_y + 10,
+                  text=str(self.min_value),
+                  fill=StyleManager.COLORS['gray_dark'],
+                  font=StyleManager.FONTS['small'])
+        
+        scene.add('max', 'text', center_x + radius, center_y + 10,
+                  text=str(self.max_value),
+                  fill=StyleManager.COLORS['gray_dark'],
+                  font=StyleManager.FONTS['small'])
+        
+        return scene
\ No newline at end of file
@@ -1,8 +1,9 @@
 import tkinter as tk
 from tkinter import ttk
 from styles import StyleManager, create_rounded_rectangle, create_shadow, add_hover_effect
-from PIL import Image, ImageTk
+from .animation import Tween, frame_clock
 import os
+import queue
 
 class Card(ttk.Frame):
     """Виджет карточки"""
@@ -94,6 +95,8 @@ class ProgressBar(tk.Canvas):
         self.value = value
         self.show_percentage = show_percentage
         self.rounded = rounded
+        self._shown = value
+        self._tween = None
         
         # Создание элементов
         self._create_elements()
@@ -131,10 +134,29 @@ class ProgressBar(tk.Canvas):
                                        fill=StyleManager.COLORS['dark'],
                                        font=StyleManager.FONTS['small_bold'])
     
-    def set_value(self, value):
-        """Установить значение (0-100)"""
+    def set_value(self, value, animate=False):
+        """Установить значение (0-100); animate=True - плавный переход (FrameClock)"""
         self.value = max(0, min(100, value))
-        progress_width = (self.width * self.value) // 100
+        
+        if animate:
+            self._tween = Tween(self._shown, self.value)
+            frame_clock(self).subscribe(self, self._animate)
+            return
+        
+        if self._tween is not None:
+            frame_clock(self).unsubscribe(self)
+            self._tween = None
+        self._show(self.value)
+    
+    def _animate(self, dt):
+        self._show(self._tween.advance(dt))
+        if self._tween.done:
+            self._tween = None
+            return False
+    
+    def _show(self, value):
+        self._shown = value
+        progress_width = (self.width * value) // 100
         
         if self.rounded:
             self.coords(self.progress_rect, 0, 0, progress_width, self.height)
@@ -142,12 +164,12 @@ class ProgressBar(tk.Canvas):
             self.coords(self.progress_rect, 0, 0, progress_width, self.height)
         
         if self.show_percentage:
-            self.itemconfig(self.text, text=f"{self.value}%")
+            self.itemconfig(self.text, text=f"{round(value)}%")
         
         # Изменение цвета в зависимости от значения
-        if self.value < 30:
+        if value < 30:
             color = StyleManager.COLORS['danger']
-        elif self.value < 70:
+        elif value < 70:
             color = StyleManager.COLORS['warning']
         else:
             color = StyleManager.COLORS['success']
@@ -362,6 +384,37 @@ class NotificationBadge(tk.Label):
     def decrement(self, amount=1):
         """Уменьшить счетчик"""
         self.update_count(max(0, self.count - amount))
+    
+    def attach(self, channel, user_id, poll_ms=200):
+        """Обновлять счетчик по событиям канала уведомлений
+        
+        События приходят из фонового потока канала через очередь и
+        применяются в потоке Tk по таймеру after().
+        """
+        self._events = queue.Queue()
+        self._channel = channel
+        self._subscription = channel.subscribe(user_id, self._events.put)
+        self._poll_ms = poll_ms
+        self.bind('<Destroy>', self._on_destroy, add='+')
+        self._after_id = self.after(poll_ms, self._drain_events)
+    
+    def _drain_events(self):
+        count = None
+        while True:
+            try:
+                count = self._events.get_nowait()['unread']
+            except queue.Empty:
+                break
+        
+        if count is not None and count != self.count:
+            self.update_count(count)
+        
+        self._after_id = self.after(self._poll_ms, self._drain_events)
+    
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self.after_cancel(self._after_id)
+            self._channel.unsubscribe(self._subscription)
 
 class LoadingSpinner(tk.Canvas):
     """Спиннер загрузки"""
@@ -386,27 +439,26 @@ class LoadingSpinner(tk.Canvas):
             style=tk.ARC
         )
     
+    # Скорость вращения, градусов в секунду
+    SPEED = 200
+    
     def start(self):
         """Запустить спиннер"""
         self.is_spinning = True
-        self._animate()
+        frame_clock(self).subscribe(self, self._animate)
     
     def stop(self):
         """Остановить спиннер"""
         self.is_spinning = False
+        frame_clock(self).unsubscribe(self)
     
-    def _animate(self):
-        """Анимация спиннера"""
+    def _animate(self, dt):
+        """Кадр анимации спиннера (вызывается FrameClock)"""
         if not self.is_spinning:
-            return
+            return False
         
-        self.angle = (self.angle + 10) % 360
-        self.coords(self.arc, 
-                   self.thickness, self.thickness,
-                   self.size-self.thickness, self.size-self.thickness)
+        self.angle = (self.angle + self.SPEED * dt) % 360
         self.itemconfig(self.arc, start=self.angle, extent=70)
-        
-        self.after(50, self._animate)
 
 class Avatar(tk.Canvas):
     """Аватар пользователя"""
@@ -0,0 +1,168 @@
+"""Растровая отрисовка кадров диаграмм (PIL)
+
+Кадр (Scene) диаграммы рисуется в изображение PIL с той же геометрией,
+что и на холсте Tk: изображение вставляется в холст одним элементом или
+в отчеты (XLSX, PDF). Готовые изображения кэшируются по хэшу кадра.
+"""
+import hashlib
+import io
+import math
+from collections import OrderedDict
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+# Файлы шрифтов по семействам Tk (обычный, жирный); первый найденный используется
+FONT_FILES = {
+    'Segoe UI': [('segoeui.ttf', 'segoeuib.ttf')],
+}
+FALLBACK_FONTS = [('DejaVuSans.ttf', 'DejaVuSans-Bold.ttf'), ('arial.ttf', 'arialbd.ttf'),
+                  ('LiberationSans-Regular.ttf', 'LiberationSans-Bold.ttf')]
+
+# Размер шрифта Tk задан в пунктах; экран - 96 точек на дюйм
+POINTS_TO_PIXELS = 96 / 72
+
+# Привязка текста Tk -> PIL
+TEXT_ANCHORS = {
+    'center': 'mm', 'n': 'mt', 's': 'mb', 'e': 'rm', 'w': 'lm',
+    'ne': 'rt', 'nw': 'lt', 'se': 'rb', 'sw': 'lb'
+}
+
+@lru_cache(maxsize=64)
+def load_font(font, scale=1):
+    """Шрифт PIL для описания шрифта Tk: (семейство, размер[, 'bold'])"""
+    family, size = font[0], font[1]
+    bold = 'bold' in font[2:]
+    pixels = round(abs(size) * (POINTS_TO_PIXELS if size > 0 else 1) * scale)
+    
+    for regular, bold_file in FONT_FILES.get(family, []) + FALLBACK_FONTS:
+        try:
+            return ImageFont.truetype(bold_file if bold else regular, pixels)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(pixels)
+    except TypeError:
+        # Pillow < 10.1: только растровый шрифт без размера
+        return ImageFont.load_default()
+
+def scene_key(scene, width, height, background):
+    """Хэш кадра: одинаковые кадры дают одно изображение"""
+    return hashlib.sha1(repr((width, height, background, scene)).encode('utf-8')).hexdigest()
+
+def _color(value):
+    return value or None
+
+def _arc_angles(options):
+    # Tk: градусы против часовой стрелки от 3 часов; PIL - по часовой
+    start = float(options.get('start', 0))
+    end = start + float(options.get('extent', 90))
+    low, high = min(start, end), max(start, end)
+    return -high, -low
+
+def _dashed(draw, points, dash, fill, width):
+    on, off = dash[0], dash[1] if len(dash) > 1 else dash[0]
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        length = math.hypot(x2 - x1, y2 - y1)
+        position = 0.0
+        while position < length:
+            end = min(position + on, length)
+            draw.line([(x1 + (x2 - x1) * position / length, y1 + (y2 - y1) * position / length),
+                       (x1 + (x2 - x1) * end / length, y1 + (y2 - y1) * end / length)],
+                      fill=fill, width=width)
+            position = end + off
+
+def _text(image, draw, xy, options, scale):
+    font = load_font(tuple(options.get('font', ('Segoe UI', 9))), scale)
+    anchor = TEXT_ANCHORS.get(str(options.get('anchor', 'center')), 'mm')
+    fill = _color(options.get('fill')) or '#000000'
+    text = str(options.get('text', ''))
+    
+    angle = options.get('angle', 0)
+    if not angle:
+        draw.text(xy, text, fill=fill, font=font, anchor=anchor)
+        return
+    
+    # Повернутый текст: рисуется отдельно и вставляется по центру точки
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font, anchor='lt')
+    label = Image.new('RGBA', (right - left + 2, bottom - top + 2), (0, 0, 0, 0))
+    ImageDraw.Draw(label).text((1 - left, 1 - top), text, fill=fill, font=font, anchor='lt')
+    label = label.rotate(angle, expand=True, resample=Image.BICUBIC)
+    image.paste(label, (round(xy[0] - label.width / 2), round(xy[1] - label.height / 2)), label)
+
+def render_scene(scene, width, height, background='#ffffff', scale=2):
+    """Изображение PIL (RGB) кадра; рисуется в scale раз крупнее и уменьшается для сглаживания"""
+    image = Image.new('RGB', (width * scale, height * scale), background)
+    draw = ImageDraw.Draw(image)
+    
+    for key, kind, coords, options in scene:
+        points = [(coords[i] * scale, coords[i + 1] * scale) for i in range(0, len(coords) - 1, 2)]
+        line_width = max(1, round(float(options.get('width', 1)) * scale))
+        fill, outline = _color(options.get('fill')), _color(options.get('outline'))
+        
+        if kind == 'text':
+            _text(image, draw, points[0], options, scale)
+        elif kind == 'line':
+            if options.get('dash'):
+                _dashed(draw, points, [d * scale for d in options['dash']], fill, line_width)
+            else:
+                draw.line(points, fill=fill, width=line_width, joint='curve')
+        elif kind == 'rectangle':
+            (x1, y1), (x2, y2) = points
+            draw.rectangle([min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)],
+                           fill=fill, outline=outline, width=line_width if outline else 0)
+        elif kind == 'oval':
+            (x1, y1), (x2, y2) = points
+            draw.ellipse([min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)],
+                         fill=fill, outline=outline, width=line_width if outline else 0)
+        elif kind == 'polygon':
+            draw.polygon(points, fill=fill, outline=outline)
+        elif kind == 'arc':
+            start, end = _arc_angles(options)
+            bbox = [points[0], points[1]]
+            if options.get('style') == 'arc':
+                # У дуги без заливки цвет задается outline
+                draw.arc(bbox, start, end, fill=outline, width=line_width)
+            else:
+                draw.pieslice(bbox, start, end, fill=fill, outline=outline, width=line_width if outline else 0)
+    
+    if scale != 1:
+        image = image.resize((width, height), Image.LANCZOS)
+    return image
+
+class ImageCache:
+    """Кэш изображений кадров (LRU по хэшу кадра)"""
+    
+    def __init__(self, max_size=64):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+    
+    def get(self, scene, width, height, background='#ffffff'):
+        """Изображение кадра и его ключ"""
+        key = scene_key(scene, width, height, background)
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image, key
+        
+        self.misses += 1
+        image = self._images[key] = render_scene(scene, width, height, background)
+        if len(self._images) > self.max_size:
+            self._images.popitem(last=False)
+        return image, key
+    
+    def clear(self):
+        self._images.clear()
+
+# Общий кэш всех диаграмм
+image_cache = ImageCache()
+
+def to_png(image):
+    """PNG изображения в памяти (для вставки в XLSX)"""
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    buffer.seek(0)
+    return buffer
\ No newline at end of file